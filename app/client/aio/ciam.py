@@ -0,0 +1,244 @@
+# Async twin of app.client.ciam, same headers and return shapes.
+import base64
+import json
+import uuid
+
+from datetime import datetime, timezone, timedelta
+
+import httpx
+
+from app.client.aio import transport
+from app.service.metrics import atimed_ciam
+from app.client.encrypt import (
+    java_like_timestamp,
+    ts_gmt7_without_colon,
+    ax_api_signature,
+)
+from app.client.ciam import (
+    BASE_CIAM_URL,
+    BASIC_AUTH,
+    AX_DEVICE_ID,
+    AX_FP,
+    UA,
+    validate_contact,
+)
+
+async def get_otp(contact: str) -> str:
+    if not validate_contact(contact):
+        return None
+
+    url = BASE_CIAM_URL + "/realms/xl-ciam/auth/otp"
+
+    querystring = {
+        "contact": contact,
+        "contactType": "SMS",
+        "alternateContact": "false"
+    }
+
+    now = datetime.now(timezone(timedelta(hours=7)))
+    ax_request_at = java_like_timestamp(now)  # format: "2023-10-20T12:34:56.78+07:00"
+    ax_request_id = str(uuid.uuid4())
+
+    headers = {
+        "Accept-Encoding": "gzip, deflate, br",
+        "Authorization": f"Basic {BASIC_AUTH}",
+        "Ax-Device-Id": AX_DEVICE_ID,
+        "Ax-Fingerprint": AX_FP,
+        "Ax-Request-At": ax_request_at,
+        "Ax-Request-Device": "samsung",
+        "Ax-Request-Device-Model": "SM-N935F",
+        "Ax-Request-Id": ax_request_id,
+        "Ax-Substype": "PREPAID",
+        "Content-Type": "application/json",
+        "Host": BASE_CIAM_URL.replace("https://", ""),
+        "User-Agent": UA,
+    }
+
+    print("Requesting OTP...")
+    try:
+        response = await atimed_ciam(url, lambda: transport.get(url, headers=headers, params=querystring))
+        print("response body", response.text)
+        json_body = json.loads(response.text)
+
+        if "subscriber_id" not in json_body:
+            print(json_body.get("error", "No error message in response"))
+            raise ValueError("Subscriber ID not found in response")
+
+        return json_body["subscriber_id"]
+    except Exception as e:
+        print(f"Error requesting OTP: {e}")
+        return None
+
+async def extend_session(subscriber_id: str) -> str:
+    b64_subscriber_id = base64.b64encode(subscriber_id.encode()).decode()
+    url = f"{BASE_CIAM_URL}/realms/xl-ciam/auth/extend-session"
+
+    querystring = {
+        "contact": b64_subscriber_id,
+        "contactType": "DEVICEID"
+    }
+
+    now = datetime.now(timezone(timedelta(hours=7)))
+    ax_request_at = java_like_timestamp(now)  # format: "2023-10-20T12:34:56.78+07:00"
+    ax_request_id = str(uuid.uuid4())
+
+    headers = {
+        "Accept-Encoding": "gzip, deflate, br",
+        "Authorization": f"Basic {BASIC_AUTH}",
+        "Ax-Device-Id": AX_DEVICE_ID,
+        "Ax-Fingerprint": AX_FP,
+        "Ax-Request-At": ax_request_at,
+        "Ax-Request-Device": "samsung",
+        "Ax-Request-Device-Model": "SM-N935F",
+        "Ax-Request-Id": ax_request_id,
+        "Ax-Substype": "PREPAID",
+        "Content-Type": "application/json",
+        "Host": BASE_CIAM_URL.replace("https://", ""),
+        "User-Agent": UA,
+    }
+
+    print("Extending session...")
+    try:
+        response = await atimed_ciam(url, lambda: transport.get(url, headers=headers, params=querystring))
+        if response.status_code != 200:
+            print(f"Failed to extend session: {response.status_code} - {response.text}")
+            return None
+
+        data = response.json()
+        exchange_code = data.get("data", {}).get("exchange_code")
+
+        return exchange_code
+    except Exception as e:
+        print(f"Error extending session: {e}")
+        return None
+
+async def submit_otp(
+    api_key: str,
+    contact_type: str,
+    contact: str,
+    code: str
+):
+    final_contact = ""
+    final_code = ""
+
+    if contact_type == "SMS":
+        if not validate_contact(contact):
+            print("Invalid number")
+            return None
+        final_contact = contact
+
+        if not code or len(code) != 6:
+            print("Invalid OTP code format")
+            return None
+        final_code = code
+    elif contact_type == "DEVICEID":
+        final_contact = base64.b64encode(contact.encode()).decode()
+        final_code = code
+    else:
+        print("Unsupported contact type")
+        return None
+
+    url = BASE_CIAM_URL + "/realms/xl-ciam/protocol/openid-connect/token"
+
+    now_gmt7 = datetime.now(timezone(timedelta(hours=7)))
+    ts_for_sign = ts_gmt7_without_colon(now_gmt7)
+    ts_header = ts_gmt7_without_colon(now_gmt7 - timedelta(minutes=5))
+    signature = ax_api_signature(api_key, ts_for_sign, final_contact, code, contact_type)
+
+    payload = f"contactType={contact_type}&code={final_code}&grant_type=password&contact={final_contact}&scope=openid"
+
+    headers = {
+        "Accept-Encoding": "gzip, deflate, br",
+        "Authorization": f"Basic {BASIC_AUTH}",
+        "Ax-Api-Signature": signature,
+        "Ax-Device-Id": AX_DEVICE_ID,
+        "Ax-Fingerprint": AX_FP,
+        "Ax-Request-At": ts_header,
+        "Ax-Request-Device": "samsung",
+        "Ax-Request-Device-Model": "SM-N935F",
+        "Ax-Request-Id": str(uuid.uuid4()),
+        "Ax-Substype": "PREPAID",
+        "Content-Type": "application/x-www-form-urlencoded",
+        "User-Agent": UA,
+    }
+
+    print("Submitting OTP...")
+    try:
+        response = await atimed_ciam(url, lambda: transport.post(url, content=payload, headers=headers))
+        json_body = json.loads(response.text)
+
+        if "error" in json_body:
+            print(f"[Error submit_otp]: {json_body}")
+            return None
+
+        print("Login successful.")
+        return json_body
+    except httpx.HTTPError as e:
+        print(f"[Error submit_otp]: {e}")
+        return None
+
+async def get_new_token(api_key: str, refresh_token: str, subscriber_id: str) -> str:
+    url = BASE_CIAM_URL + "/realms/xl-ciam/protocol/openid-connect/token"
+
+    now = datetime.now(timezone(timedelta(hours=7)))
+    ax_request_at = now.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "+0700"
+    ax_request_id = str(uuid.uuid4())
+
+    headers = {
+        "Host": BASE_CIAM_URL.replace("https://", ""),
+        "ax-request-at": ax_request_at,
+        "ax-device-id": AX_DEVICE_ID,
+        "ax-request-id": ax_request_id,
+        "ax-request-device": "samsung",
+        "ax-request-device-model": "SM-N935F",
+        "ax-fingerprint": AX_FP,
+        "authorization": f"Basic {BASIC_AUTH}",
+        "user-agent": UA,
+        "ax-substype": "PREPAID",
+        "content-type": "application/x-www-form-urlencoded"
+    }
+
+    data = {
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token
+    }
+
+    print("Refreshing token...")
+    resp = await atimed_ciam(url, lambda: transport.post(url, headers=headers, data=data))
+    if resp.status_code == 400:
+        if resp.json().get("error_description") != "Session not active":
+            print(f"Failed to refresh token: {resp.status_code} - {resp.text}")
+            return None
+
+        if subscriber_id == "":
+            raise ValueError("Subscriber ID is missing")
+
+        exchange_code = await extend_session(subscriber_id)
+        if exchange_code is None:
+            raise ValueError("Failed to get exchange code")
+
+        extend_result = await submit_otp(
+            api_key,
+            "DEVICEID",
+            subscriber_id,
+            exchange_code
+        )
+
+        if extend_result is None:
+            if "Invalid refresh token" in resp.text:
+                raise ValueError("Refresh token is invalid or expired. Please login again.")
+
+            raise ValueError("Failed to submit OTP after extending session")
+
+        return extend_result
+
+    resp.raise_for_status()
+
+    body = resp.json()
+
+    if "id_token" not in body:
+        raise ValueError("ID token not found in response")
+    if "error" in body:
+        raise ValueError(f"Error in response: {body['error']} - {body.get('error_description', '')}")
+
+    return body
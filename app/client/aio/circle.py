@@ -0,0 +1,252 @@
+# CIRCLE
+import asyncio
+
+from app.client.aio.engsel import send_api_request
+from app.client.encrypt import encrypt_circle_msisdn
+from app.client.circle import circle_group_id, circle_hints, find_parent
+
+async def get_group_data(
+    api_key: str,
+    tokens: dict,
+) -> dict:
+    path = "family-hub/api/v8/groups/status"
+
+    raw_payload = {
+        "is_enterprise": False,
+        "lang": "en"
+    }
+
+    print("Fetching group detail...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    return res
+
+async def get_group_members(
+    api_key: str,
+    tokens: dict,
+    group_id: str,
+) -> dict:
+    path = "family-hub/api/v8/members/info"
+
+    raw_payload = {
+        "group_id": group_id,
+        "is_enterprise": False,
+        "lang": "en"
+    }
+
+    print("Fetching group members...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    return res
+
+async def validate_circle_member(
+    api_key: str,
+    tokens: dict,
+    msisdn: str,
+) -> dict:
+    path = "family-hub/api/v8/members/validate"
+    
+    encrypted_msisdn = encrypt_circle_msisdn(api_key, msisdn)
+
+    raw_payload = {
+        "msisdn": encrypted_msisdn,
+        "is_enterprise": False,
+        "lang": "en"
+    }
+
+    print(f"Validating {msisdn}...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    return res
+
+async def invite_circle_member(
+    api_key: str,
+    tokens: dict,
+    msisdn: str,
+    name: str,
+    group_id: str,
+    member_id_parent: str,
+) -> dict:
+    path = "family-hub/api/v8/members/invite"
+    
+    encrypted_msisdn = encrypt_circle_msisdn(api_key, msisdn)
+    print(f"Encrypted MSISDN: {encrypted_msisdn}")
+
+    raw_payload = {
+        "access_token": tokens["access_token"],
+        "group_id": group_id,
+        "is_enterprise": False,
+        "members": [
+            {
+                "msisdn": encrypted_msisdn,
+                "name": name
+            }    
+        ],
+        "lang": "en",
+        "member_id_parent": member_id_parent
+    }
+    
+    print(f"Inviting {msisdn}...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    return res
+
+async def remove_circle_member(
+    api_key: str,
+    tokens: dict,
+    member_id: str,
+    group_id: str,
+    member_id_parent: str,
+    is_last_member: bool = False,
+) -> dict:
+    path = "family-hub/api/v8/members/remove"
+
+    raw_payload = {
+        "member_id": member_id,
+        "group_id": group_id,
+        "is_enterprise": False,
+        "is_last_member": is_last_member,
+        "lang": "en",
+        "member_id_parent": member_id_parent
+    }
+    
+    print(f"Removing member {member_id} from Circle...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+    return res
+
+async def accept_circle_invitation(
+    api_key: str,
+    tokens: dict,
+    group_id: str,
+    member_id: str,
+) -> dict:
+    path = "family-hub/api/v8/groups/accept-invitation"
+
+    raw_payload = {
+        "access_token": tokens["access_token"],
+        "group_id": group_id,
+        "member_id": member_id,
+        "is_enterprise": False,
+        "lang": "en"
+    }
+
+    print(f"Accepting invitation to Circle {group_id}...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    return res
+
+async def create_circle(
+    api_key: str,
+    tokens: dict,
+    parent_name: str,
+    group_name: str,
+    member_msisdn: str,
+    member_name: str,
+) -> dict:
+    path = "family-hub/api/v8/groups/create"
+
+    raw_payload = {
+        "access_token": tokens["access_token"],
+        "parent_name": parent_name,
+        "group_name": group_name,
+        "is_enterprise": False,
+        "members": [
+            {
+                "msisdn": encrypt_circle_msisdn(api_key, member_msisdn),
+                "name": member_name
+            }
+        ],
+        "lang": "en",
+    }
+    
+    print(f"Creating Circle with member {member_msisdn}...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+    
+    return res
+
+async def spending_tracker(
+    api_key: str,
+    tokens: dict,
+    parent_subs_id: str,
+    family_id: str,
+) -> dict:
+    path = "gamification/api/v8/family-hub/spending-tracker"
+
+    raw_payload = {
+        "is_enterprise": False,
+        "parent_subs_id": parent_subs_id,
+        "family_id": family_id,
+        "lang": "en"
+    }
+
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    return res
+
+async def get_bonus_data(
+    api_key: str,
+    tokens: dict,
+    parent_subs_id: str,
+    family_id: str,
+) -> dict:
+    path = "gamification/api/v8/family-hub/bonus/list"
+
+    raw_payload = {
+        "is_enterprise": False,
+        "parent_subs_id": parent_subs_id,
+        "family_id": family_id,
+        "lang": "en"
+    }
+
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    return res
+
+async def get_circle_overview(api_key: str, tokens: dict, number) -> dict:
+    """Async get_circle_overview, see app.client.circle"""
+    hint = circle_hints.get(number)
+    group_task = asyncio.create_task(get_group_data(api_key, tokens))
+    members_task = spending_task = None
+    if hint:
+        members_task = asyncio.create_task(get_group_members(api_key, tokens, hint["group_id"]))
+        if hint["parent_subs_id"]:
+            spending_task = asyncio.create_task(
+                spending_tracker(api_key, tokens, hint["parent_subs_id"], hint["group_id"])
+            )
+
+    try:
+        overview = {"group": await group_task, "members": None, "spending": None}
+        group_id = circle_group_id(overview["group"])
+        if not group_id:
+            circle_hints.invalidate(number)
+            return overview
+
+        if hint and hint["group_id"] == group_id:
+            members_res = await members_task
+        else:
+            members_res = await get_group_members(api_key, tokens, group_id)
+        overview["members"] = members_res
+        if members_res.get("status") != "SUCCESS":
+            return overview
+
+        parent_subs_id = find_parent(members_res.get("data", {}).get("members", [])).get("subscriber_number", "")
+        # The spending tracker is optional on both screens
+        try:
+            if spending_task is not None and hint["group_id"] == group_id and hint["parent_subs_id"] == parent_subs_id:
+                overview["spending"] = await spending_task
+            elif parent_subs_id:
+                overview["spending"] = await spending_tracker(api_key, tokens, parent_subs_id, group_id)
+        except Exception as e:
+            print(f"Failed to fetch spending tracker: {e}")
+
+        circle_hints.set(number, {"group_id": group_id, "parent_subs_id": parent_subs_id})
+        return overview
+    finally:
+        # Guesses that turned out wrong are dropped, their errors too
+        for task in (group_task, members_task, spending_task):
+            if task is None:
+                continue
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
@@ -0,0 +1,548 @@
+# Async twin of app.client.engsel, same payloads and return shapes.
+import asyncio
+import json
+import time
+import uuid
+
+from datetime import datetime, timezone
+
+from app.client.aio import transport
+from app.client.encrypt import (
+    encryptsign_xdata,
+    java_like_timestamp,
+    decrypt_xdata,
+    API_KEY,
+)
+from app.client.engsel import (
+    BASE_API_URL,
+    UA,
+    FAMILY_PROBE_CONCURRENT,
+    QUOTA_LOOKUP_CONCURRENCY,
+    BUNDLE_CONCURRENCY,
+    bundle_family_key,
+    coalesce_key,
+    family_cache,
+    family_payload,
+    find_variant_option,
+    inflight_requests,
+    record_response,
+)
+from app.service.family_index import FamilyIndexInstance
+from app.service.metrics import MetricsInstance
+from app.service.quota_index import QuotaIndexInstance
+from app.service.tracing import child_span, current_span
+
+async def send_api_request(
+    api_key: str,
+    path: str,
+    payload_dict: dict,
+    id_token: str,
+    method: str = "POST",
+):
+    with child_span(f"{method} {path}", **{"xl.path": path}):
+        key = coalesce_key(api_key, path, payload_dict, id_token, method)
+        if key is None:
+            return await _send_api_request(api_key, path, payload_dict, id_token, method)
+        return await inflight_requests.aget_or_load(
+            key,
+            lambda: _send_api_request(api_key, path, payload_dict, id_token, method),
+        )
+
+async def _send_api_request(
+    api_key: str,
+    path: str,
+    payload_dict: dict,
+    id_token: str,
+    method: str = "POST",
+):
+    started = time.perf_counter()
+    encrypted_payload = encryptsign_xdata(
+        api_key=api_key,
+        method=method,
+        path=path,
+        id_token=id_token,
+        payload=payload_dict
+    )
+
+    xtime = int(encrypted_payload["encrypted_body"]["xtime"])
+
+    now = datetime.now(timezone.utc).astimezone()
+    sig_time_sec = (xtime // 1000)
+
+    body = encrypted_payload["encrypted_body"]
+    x_sig = encrypted_payload["x_signature"]
+
+    headers = {
+        "host": BASE_API_URL.replace("https://", ""),
+        "content-type": "application/json; charset=utf-8",
+        "user-agent": UA,
+        "x-api-key": API_KEY,
+        "authorization": f"Bearer {id_token}",
+        "x-hv": "v3",
+        "x-signature-time": str(sig_time_sec),
+        "x-signature": x_sig,
+        "x-request-id": str(uuid.uuid4()),
+        "x-request-at": java_like_timestamp(now),
+        "x-version-app": "8.9.0",
+    }
+    current_span().set_attribute("x_request_id", headers["x-request-id"])
+
+    url = f"{BASE_API_URL}/{path}"
+    sent = time.perf_counter()
+    try:
+        resp = await transport.post(url, headers=headers, content=json.dumps(body))
+    except Exception:
+        MetricsInstance.record(path, "EXCEPTION", encrypt=sent - started, network=time.perf_counter() - sent)
+        raise
+    received = time.perf_counter()
+
+    try:
+        decrypted_body = decrypt_xdata(api_key, json.loads(resp.text))
+        record_response(path, decrypted_body, started, sent, received)
+        return decrypted_body
+    except Exception as e:
+        print("[decrypt err]", e)
+        record_response(path, None, started, sent, received, resp.status_code)
+        return resp.text
+
+async def get_profile(api_key: str, access_token: str, id_token: str) -> dict:
+    path = "api/v8/profile"
+
+    raw_payload = {
+        "access_token": access_token,
+        "app_version": "8.9.0",
+        "is_enterprise": False,
+        "lang": "en"
+    }
+
+    print("Fetching profile...")
+    res = await send_api_request(api_key, path, raw_payload, id_token, "POST")
+
+    return res.get("data")
+
+async def get_balance(api_key: str, id_token: str) -> dict:
+    path = "api/v8/packages/balance-and-credit"
+
+    raw_payload = {
+        "is_enterprise": False,
+        "lang": "en"
+    }
+
+    print("Fetching balance...")
+    res = await send_api_request(api_key, path, raw_payload, id_token, "POST")
+
+    if "data" in res:
+        if "balance" in res["data"]:
+            return res["data"]["balance"]
+    else:
+        print("Error getting balance:", res.get("error", "Unknown error"))
+        return None
+
+async def get_family(
+    api_key: str,
+    tokens: dict,
+    family_code: str,
+    is_enterprise: bool | None = None,
+    migration_type: str | None = None,
+    subscription_type: str = ""
+) -> dict:
+    key = (family_code, is_enterprise, migration_type, subscription_type)
+    return await family_cache.aget_or_load(
+        key,
+        lambda: _fetch_family(api_key, tokens, family_code, is_enterprise, migration_type, subscription_type),
+    )
+
+async def _try_family(api_key: str, id_token: str, family_code: str, ie: bool, mt: str) -> dict | None:
+    print(f"Trying is_enterprise={ie}, migration_type={mt}.")
+
+    path = "api/v8/xl-stores/options/list"
+    res = await send_api_request(api_key, path, family_payload(family_code, ie, mt), id_token, "POST")
+
+    if not isinstance(res, dict) or res.get("status") != "SUCCESS":
+        return None
+
+    family_name = res["data"]["package_family"].get("name", "")
+    if family_name == "":
+        return None
+
+    print(f"Success with is_enterprise={ie}, migration_type={mt}. Family name: {family_name}")
+    return res["data"]
+
+async def _probe_family_concurrent(api_key: str, id_token: str, family_code: str, combos: list) -> tuple:
+    # First successful combo wins, the remaining probes are cancelled.
+    pending = {
+        asyncio.create_task(_try_family(api_key, id_token, family_code, ie, mt)): (ie, mt)
+        for ie, mt in combos
+    }
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                combo = pending.pop(task)
+                if task.exception() is not None:
+                    print(f"Probe {combo} failed: {task.exception()}")
+                    continue
+                if task.result() is not None:
+                    return combo, task.result()
+        return None, None
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def _fetch_family(
+    api_key: str,
+    tokens: dict,
+    family_code: str,
+    is_enterprise: bool | None = None,
+    migration_type: str | None = None,
+    subscription_type: str = ""
+) -> dict:
+    print("Fetching package family...")
+
+    id_token = tokens.get("id_token")
+    known, others = FamilyIndexInstance.candidates(family_code, subscription_type, is_enterprise, migration_type)
+
+    if known is not None:
+        family_data = await _try_family(api_key, id_token, family_code, *known)
+        if family_data is not None:
+            return family_data
+        # The recorded combo stopped working, fall back to a full probe.
+        # The index is saved to disk, keep that off the event loop.
+        await asyncio.to_thread(FamilyIndexInstance.forget, family_code, subscription_type)
+
+    winner, family_data = None, None
+    if FAMILY_PROBE_CONCURRENT and len(others) > 1:
+        winner, family_data = await _probe_family_concurrent(api_key, id_token, family_code, others)
+    else:
+        for ie, mt in others:
+            family_data = await _try_family(api_key, id_token, family_code, ie, mt)
+            if family_data is not None:
+                winner = (ie, mt)
+                break
+
+    if family_data is None:
+        print(f"Failed to get valid family data for {family_code}")
+        return None
+
+    await asyncio.to_thread(FamilyIndexInstance.record, family_code, subscription_type, *winner)
+    return family_data
+
+async def get_families(api_key: str, tokens: dict, package_category_code: str) -> dict:
+    print("Fetching families...")
+    path = "api/v8/xl-stores/families"
+    payload_dict = {
+        "migration_type": "",
+        "is_enterprise": False,
+        "is_shareable": False,
+        "package_category_code": package_category_code,
+        "with_icon_url": True,
+        "is_migration": False,
+        "lang": "en"
+    }
+
+    res = await send_api_request(api_key, path, payload_dict, tokens["id_token"], "POST")
+    if res.get("status") != "SUCCESS":
+        print(f"Failed to get families for category {package_category_code}")
+        print(f"Res:{json.dumps(res, indent=2)}")
+        return None
+    return res["data"]
+
+async def get_package(
+    api_key: str,
+    tokens: dict,
+    package_option_code: str,
+    package_family_code: str = "",
+    package_variant_code: str = ""
+    ) -> dict:
+    path = "api/v8/xl-stores/options/detail"
+
+    raw_payload = {
+        "is_transaction_routine": False,
+        "migration_type": "NONE",
+        "package_family_code": package_family_code,
+        "family_role_hub": "",
+        "is_autobuy": False,
+        "is_enterprise": False,
+        "is_shareable": False,
+        "is_migration": False,
+        "lang": "en",
+        "package_option_code": package_option_code,
+        "is_upsell_pdp": False,
+        "package_variant_code": package_variant_code
+    }
+
+    print("Fetching package...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    if "data" not in res:
+        print(json.dumps(res, indent=2))
+        print("Error getting package:", res.get("error", "Unknown error"))
+        return None
+
+    return res["data"]
+
+async def get_family_codes(api_key: str, tokens: dict, quota_codes: list[str]) -> dict[str, str]:
+    family_codes, missing = QuotaIndexInstance.get_many(quota_codes)
+    if not missing:
+        return family_codes
+
+    semaphore = asyncio.Semaphore(QUOTA_LOOKUP_CONCURRENCY)
+
+    async def lookup(quota_code):
+        async with semaphore:
+            try:
+                package = await get_package(api_key, tokens, quota_code)
+            except Exception as e:
+                print(f"Failed to fetch package {quota_code}: {e}")
+                return None
+        if not package:
+            return None
+        return package["package_family"]["package_family_code"]
+
+    print(f"Fetching family codes for {len(missing)} packages...")
+    results = await asyncio.gather(*(lookup(q) for q in missing))
+    resolved = {q: f for q, f in zip(missing, results) if f}
+
+    # Index write is a small fsync'd file, keep it off the event loop
+    await asyncio.to_thread(QuotaIndexInstance.record_many, resolved)
+    family_codes.update(resolved)
+    return family_codes
+
+async def get_addons(api_key: str, tokens: dict, package_option_code: str) -> dict:
+    path = "api/v8/xl-stores/options/addons-pinky-box"
+
+    raw_payload = {
+        "is_enterprise": False,
+        "lang": "en",
+        "package_option_code": package_option_code
+    }
+
+    print("Fetching addons...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    if "data" not in res:
+        print("Error getting addons:", res.get("error", "Unknown error"))
+        return None
+
+    return res["data"]
+
+async def intercept_page(
+    api_key: str,
+    tokens: dict,
+    option_code: str,
+    is_enterprise: bool = False
+):
+    path = "misc/api/v8/utility/intercept-page"
+
+    raw_payload = {
+        "is_enterprise": is_enterprise,
+        "lang": "en",
+        "package_option_code": option_code
+    }
+
+    print("Fetching intercept page...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    if "status" in res:
+        print(f"Intercept status: {res['status']}")
+    else:
+        print("Intercept error")
+
+async def login_info(
+    api_key: str,
+    tokens: dict,
+    is_enterprise: bool = False
+):
+    path = "api/v8/auth/login"
+
+    raw_payload = {
+        "access_token": tokens["access_token"],
+        "is_enterprise": is_enterprise,
+        "lang": "en"
+    }
+
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    if "data" not in res:
+        print(json.dumps(res, indent=2))
+        print("Error getting package:", res.get("error", "Unknown error"))
+        return None
+
+    return res["data"]
+
+async def get_package_details(
+    api_key: str,
+    tokens: dict,
+    family_code: str,
+    variant_code: str,
+    option_order: int,
+    is_enterprise: bool | None = None,
+    migration_type: str | None = None,
+    subscription_type: str = ""
+) -> dict | None:
+    family_data = await get_family(api_key, tokens, family_code, is_enterprise, migration_type, subscription_type)
+    if not family_data:
+        print(f"Gagal mengambil data family untuk {family_code}.")
+        return None
+
+    option_code = find_variant_option(family_data, variant_code, option_order)
+    if option_code is None:
+        print("Gagal menemukan opsi paket yang sesuai.")
+        return None
+
+    package_details_data = await get_package(api_key, tokens, option_code)
+    if not package_details_data:
+        print("Gagal mengambil detail paket.")
+        return None
+
+    return package_details_data
+
+async def get_bundle_details(
+    api_key: str,
+    tokens: dict,
+    packages: list[dict],
+    subscription_type: str = ""
+) -> list[dict] | None:
+    semaphore = asyncio.Semaphore(BUNDLE_CONCURRENCY)
+    families = {}
+
+    async def fetch_family(key):
+        family_code, is_enterprise, migration_type = key
+        async with semaphore:
+            return await get_family(api_key, tokens, family_code, is_enterprise, migration_type, subscription_type)
+
+    async def fetch_member(package):
+        # Members sharing a family await the same task, then fetch their option
+        key = bundle_family_key(package)
+        if key not in families:
+            families[key] = asyncio.ensure_future(fetch_family(key))
+        family_data = await families[key]
+        if not family_data:
+            print(f"Gagal mengambil data family untuk {package['family_code']}.")
+            return None
+        option_code = find_variant_option(family_data, package["variant_code"], package["order"])
+        if option_code is None:
+            print(f"Gagal menemukan opsi paket untuk {package['family_code']}.")
+            return None
+        async with semaphore:
+            package_detail = await get_package(api_key, tokens, option_code)
+        if not package_detail:
+            print(f"Gagal mengambil detail paket untuk {package['family_code']}.")
+        return package_detail
+
+    details = await asyncio.gather(*(fetch_member(p) for p in packages))
+    if not all(details):
+        return None
+    return list(details)
+
+async def get_notifications(
+    api_key: str,
+    tokens: dict,
+):
+    path = "api/v8/notification-non-grouping"
+
+    raw_payload = {
+        "is_enterprise": False,
+        "lang": "en"
+    }
+
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    if isinstance(res, dict) and res.get("status") != "SUCCESS":
+        print("Error getting notifications:", res.get("error", "Unknown error"))
+        return None
+
+    return res
+
+async def get_notification_detail(
+    api_key: str,
+    tokens: dict,
+    notification_id: str
+):
+    path = "api/v8/notification/detail"
+
+    raw_payload = {
+        "is_enterprise": False,
+        "lang": "en",
+        "notification_id": notification_id
+    }
+
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    if isinstance(res, dict) and res.get("status") != "SUCCESS":
+        print("Error getting notification detail:", res.get("error", "Unknown error"))
+        return None
+
+    return res
+
+async def get_transaction_history(api_key: str, tokens: dict) -> dict:
+    path = "payments/api/v8/transaction-history"
+
+    raw_payload = {
+        "is_enterprise": False,
+        "lang": "en"
+    }
+
+    print("Fetching transaction history...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    return res.get("data")
+
+async def get_tiering_info(api_key: str, tokens: dict) -> dict:
+    path = "gamification/api/v8/loyalties/tiering/info"
+
+    raw_payload = {
+        "is_enterprise": False,
+        "lang": "en"
+    }
+
+    print("Fetching tiering info...")
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    if res:
+        return res.get("data", {})
+    return {}
+
+async def unsubscribe(
+    api_key: str,
+    tokens: dict,
+    quota_code: str,
+    product_domain: str,
+    product_subscription_type: str,
+) -> bool:
+    path = "api/v8/packages/unsubscribe"
+
+    raw_payload = {
+        "product_subscription_type": product_subscription_type,
+        "quota_code": quota_code,
+        "product_domain": product_domain,
+        "is_enterprise": False,
+        "unsubscribe_reason_code": "",
+        "lang": "en",
+        "family_member_id": ""
+    }
+
+    try:
+        res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+        print(json.dumps(res, indent=4))
+
+        if res and res.get("code") == "000":
+            return True
+        else:
+            return False
+    except Exception as e:
+        return False
+
+async def dashboard_segments(
+    api_key: str,
+    tokens: dict,
+) -> dict:
+    path = "dashboard/api/v8/segments"
+
+    raw_payload = {
+        "access_token": tokens["access_token"],
+    }
+
+    res = await send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
+
+    return res
@@ -0,0 +1,20 @@
+from app.client.aio.engsel import send_api_request
+
+async def get_segments(
+    api_key: str,
+    tokens: dict,
+    is_enterprise: bool = False,
+):
+    path = "api/v8/configs/store/segments"
+    payload = {
+        "is_enterprise": is_enterprise,
+        "lang": "en"
+    }
+    
+    res = await send_api_request(api_key, path, payload, tokens["id_token"], "POST")
+    if res["status"] != "SUCCESS":
+        print("Failed to fetch segments.")
+        print(f"Error: {res}")
+        return None
+    
+    return res
\ No newline at end of file
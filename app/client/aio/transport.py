@@ -0,0 +1,43 @@
+import importlib.util
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+import httpx
+
+from app.client.transport import POOL_MAXSIZE, DEFAULT_TIMEOUT
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2]),
+# fall back to HTTP/1.1 keep-alive when it is not installed.
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+_client: httpx.AsyncClient | None = None
+
+def get_client() -> httpx.AsyncClient:
+    """Return the process-wide AsyncClient, every coroutine shares its pool."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=POOL_MAXSIZE,
+                max_keepalive_connections=POOL_MAXSIZE,
+            ),
+            # Shared between users, never keep cookies from one response for the next request.
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+    return _client
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    return await get_client().request(method, url, **kwargs)
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+async def aclose():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
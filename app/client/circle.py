@@ -1,6 +1,22 @@
 # CIRCLE
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from app.client.engsel import send_api_request
-from app.client.encrypt import encrypt_circle_msisdn
+from app.client.encrypt import encrypt_circle_msisdn, decrypt_circle_msisdns
+from app.service.cache import TTLCache
+from app.service.metrics import MetricsInstance
+
+# A member's number never changes, decrypted MSISDNs are kept per (group_id, member_id)
+CIRCLE_MSISDN_CACHE_TTL = int(os.getenv("CIRCLE_MSISDN_CACHE_TTL", "86400"))
+CIRCLE_MSISDN_CACHE_SIZE = int(os.getenv("CIRCLE_MSISDN_CACHE_SIZE", "1024"))
+circle_msisdn_cache = TTLCache(maxsize=CIRCLE_MSISDN_CACHE_SIZE, ttl=CIRCLE_MSISDN_CACHE_TTL, name="circle_msisdn")
+
+# group_id and parent subscriber of the last Circle seen per number, so a
+# redraw can request members and spending together with the group status
+circle_hints = TTLCache(maxsize=64, ttl=3600, name="circle_hints")
+
+MetricsInstance.register_collector("circle_msisdn", circle_msisdn_cache.stats)
 
 def get_group_data(
     api_key: str,
@@ -198,3 +214,85 @@ def get_bonus_data(
     res = send_api_request(api_key, path, raw_payload, tokens["id_token"], "POST")
 
     return res
+
+def circle_msisdns(api_key: str, group_id: str, members: list[dict]) -> list[str]:
+    """Decrypted MSISDN of each member, "" when it can't be decrypted.
+    Only members missing from the cache are decrypted, in one batch."""
+    msisdns = [None] * len(members)
+    missing = []
+    for i, member in enumerate(members):
+        member_id = member.get("member_id", "")
+        if member_id:
+            msisdns[i] = circle_msisdn_cache.get((group_id, member_id))
+        if msisdns[i] is None:
+            missing.append(i)
+
+    if missing:
+        decrypted = decrypt_circle_msisdns(api_key, [members[i].get("msisdn", "") for i in missing])
+        for i, msisdn in zip(missing, decrypted):
+            msisdns[i] = msisdn
+            member_id = members[i].get("member_id", "")
+            if member_id and msisdn:
+                circle_msisdn_cache.set((group_id, member_id), msisdn)
+
+    return msisdns
+
+def find_parent(members: list[dict]) -> dict:
+    return next((m for m in members if m.get("member_role", "") == "PARENT"), {})
+
+def circle_group_id(group_res: dict) -> str:
+    if group_res.get("status") != "SUCCESS":
+        return ""
+    return (group_res.get("data") or {}).get("group_id", "")
+
+def get_circle_overview(api_key: str, tokens: dict, number) -> dict:
+    """Group status, members and spending tracker for the Circle screen.
+
+    Members need the group_id and the spending tracker needs the parent from
+    the member list, so a first visit is three calls in a row. After that the
+    ids remembered for `number` let all three go out together, the guesses
+    are checked against the fresh group and member data and redone if the
+    Circle changed. members / spending are None when they could not be asked.
+    """
+    hint = circle_hints.get(number)
+    executor = ThreadPoolExecutor(max_workers=3)
+    try:
+        group_future = executor.submit(get_group_data, api_key, tokens)
+        members_future = spending_future = None
+        if hint:
+            members_future = executor.submit(get_group_members, api_key, tokens, hint["group_id"])
+            if hint["parent_subs_id"]:
+                spending_future = executor.submit(
+                    spending_tracker, api_key, tokens, hint["parent_subs_id"], hint["group_id"]
+                )
+
+        overview = {"group": group_future.result(), "members": None, "spending": None}
+        group_id = circle_group_id(overview["group"])
+        if not group_id:
+            circle_hints.invalidate(number)
+            return overview
+
+        if hint and hint["group_id"] == group_id:
+            members_res = members_future.result()
+        else:
+            members_res = get_group_members(api_key, tokens, group_id)
+            spending_future = None
+        overview["members"] = members_res
+        if members_res.get("status") != "SUCCESS":
+            return overview
+
+        parent_subs_id = find_parent(members_res.get("data", {}).get("members", [])).get("subscriber_number", "")
+        # The spending tracker is optional on both screens
+        try:
+            if spending_future is not None and hint["parent_subs_id"] == parent_subs_id:
+                overview["spending"] = spending_future.result()
+            elif parent_subs_id:
+                overview["spending"] = spending_tracker(api_key, tokens, parent_subs_id, group_id)
+        except Exception as e:
+            print(f"Failed to fetch spending tracker: {e}")
+
+        circle_hints.set(number, {"group_id": group_id, "parent_subs_id": parent_subs_id})
+        return overview
+    finally:
+        # Guesses that turned out wrong are not waited for
+        executor.shutdown(wait=False, cancel_futures=True)
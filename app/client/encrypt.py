@@ -25,6 +25,7 @@ from app.service.crypto_helper import (
 from app.service.crypto_helper import decrypt_xdata as dec_xdata
 from app.service.crypto_helper import encrypt_circle_msisdn as encrypt_msisdn
 from app.service.crypto_helper import decrypt_circle_msisdn as decrypt_msisdn
+from app.service.crypto_helper import decrypt_circle_msisdns as decrypt_msisdns
 
 API_KEY = os.getenv("API_KEY")
 AES_KEY_ASCII = os.getenv("AES_KEY_ASCII")
@@ -233,4 +234,10 @@ def decrypt_circle_msisdn(
         api_key: str,
         encrypted_msisdn_b64: str
     ) -> str:
-    return decrypt_msisdn(encrypted_msisdn_b64)
\ No newline at end of file
+    return decrypt_msisdn(encrypted_msisdn_b64)
+
+def decrypt_circle_msisdns(
+        api_key: str,
+        encrypted_msisdns: list[str]
+    ) -> list[str]:
+    return decrypt_msisdns(encrypted_msisdns)
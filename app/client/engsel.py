@@ -1,22 +1,73 @@
 import os
 import json
+import time
 import uuid
-import requests
 
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timezone
 
+from app.client import transport
 from app.client.encrypt import (
     encryptsign_xdata,
     java_like_timestamp,
     decrypt_xdata,
     API_KEY,
 )
+from app.service.cache import TTLCache
+from app.service.family_index import FamilyIndexInstance
+from app.service.metrics import MetricsInstance
+from app.service.quota_index import QuotaIndexInstance
+from app.service.tracing import child_span, current_span
+from app.type_dict import PaymentItem
 
 BASE_API_URL = os.getenv("BASE_API_URL")
 if not BASE_API_URL:
     raise ValueError("BASE_API_URL environment variable not set")
 UA = os.getenv("UA")
 
+# Family catalog changes rarely, cache get_family results so pagination and
+# repeated package taps don't redo up to 8 options/list round trips.
+FAMILY_CACHE_TTL = int(os.getenv("FAMILY_CACHE_TTL", "300"))
+FAMILY_CACHE_SIZE = int(os.getenv("FAMILY_CACHE_SIZE", "128"))
+family_cache = TTLCache(maxsize=FAMILY_CACHE_SIZE, ttl=FAMILY_CACHE_TTL, name="family")
+
+# Probe every (is_enterprise, migration_type) combo at once for families that
+# are not in the resolution index yet, first success wins.
+FAMILY_PROBE_CONCURRENT = os.getenv("FAMILY_PROBE_CONCURRENT", "0") == "1"
+
+# Max options/detail calls in flight when resolving family codes for My Packages
+QUOTA_LOOKUP_CONCURRENCY = int(os.getenv("QUOTA_LOOKUP_CONCURRENCY", "6"))
+
+# Max requests in flight when resolving the members of a Hot-2 bundle
+BUNDLE_CONCURRENCY = int(os.getenv("BUNDLE_CONCURRENCY", "6"))
+
+# Catalog endpoints answer the same for every account, identical requests
+# that are in flight at the same time share one upstream call.
+COALESCE_PATHS = (
+    "api/v8/xl-stores/options/",
+    "api/v9/xl-stores/options/",
+    "api/v8/xl-stores/families",
+    "api/v8/configs/store/segments",
+)
+# options/detail carries the token_confirmation a purchase settles with, it
+# is only shared between identical requests from the same account
+COALESCE_PER_ACCOUNT_PATHS = (
+    "api/v8/xl-stores/options/detail",
+)
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "1") == "1"
+inflight_requests = TTLCache(maxsize=0, ttl=0, name="inflight")
+
+MetricsInstance.register_collector("family_cache", family_cache.stats)
+MetricsInstance.register_collector("inflight", inflight_requests.stats)
+
+def coalesce_key(api_key: str, path: str, payload_dict: dict, id_token: str, method: str) -> tuple | None:
+    """Key shared by identical catalog requests, None if the request must go out on its own.
+    id_token is left out on purpose, except for COALESCE_PER_ACCOUNT_PATHS."""
+    if not COALESCE_REQUESTS or method != "POST" or not path.startswith(COALESCE_PATHS):
+        return None
+    account = id_token if path.startswith(COALESCE_PER_ACCOUNT_PATHS) else ""
+    return (api_key, account, path, json.dumps(payload_dict, sort_keys=True, separators=(",", ":")))
+
 def send_api_request(
     api_key: str,
     path: str,
@@ -24,6 +75,23 @@ def send_api_request(
     id_token: str,
     method: str = "POST",
 ):
+    with child_span(f"{method} {path}", **{"xl.path": path}):
+        key = coalesce_key(api_key, path, payload_dict, id_token, method)
+        if key is None:
+            return _send_api_request(api_key, path, payload_dict, id_token, method)
+        return inflight_requests.get_or_load(
+            key,
+            lambda: _send_api_request(api_key, path, payload_dict, id_token, method),
+        )
+
+def _send_api_request(
+    api_key: str,
+    path: str,
+    payload_dict: dict,
+    id_token: str,
+    method: str = "POST",
+):
+    started = time.perf_counter()
     encrypted_payload = encryptsign_xdata(
         api_key=api_key,
         method=method,
@@ -53,9 +121,16 @@ def send_api_request(
         "x-request-at": java_like_timestamp(now),
         "x-version-app": "8.9.0",
     }
+    current_span().set_attribute("x_request_id", headers["x-request-id"])
 
     url = f"{BASE_API_URL}/{path}"
-    resp = requests.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    sent = time.perf_counter()
+    try:
+        resp = transport.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    except Exception:
+        MetricsInstance.record(path, "EXCEPTION", encrypt=sent - started, network=time.perf_counter() - sent)
+        raise
+    received = time.perf_counter()
     
     # print(f"Headers: {json.dumps(headers, indent=2)}")
     # print(f"Response body: {resp.text}")
@@ -63,11 +138,39 @@ def send_api_request(
     try:
         decrypted_body = decrypt_xdata(api_key, json.loads(resp.text))
         # print(f"Decrypted body: {json.dumps(decrypted_body, indent=2)}")
+        record_response(path, decrypted_body, started, sent, received)
         return decrypted_body
     except Exception as e:
         print("[decrypt err]", e)
+        record_response(path, None, started, sent, received, resp.status_code)
         return resp.text
 
+def record_response(
+    path: str,
+    decrypted_body: dict | None,
+    started: float,
+    sent: float,
+    received: float,
+    http_status: int = 200,
+):
+    """Feed one send_api_request call into the metrics and the active span,
+    None means decrypt failed"""
+    if decrypted_body is None:
+        status = f"DECRYPT_ERROR_{http_status}"
+    elif isinstance(decrypted_body, dict):
+        status = str(decrypted_body.get("status") or "NO_STATUS")
+    else:
+        status = "NO_STATUS"
+    MetricsInstance.record(
+        path,
+        status,
+        encrypt=sent - started,
+        network=received - sent,
+        decrypt=time.perf_counter() - received,
+        decrypt_failed=decrypted_body is None,
+    )
+    current_span().set_attribute("xl.status", status)
+
 def get_profile(api_key: str, access_token: str, id_token: str) -> dict:
     path = "api/v8/profile"
 
@@ -106,72 +209,113 @@ def get_family(
     tokens: dict,
     family_code: str,
     is_enterprise: bool | None = None,
-    migration_type: str | None = None
+    migration_type: str | None = None,
+    subscription_type: str = "",
+    verbose: bool = True,
 ) -> dict:
-    print("Fetching package family...")
-    
-    is_enterprise_list = [
-        False,
-        True
-    ]
-
-    migration_type_list = [
-        "NONE",
-        "PRE_TO_PRIOH",
-        "PRIOH_TO_PRIO",
-        "PRIO_TO_PRIOH"
-    ]
+    """verbose=False skips the progress prints, for background callers"""
+    key = (family_code, is_enterprise, migration_type, subscription_type)
+    return family_cache.get_or_load(
+        key,
+        lambda: _fetch_family(api_key, tokens, family_code, is_enterprise, migration_type, subscription_type, verbose),
+    )
 
-    if is_enterprise is not None:
-        is_enterprise_list = [is_enterprise]
+def family_payload(family_code: str, is_enterprise: bool, migration_type: str) -> dict:
+    return {
+        "is_show_tagging_tab": True,
+        "is_dedicated_event": True,
+        "is_transaction_routine": False,
+        "migration_type": migration_type,
+        "package_family_code": family_code,
+        "is_autobuy": False,
+        "is_enterprise": is_enterprise,
+        "is_pdlp": True,
+        "referral_code": "",
+        "is_migration": False,
+        "lang": "en"
+    }
 
-    if migration_type is not None:
-        migration_type_list = [migration_type]
+def _try_family(api_key: str, id_token: str, family_code: str, ie: bool, mt: str, verbose: bool = True) -> dict | None:
+    if verbose:
+        print(f"Trying is_enterprise={ie}, migration_type={mt}.")
 
     path = "api/v8/xl-stores/options/list"
-    id_token = tokens.get("id_token")
+    res = send_api_request(api_key, path, family_payload(family_code, ie, mt), id_token, "POST")
+
+    if not isinstance(res, dict) or res.get("status") != "SUCCESS":
+        return None
 
-    family_data = None
+    family_name = res["data"]["package_family"].get("name", "")
+    if family_name == "":
+        return None
+
+    if verbose:
+        print(f"Success with is_enterprise={ie}, migration_type={mt}. Family name: {family_name}")
+    return res["data"]
 
-    for mt in migration_type_list:
+def _probe_family_concurrent(api_key: str, id_token: str, family_code: str, combos: list, verbose: bool = True) -> tuple:
+    # First successful combo wins, probes that have not started yet are cancelled.
+    # Ones already in flight run to completion in the background and are ignored.
+    executor = ThreadPoolExecutor(max_workers=len(combos))
+    pending = {
+        executor.submit(_try_family, api_key, id_token, family_code, ie, mt, verbose): (ie, mt)
+        for ie, mt in combos
+    }
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                combo = pending.pop(future)
+                try:
+                    data = future.result()
+                except Exception as e:
+                    if verbose:
+                        print(f"Probe {combo} failed: {e}")
+                    continue
+                if data is not None:
+                    return combo, data
+        return None, None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _fetch_family(
+    api_key: str,
+    tokens: dict,
+    family_code: str,
+    is_enterprise: bool | None = None,
+    migration_type: str | None = None,
+    subscription_type: str = "",
+    verbose: bool = True,
+) -> dict:
+    if verbose:
+        print("Fetching package family...")
+
+    id_token = tokens.get("id_token")
+    known, others = FamilyIndexInstance.candidates(family_code, subscription_type, is_enterprise, migration_type)
+
+    if known is not None:
+        family_data = _try_family(api_key, id_token, family_code, *known, verbose)
         if family_data is not None:
-            break
+            return family_data
+        # The recorded combo stopped working, fall back to a full probe.
+        FamilyIndexInstance.forget(family_code, subscription_type)
 
-        for ie in is_enterprise_list:
+    winner, family_data = None, None
+    if FAMILY_PROBE_CONCURRENT and len(others) > 1:
+        winner, family_data = _probe_family_concurrent(api_key, id_token, family_code, others, verbose)
+    else:
+        for ie, mt in others:
+            family_data = _try_family(api_key, id_token, family_code, ie, mt, verbose)
             if family_data is not None:
+                winner = (ie, mt)
                 break
-        
-            print(f"Trying is_enterprise={ie}, migration_type={mt}.")
-
-            payload_dict = {
-                "is_show_tagging_tab": True,
-                "is_dedicated_event": True,
-                "is_transaction_routine": False,
-                "migration_type": mt,
-                "package_family_code": family_code,
-                "is_autobuy": False,
-                "is_enterprise": ie,
-                "is_pdlp": True,
-                "referral_code": "",
-                "is_migration": False,
-                "lang": "en"
-            }
-        
-            res = send_api_request(api_key, path, payload_dict, id_token, "POST")
-
-            if res.get("status") != "SUCCESS":
-                continue
-            
-            family_name = res["data"]["package_family"].get("name", "")
-            if family_name != "":
-                family_data = res["data"]
-                print(f"Success with is_enterprise={ie}, migration_type={mt}. Family name: {family_name}")
-
 
     if family_data is None:
-        print(f"Failed to get valid family data for {family_code}")
+        if verbose:
+            print(f"Failed to get valid family data for {family_code}")
         return None
 
+    FamilyIndexInstance.record(family_code, subscription_type, *winner)
     return family_data
 
 def get_families(api_key: str, tokens: dict, package_category_code: str) -> dict:
@@ -229,6 +373,34 @@ def get_package(
         
     return res["data"]
 
+def get_family_codes(api_key: str, tokens: dict, quota_codes: list[str]) -> dict[str, str]:
+    """Resolve quota codes from quota-details to package family codes.
+
+    Known codes come from the quota index, the rest are looked up with
+    options/detail, at most QUOTA_LOOKUP_CONCURRENCY at a time. Codes that
+    could not be resolved are left out."""
+    family_codes, missing = QuotaIndexInstance.get_many(quota_codes)
+    if not missing:
+        return family_codes
+
+    def lookup(quota_code):
+        try:
+            package = get_package(api_key, tokens, quota_code)
+        except Exception as e:
+            print(f"Failed to fetch package {quota_code}: {e}")
+            return None
+        if not package:
+            return None
+        return package["package_family"]["package_family_code"]
+
+    print(f"Fetching family codes for {len(missing)} packages...")
+    with ThreadPoolExecutor(max_workers=max(min(QUOTA_LOOKUP_CONCURRENCY, len(missing)), 1)) as executor:
+        resolved = {q: f for q, f in zip(missing, executor.map(lookup, missing)) if f}
+
+    QuotaIndexInstance.record_many(resolved)
+    family_codes.update(resolved)
+    return family_codes
+
 def get_addons(api_key: str, tokens: dict, package_option_code: str) -> dict:
     path = "api/v8/xl-stores/options/addons-pinky-box"
     
@@ -298,27 +470,15 @@ def get_package_details(
     variant_code: str,
     option_order: int,
     is_enterprise: bool | None = None,
-    migration_type: str | None = None
+    migration_type: str | None = None,
+    subscription_type: str = ""
 ) -> dict | None:
-    family_data = get_family(api_key, tokens, family_code, is_enterprise, migration_type)
+    family_data = get_family(api_key, tokens, family_code, is_enterprise, migration_type, subscription_type)
     if not family_data:
         print(f"Gagal mengambil data family untuk {family_code}.")
         return None
     
-    package_options = []
-    
-    package_variants = family_data["package_variants"]
-    option_code = None
-    for variant in package_variants:
-        if variant["package_variant_code"] == variant_code:
-            selected_variant = variant
-            package_options = selected_variant["package_options"]
-            for option in package_options:
-                if option["order"] == option_order:
-                    selected_option = option
-                    option_code = selected_option["package_option_code"]
-                    break
-
+    option_code = find_variant_option(family_data, variant_code, option_order)
     if option_code is None:
         print("Gagal menemukan opsi paket yang sesuai.")
         return None
@@ -330,6 +490,74 @@ def get_package_details(
     
     return package_details_data
 
+def find_variant_option(family_data: dict, variant_code: str, option_order: int) -> str | None:
+    for variant in family_data["package_variants"]:
+        if variant["package_variant_code"] == variant_code:
+            for option in variant["package_options"]:
+                if option["order"] == option_order:
+                    return option["package_option_code"]
+    return None
+
+def bundle_family_key(package: dict) -> tuple:
+    return (package["family_code"], package.get("is_enterprise"), package.get("migration_type"))
+
+def to_payment_item(package_detail: dict) -> PaymentItem:
+    return PaymentItem(
+        item_code=package_detail["package_option"]["package_option_code"],
+        product_type="",
+        item_price=package_detail["package_option"]["price"],
+        item_name=package_detail["package_option"]["name"],
+        tax=0,
+        token_confirmation=package_detail["token_confirmation"],
+    )
+
+def get_bundle_details(
+    api_key: str,
+    tokens: dict,
+    packages: list[dict],
+    subscription_type: str = ""
+) -> list[dict] | None:
+    """get_package_details for every member of a hot2 bundle, in order.
+
+    Each distinct family is fetched once and all of them at the same time,
+    then every distinct option is fetched at the same time, so a bundle costs
+    two round trips whatever its size (one when the families are cached).
+    Returns None if any member can't be resolved."""
+    family_keys = list(dict.fromkeys(bundle_family_key(p) for p in packages))
+    if not family_keys:
+        return []
+
+    def fetch_family(key):
+        family_code, is_enterprise, migration_type = key
+        return get_family(api_key, tokens, family_code, is_enterprise, migration_type, subscription_type)
+
+    with ThreadPoolExecutor(max_workers=max(min(BUNDLE_CONCURRENCY, len(packages)), 1)) as executor:
+        families = dict(zip(family_keys, executor.map(fetch_family, family_keys)))
+
+        option_codes = []
+        for package in packages:
+            family_data = families[bundle_family_key(package)]
+            if not family_data:
+                print(f"Gagal mengambil data family untuk {package['family_code']}.")
+                return None
+            option_code = find_variant_option(family_data, package["variant_code"], package["order"])
+            if option_code is None:
+                print(f"Gagal menemukan opsi paket untuk {package['family_code']}.")
+                return None
+            option_codes.append(option_code)
+
+        unique_codes = list(dict.fromkeys(option_codes))
+        details = dict(zip(
+            unique_codes,
+            executor.map(lambda code: get_package(api_key, tokens, code), unique_codes),
+        ))
+
+    for package, option_code in zip(packages, option_codes):
+        if not details[option_code]:
+            print(f"Gagal mengambil detail paket untuk {package['family_code']}.")
+            return None
+    return [details[code] for code in option_codes]
+
 def get_notifications(
     api_key: str,
     tokens: dict,
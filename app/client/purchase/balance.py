@@ -3,11 +3,14 @@ import json
 import time
 import uuid
 
-import requests
+from app.client import transport
 from app.client.encrypt import API_KEY, build_encrypted_field, decrypt_xdata, encryptsign_xdata, get_x_signature_payment, java_like_timestamp
 from app.client.engsel import BASE_API_URL, UA, intercept_page, send_api_request
+from app.service.dashboard import DashboardInstance
+from app.service.tracing import child_span, traced
 from app.type_dict import PaymentItem
 
+@traced("purchase.balance", root=False)
 def settlement_balance(
     api_key: str,
     tokens: dict,
@@ -182,7 +185,10 @@ def settlement_balance(
     
     url = f"{BASE_API_URL}/{path}"
     print("Sending settlement request...")
-    resp = requests.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    with child_span(f"POST {path}", **{"xl.path": path, "x_request_id": headers["x-request-id"]}):
+        resp = transport.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    # Balance and points may have changed, the main menu fetches them again
+    DashboardInstance.invalidate()
     
     try:
         decrypted_body = decrypt_xdata(api_key, json.loads(resp.text))
@@ -1,14 +1,17 @@
 import json
 import uuid
 import time
-import requests
+from app.client import transport
 
 from datetime import datetime, timezone, timedelta
 
 from app.client.engsel import BASE_API_URL, UA, intercept_page, send_api_request
 from app.client.encrypt import API_KEY, decrypt_xdata, encryptsign_xdata, java_like_timestamp, get_x_signature_payment
+from app.service.dashboard import DashboardInstance
+from app.service.tracing import child_span, traced
 from app.type_dict import PaymentItem
 
+@traced("purchase.ewallet", root=False)
 def settlement_multipayment(
     api_key: str,
     tokens: dict,
@@ -155,7 +158,10 @@ def settlement_multipayment(
     
     url = f"{BASE_API_URL}/{path}"
     print("Sending settlement request...")
-    resp = requests.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    with child_span(f"POST {path}", **{"xl.path": path, "x_request_id": headers["x-request-id"]}):
+        resp = transport.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    # Balance and points may have changed, the main menu fetches them again
+    DashboardInstance.invalidate()
     
     try:
         decrypted_body = decrypt_xdata(api_key, json.loads(resp.text))
@@ -164,16 +170,8 @@ def settlement_multipayment(
         print("[decrypt err]", e)
         return resp.text
 
-def show_multipayment(
-    api_key: str,
-    tokens: dict,
-    items: list[PaymentItem],
-    payment_for,
-    ask_overwrite: bool,
-    overwrite_amount: int = -1,
-    token_confirmation_idx: int = 0,
-    amount_idx: int = -1,
-):
+def choose_multipayment_method() -> tuple[str, str]:
+    """Ask for the e-wallet, returns (payment_method, wallet_number)"""
     choosing_payment_method = True
     while choosing_payment_method:
         payment_method = ""
@@ -207,6 +205,24 @@ def show_multipayment(
             print("Pilihan tidak valid.")
             continue
     
+    return payment_method, wallet_number
+
+def show_multipayment(
+    api_key: str,
+    tokens: dict,
+    items: list[PaymentItem],
+    payment_for,
+    ask_overwrite: bool,
+    overwrite_amount: int = -1,
+    token_confirmation_idx: int = 0,
+    amount_idx: int = -1,
+    payment_method: str = "",
+    wallet_number: str = "",
+):
+    # Callers that trace the purchase ask for the wallet before it starts
+    if not payment_method:
+        payment_method, wallet_number = choose_multipayment_method()
+    
     settlement_response = settlement_multipayment(
         api_key,
         tokens,
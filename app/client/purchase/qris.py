@@ -5,11 +5,14 @@ import base64
 import qrcode
 
 import time
-import requests
+from app.client import transport
 from app.client.engsel import *
 from app.client.encrypt import API_KEY, decrypt_xdata, encryptsign_xdata, java_like_timestamp, get_x_signature_payment
+from app.service.dashboard import DashboardInstance
+from app.service.tracing import child_span, traced
 from app.type_dict import PaymentItem
 
+@traced("purchase.qris", root=False)
 def settlement_qris(
     api_key: str,
     tokens: dict,
@@ -170,7 +173,10 @@ def settlement_qris(
     
     url = f"{BASE_API_URL}/{path}"
     print("Sending settlement request...")
-    resp = requests.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    with child_span(f"POST {path}", **{"xl.path": path, "x_request_id": headers["x-request-id"]}):
+        resp = transport.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    # Balance and points may have changed, the main menu fetches them again
+    DashboardInstance.invalidate()
     
     try:
         decrypted_body = decrypt_xdata(api_key, json.loads(resp.text))
@@ -1,11 +1,12 @@
 import os
 import json
 import uuid
-import requests
+from app.client import transport
 
 from datetime import datetime, timezone
 
 from app.client.engsel import BASE_API_URL, UA
+from app.service.dashboard import DashboardInstance
 from app.client.encrypt import (
     API_KEY,
     build_encrypted_field,
@@ -142,7 +143,9 @@ def settlement_bounty(
     
     url = f"{BASE_API_URL}/{path}"
     print("Sending bounty request...")
-    resp = requests.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    resp = transport.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    # Points were spent, the main menu fetches them again
+    DashboardInstance.invalidate()
     
     try:
         decrypted_body = decrypt_xdata(api_key, json.loads(resp.text))
@@ -219,7 +222,9 @@ def settlement_loyalty(
 
     url = f"{BASE_API_URL}/{path}"
     print("Sending loyalty request...")
-    resp = requests.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    resp = transport.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    # Points were spent, the main menu fetches them again
+    DashboardInstance.invalidate()
     
     try:
         decrypted_body = decrypt_xdata(api_key, json.loads(resp.text))
@@ -296,7 +301,9 @@ def bounty_allotment(
     
     url = f"{BASE_API_URL}/{path}"
     print("Sending bounty request...")
-    resp = requests.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    resp = transport.post(url, headers=headers, data=json.dumps(body), timeout=30)
+    # Points were spent, the main menu fetches them again
+    DashboardInstance.invalidate()
     
     try:
         decrypted_body = decrypt_xdata(api_key, json.loads(resp.text))
@@ -0,0 +1,68 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Pool sizing, tunable from .env
+# HTTP_POOL_CONNECTIONS: how many distinct connection pools urllib3 keeps per session
+# HTTP_POOL_MAXSIZE: how many keep-alive sockets are kept per host (should be >= bot concurrency)
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+DEFAULT_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "30"))
+
+# requests/urllib3 only speak HTTP/1.1, so the sync transport relies on
+# keep-alive to skip the TCP+TLS handshake on every call.
+
+_sessions: dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+
+    # The same session is shared by every account (and every bot user),
+    # never let cookies from one response leak into another user's request.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=False,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session(url: str) -> requests.Session:
+    """Return the pooled session for the host of `url`, creating it on first use."""
+    origin = _origin(url)
+    session = _sessions.get(origin)
+    if session is None:
+        with _lock:
+            session = _sessions.get(origin)
+            if session is None:
+                session = _new_session()
+                _sessions[origin] = session
+    return session
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session(url).request(method, url, **kwargs)
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+def close_all():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
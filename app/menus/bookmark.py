@@ -7,6 +7,7 @@ from app.client.engsel import get_family
 def show_bookmark_menu():
     api_key = AuthInstance.api_key
     tokens = AuthInstance.get_active_tokens()
+    subscription_type = (AuthInstance.active_user or {}).get("subscription_type", "")
     
     in_bookmark_menu = True
     while in_bookmark_menu:
@@ -49,7 +50,7 @@ def show_bookmark_menu():
             family_code = selected_bm["family_code"]
             is_enterprise = selected_bm["is_enterprise"]
             
-            family_data = get_family(api_key, tokens, family_code, is_enterprise)
+            family_data = get_family(api_key, tokens, family_code, is_enterprise, None, subscription_type)
             if not family_data:
                 print("Gagal mengambil data family.")
                 pause()
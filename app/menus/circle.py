@@ -3,19 +3,17 @@ import json
 from app.menus.package import get_packages_by_family, show_package_details
 from app.menus.util import pause, clear_screen, format_quota_byte
 from app.client.circle import (
-    get_group_data,
-    get_group_members,
     create_circle,
     validate_circle_member,
     invite_circle_member,
     remove_circle_member,
     accept_circle_invitation,
-    spending_tracker,
     get_bonus_data,
+    get_circle_overview,
+    circle_msisdns,
 )
 
 from app.service.auth import AuthInstance
-from app.client.encrypt import decrypt_circle_msisdn
 
 WIDTH = 55
 
@@ -128,7 +126,9 @@ def show_circle_info(api_key: str, tokens: dict):
 
     while in_circle_menu:
         clear_screen()
-        group_res = get_group_data(api_key, tokens)
+        # Members and spending go out together with the group status once the ids are known
+        overview = get_circle_overview(api_key, tokens, my_msisdn)
+        group_res = overview["group"]
         if group_res.get("status") != "SUCCESS":
             print("Failed to fetch circle data.")
             pause()
@@ -157,7 +157,7 @@ def show_circle_info(api_key: str, tokens: dict):
         group_name = group_data.get("group_name", "N/A")
         owner_name = group_data.get("owner_name", "N/A")
         
-        members_res = get_group_members(api_key, tokens, group_id)
+        members_res = overview["members"] or {}
         if members_res.get("status") != "SUCCESS":
             print("Failed to fetch circle members.")
             pause()
@@ -170,15 +170,16 @@ def show_circle_info(api_key: str, tokens: dict):
             pause()
             return
         
+        msisdns = circle_msisdns(api_key, group_id, members)
+        
         parent_member_id = ""
         parent_subs_id = ""
         parrent_msisdn = ""
-        for member in members:
+        for member, msisdn in zip(members, msisdns):
             if member.get("member_role", "") == "PARENT":
                 parent_member_id = member.get("member_id", "")
                 parent_subs_id = member.get("subscriber_number", "")
-                parrent_msisdn_encrypted = member.get("msisdn", "")
-                parrent_msisdn = decrypt_circle_msisdn(api_key, parrent_msisdn_encrypted)
+                parrent_msisdn = msisdn
         
         package = members_data.get("package", {})
         package_name = package.get("name", "N/A")
@@ -192,12 +193,7 @@ def show_circle_info(api_key: str, tokens: dict):
         formatted_remaining = format_quota_byte(remaining_byte)
         
         # Spending Tracker
-        spending_res = spending_tracker(
-            api_key,
-            tokens,
-            parent_subs_id,
-            group_id
-        )
+        spending_res = overview["spending"] or {}
         if spending_res.get("status") != "SUCCESS":
             print("Failed to fetch spending tracker data.")
             print(spending_res)
@@ -220,10 +216,7 @@ def show_circle_info(api_key: str, tokens: dict):
         print("=" * WIDTH)
         
         print("Members:")
-        for idx, member in enumerate(members, start=1):
-            encrypted_msisdn = member.get("msisdn", "")
-            msisdn = decrypt_circle_msisdn(api_key, encrypted_msisdn)
-            
+        for idx, (member, msisdn) in enumerate(zip(members, msisdns), start=1):
             member_id = member.get("member_id", "")
             member_role = member.get("member_role", "N/A")
             member_subs_number = member.get("subscriber_number", "")
@@ -312,7 +305,7 @@ def show_circle_info(api_key: str, tokens: dict):
                     pause()
                     continue
                 
-                msisdn_to_remove = decrypt_circle_msisdn(api_key, member_to_remove.get("msisdn", ""))
+                msisdn_to_remove = msisdns[member_number - 1]
                 confirm = input(f"Are you sure you want to remove {msisdn_to_remove} from the Circle? (y/n): ")
                 if confirm.lower() != "y":
                     print("Removal cancelled.")
@@ -351,7 +344,7 @@ def show_circle_info(api_key: str, tokens: dict):
                     continue
                 
                 member_id = member_to_accept.get("member_id", "")
-                msisdn_to_accept = decrypt_circle_msisdn(api_key, member_to_accept.get("msisdn", ""))
+                msisdn_to_accept = msisdns[member_number - 1]
                 confirm = input(f"Do you want to accept the invitation for {msisdn_to_accept}? (y/n): ")
                 if confirm.lower() != "y":
                     print("Acceptance cancelled.")
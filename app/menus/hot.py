@@ -1,19 +1,30 @@
-import json
-
-from app.client.engsel import get_family, get_package_details
+from app.client.engsel import get_bundle_details, get_family, to_payment_item
 from app.menus.package import show_package_details
 from app.service.auth import AuthInstance
-from app.menus.util import clear_screen, format_quota_byte, pause, display_html
-from app.client.purchase.ewallet import show_multipayment
+from app.service.hot_catalog import HotCatalogInstance
+from app.service.hot_resolver import HotResolverInstance, find_option_code
+from app.menus.util import clear_screen, format_quota_byte, pause, display_html, ask_amount
+from app.client.purchase.ewallet import choose_multipayment_method, show_multipayment
 from app.client.purchase.qris import show_qris_payment
 from app.client.purchase.balance import settlement_balance
-from app.type_dict import PaymentItem
+from app.service.tracing import span
 
 WIDTH = 55
 
+def purchase_amount(payment_items: list, ask_overwrite: bool, overwrite_amount: int, amount_idx: int) -> int:
+    """overwrite_amount for a bundle purchase. Bundles that allow overwriting
+    are asked here, before the purchase trace starts."""
+    if not ask_overwrite:
+        return overwrite_amount
+    amount = overwrite_amount
+    if amount == -1:
+        amount = payment_items[amount_idx]["item_price"] if amount_idx == -1 else 0
+    return ask_amount(amount)
+
 def show_hot_menu():
     api_key = AuthInstance.api_key
     tokens = AuthInstance.get_active_tokens()
+    subscription_type = (AuthInstance.active_user or {}).get("subscription_type", "")
     
     in_bookmark_menu = True
     while in_bookmark_menu:
@@ -22,10 +33,7 @@ def show_hot_menu():
         print("🔥 Paket  Hot 🔥".center(WIDTH))
         print("=" * WIDTH)
         
-        hot_packages = []
-        
-        with open("hot_data/hot.json", "r", encoding="utf-8") as f:
-            hot_packages = json.load(f)
+        hot_packages = HotCatalogInstance.hot()
 
         for idx, p in enumerate(hot_packages):
             print(f"{idx + 1}. {p['family_name']} - {p['variant_name']} - {p['option_name']}")
@@ -42,24 +50,16 @@ def show_hot_menu():
             family_code = selected_bm["family_code"]
             is_enterprise = selected_bm["is_enterprise"]
             
-            family_data = get_family(api_key, tokens, family_code, is_enterprise)
-            if not family_data:
-                print("Gagal mengambil data family.")
-                pause()
-                continue
-            
-            package_variants = family_data["package_variants"]
-            option_code = None
-            for variant in package_variants:
-                if variant["name"] == selected_bm["variant_name"]:
-                    selected_variant = variant
-                    
-                    package_options = selected_variant["package_options"]
-                    for option in package_options:
-                        if option["order"] == selected_bm["order"]:
-                            selected_option = option
-                            option_code = selected_option["package_option_code"]
-                            break
+            # Usually already resolved in the background
+            option_code = HotResolverInstance.option_code(subscription_type, selected_bm)
+            if option_code is None:
+                family_data = get_family(api_key, tokens, family_code, is_enterprise, None, subscription_type)
+                if not family_data:
+                    print("Gagal mengambil data family.")
+                    pause()
+                    continue
+                
+                option_code = find_option_code(family_data, selected_bm)
             
             if option_code:
                 print(f"{option_code}")
@@ -73,6 +73,7 @@ def show_hot_menu():
 def show_hot_menu2():
     api_key = AuthInstance.api_key
     tokens = AuthInstance.get_active_tokens()
+    subscription_type = (AuthInstance.active_user or {}).get("subscription_type", "")
     
     in_bookmark_menu = True
     while in_bookmark_menu:
@@ -82,10 +83,7 @@ def show_hot_menu2():
         print("🔥 Paket  Hot 2 🔥".center(WIDTH))
         print("=" * WIDTH)
         
-        hot_packages = []
-        
-        with open("hot_data/hot2.json", "r", encoding="utf-8") as f:
-            hot_packages = json.load(f)
+        hot_packages = HotCatalogInstance.hot2()
 
         for idx, p in enumerate(hot_packages):
             print(f"{idx + 1}. {p['name']}\n   Harga: {p['price']}")
@@ -105,36 +103,13 @@ def show_hot_menu2():
                 pause()
                 continue
             
-            payment_items = []
-            for package in packages:
-                package_detail = get_package_details(
-                    api_key,
-                    tokens,
-                    package["family_code"],
-                    package["variant_code"],
-                    package["order"],
-                    package["is_enterprise"],
-                    package["migration_type"],
-                )
-                
-                if package == packages[0]:
-                    main_package_detail = package_detail
-                
-                # Force failed when one of the package detail is None
-                if not package_detail:
-                    print(f"Gagal mengambil detail paket untuk {package['family_code']}.")
-                    return None
-                
-                payment_items.append(
-                    PaymentItem(
-                        item_code=package_detail["package_option"]["package_option_code"],
-                        product_type="",
-                        item_price=package_detail["package_option"]["price"],
-                        item_name=package_detail["package_option"]["name"],
-                        tax=0,
-                        token_confirmation=package_detail["token_confirmation"],
-                    )
-                )
+            package_details = get_bundle_details(api_key, tokens, packages, subscription_type)
+            # Force failed when one of the package detail is None
+            if not package_details:
+                return None
+            
+            main_package_detail = package_details[0]
+            payment_items = [to_payment_item(detail) for detail in package_details]
             
             clear_screen()
             print("=" * WIDTH)
@@ -228,44 +203,53 @@ def show_hot_menu2():
                             in_payment_menu = False
                             continue
 
-                    settlement_balance(
-                        api_key,
-                        tokens,
-                        payment_items,
-                        payment_for,
-                        ask_overwrite,
-                        overwrite_amount=overwrite_amount,
-                        token_confirmation_idx=token_confirmation_idx,
-                        amount_idx=amount_idx,
-                    )
+                    amount = purchase_amount(payment_items, ask_overwrite, overwrite_amount, amount_idx)
+                    with span("cli.purchase.hot2.balance", **{"xl.option_code": payment_items[0]["item_code"]}):
+                        settlement_balance(
+                            api_key,
+                            tokens,
+                            payment_items,
+                            payment_for,
+                            False,
+                            overwrite_amount=amount,
+                            token_confirmation_idx=token_confirmation_idx,
+                            amount_idx=amount_idx,
+                        )
                     input("Tekan enter untuk kembali...")
                     in_payment_menu = False
                     in_bookmark_menu = False
                 elif input_method == "2":
-                    show_multipayment(
-                        api_key,
-                        tokens,
-                        payment_items,
-                        payment_for,
-                        ask_overwrite,
-                        overwrite_amount,
-                        token_confirmation_idx,
-                        amount_idx,
-                    )
+                    payment_method, wallet_number = choose_multipayment_method()
+                    amount = purchase_amount(payment_items, ask_overwrite, overwrite_amount, amount_idx)
+                    with span("cli.purchase.hot2.ewallet", **{"xl.option_code": payment_items[0]["item_code"]}):
+                        show_multipayment(
+                            api_key,
+                            tokens,
+                            payment_items,
+                            payment_for,
+                            False,
+                            amount,
+                            token_confirmation_idx,
+                            amount_idx,
+                            payment_method=payment_method,
+                            wallet_number=wallet_number,
+                        )
                     input("Tekan enter untuk kembali...")
                     in_payment_menu = False
                     in_bookmark_menu = False
                 elif input_method == "3":
-                    show_qris_payment(
-                        api_key,
-                        tokens,
-                        payment_items,
-                        payment_for,
-                        ask_overwrite,
-                        overwrite_amount,
-                        token_confirmation_idx,
-                        amount_idx,
-                    )
+                    amount = purchase_amount(payment_items, ask_overwrite, overwrite_amount, amount_idx)
+                    with span("cli.purchase.hot2.qris", **{"xl.option_code": payment_items[0]["item_code"]}):
+                        show_qris_payment(
+                            api_key,
+                            tokens,
+                            payment_items,
+                            payment_for,
+                            False,
+                            amount,
+                            token_confirmation_idx,
+                            amount_idx,
+                        )
 
                     input("Tekan enter untuk kembali...")
                     in_payment_menu = False
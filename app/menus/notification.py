@@ -1,6 +1,8 @@
+import json
 from app.menus.util import clear_screen
-from app.client.engsel import get_notification_detail, dashboard_segments
+from app.client.engsel import dashboard_segments
 from app.service.auth import AuthInstance
+from app.service.notifications import get_detail, mark_all_read
 
 WIDTH = 55
 
@@ -47,17 +49,36 @@ def show_notification_menu():
         print(f"Total notifications: {len(notifications)} | Unread: {unread_count}")
         print("=" * WIDTH)
         print("1. Read All Unread Notifications")
+        print("o <number>. Open notification detail (e.g., o 2)")
         print("00. Back to Main Menu")
         print("=" * WIDTH)
         choice = input("Enter your choice: ")
         if choice == "1":
-            for notification in notifications:
-                if notification.get("is_read", False):
-                    continue
-                notification_id = notification.get("notification_id")
-                detail = get_notification_detail(api_key, tokens, notification_id)
-                if detail:
-                    print(f"Mark as READ notification ID: {notification_id}")
+            def progress(done, total, notification_id, ok):
+                if ok:
+                    print(f"[{done}/{total}] Mark as READ notification ID: {notification_id}")
+                else:
+                    print(f"[{done}/{total}] Failed notification ID: {notification_id}")
+
+            results = mark_all_read(api_key, tokens, notifications, progress)
+            marked = sum(1 for detail in results.values() if detail)
+            print(f"Marked {marked}/{len(results)} notifications as read.")
+            input("Press Enter to return to the notification menu...")
+        elif choice.startswith("o "):
+            try:
+                notification_number = int(choice.split(" ")[1])
+            except ValueError:
+                notification_number = 0
+            if notification_number < 1 or notification_number > len(notifications):
+                print("Invalid notification number.")
+                input("Press Enter to continue...")
+                continue
+            notification = notifications[notification_number - 1]
+            detail = get_detail(api_key, tokens, notification.get("notification_id"))
+            if detail:
+                print(json.dumps(detail.get("data", {}), indent=2))
+            else:
+                print("Failed to fetch notification detail.")
             input("Press Enter to return to the notification menu...")
         elif choice == "00":
             in_notification_menu = False
@@ -3,18 +3,29 @@ import sys
 
 import requests
 from app.service.auth import AuthInstance
-from app.client.engsel import get_family, get_package, get_addons, get_package_details, send_api_request, unsubscribe
+from app.client.engsel import get_family, get_package, get_addons, get_package_details, get_family_codes, send_api_request, unsubscribe
 from app.client.ciam import get_auth_code
 from app.service.bookmark import BookmarkInstance
 from app.client.purchase.redeem import settlement_bounty, settlement_loyalty, bounty_allotment
-from app.menus.util import clear_screen, pause, display_html
+from app.menus.util import clear_screen, pause, display_html, ask_amount
 from app.client.purchase.qris import show_qris_payment
-from app.client.purchase.ewallet import show_multipayment
+from app.client.purchase.ewallet import choose_multipayment_method, show_multipayment
 from app.client.purchase.balance import settlement_balance
 from app.type_dict import PaymentItem
 from app.menus.purchase import purchase_n_times, purchase_n_times_by_option_code
 from app.menus.util import format_quota_byte
 from app.service.decoy import DecoyInstance
+from app.service.tracing import span
+
+def fresh_payment_items(api_key: str, tokens: dict, package_option_code: str, payment_items: list[PaymentItem]) -> list[PaymentItem] | None:
+    """payment_items with the token_confirmation of a get_package made right
+    before paying, the one shown on the detail page may be minutes old"""
+    package = get_package(api_key, tokens, package_option_code)
+    if not package:
+        print("Failed to load package details.")
+        return None
+    first = PaymentItem(**{**payment_items[0], "token_confirmation": package["token_confirmation"]})
+    return [first] + payment_items[1:]
 
 def show_package_details(api_key, tokens, package_option_code, is_enterprise, option_order = -1):
     active_user = AuthInstance.active_user
@@ -188,235 +199,274 @@ def show_package_details(api_key, tokens, package_option_code, is_enterprise, op
             pause()
             continue
         
+        # Prompts come first, the trace covers get_package through settlement only
         elif choice == '1':
-            settlement_balance(
-                api_key,
-                tokens,
-                payment_items,
-                payment_for,
-                True
-            )
+            amount = ask_amount(payment_items[-1]["item_price"])
+            with span("cli.purchase.balance", **{"xl.option_code": package_option_code}):
+                items = fresh_payment_items(api_key, tokens, package_option_code, payment_items)
+                if items:
+                    settlement_balance(
+                        api_key,
+                        tokens,
+                        items,
+                        payment_for,
+                        False,
+                        amount
+                    )
             input("Silahkan cek hasil pembelian di aplikasi MyXL. Tekan Enter untuk kembali.")
             return True
         elif choice == '2':
-            show_multipayment(
-                api_key,
-                tokens,
-                payment_items,
-                payment_for,
-                True,
-            )
+            payment_method, wallet_number = choose_multipayment_method()
+            amount = ask_amount(payment_items[-1]["item_price"])
+            with span("cli.purchase.ewallet", **{"xl.option_code": package_option_code}):
+                items = fresh_payment_items(api_key, tokens, package_option_code, payment_items)
+                if items:
+                    show_multipayment(
+                        api_key,
+                        tokens,
+                        items,
+                        payment_for,
+                        False,
+                        amount,
+                        payment_method=payment_method,
+                        wallet_number=wallet_number,
+                    )
             input("Silahkan lakukan pembayaran & cek hasil pembelian di aplikasi MyXL. Tekan Enter untuk kembali.")
             return True
         elif choice == '3':
-            show_qris_payment(
-                api_key,
-                tokens,
-                payment_items,
-                payment_for,
-                True,
-            )
+            amount = ask_amount(payment_items[-1]["item_price"])
+            with span("cli.purchase.qris", **{"xl.option_code": package_option_code}):
+                items = fresh_payment_items(api_key, tokens, package_option_code, payment_items)
+                if items:
+                    show_qris_payment(
+                        api_key,
+                        tokens,
+                        items,
+                        payment_for,
+                        False,
+                        amount,
+                    )
             input("Silahkan lakukan pembayaran & cek hasil pembelian di aplikasi MyXL. Tekan Enter untuk kembali.")
             return True
         elif choice == '4':
             # Balance with Decoy            
-            decoy = DecoyInstance.get_decoy("balance")
-            
-            decoy_package_detail = get_package(
-                api_key,
-                tokens,
-                decoy["option_code"],
-            )
+            with span("cli.purchase.decoy.balance", **{"xl.option_code": package_option_code}) as purchase_span:
+                decoy = DecoyInstance.get_decoy("balance")
             
-            if not decoy_package_detail:
-                print("Failed to load decoy package details.")
-                pause()
-                return False
-
-            payment_items.append(
-                PaymentItem(
-                    item_code=decoy_package_detail["package_option"]["package_option_code"],
-                    product_type="",
-                    item_price=decoy_package_detail["package_option"]["price"],
-                    item_name=decoy_package_detail["package_option"]["name"],
-                    tax=0,
-                    token_confirmation=decoy_package_detail["token_confirmation"],
+                decoy_package_detail = get_package(
+                    api_key,
+                    tokens,
+                    decoy["option_code"],
                 )
-            )
-
-            overwrite_amount = price + decoy_package_detail["package_option"]["price"]
-            res = settlement_balance(
-                api_key,
-                tokens,
-                payment_items,
-                payment_for,
-                False,
-                overwrite_amount=overwrite_amount,
-            )
             
-            if res and res.get("status", "") != "SUCCESS":
-                error_msg = res.get("message", "Unknown error")
-                if "Bizz-err.Amount.Total" in error_msg:
-                    error_msg_arr = error_msg.split("=")
-                    valid_amount = int(error_msg_arr[1].strip())
-                    
-                    print(f"Adjusted total amount to: {valid_amount}")
+                if decoy_package_detail:
+                    payment_items.append(
+                        PaymentItem(
+                            item_code=decoy_package_detail["package_option"]["package_option_code"],
+                            product_type="",
+                            item_price=decoy_package_detail["package_option"]["price"],
+                            item_name=decoy_package_detail["package_option"]["name"],
+                            tax=0,
+                            token_confirmation=decoy_package_detail["token_confirmation"],
+                        )
+                    )
+
+                    overwrite_amount = price + decoy_package_detail["package_option"]["price"]
                     res = settlement_balance(
                         api_key,
                         tokens,
                         payment_items,
                         payment_for,
                         False,
-                        overwrite_amount=valid_amount,
+                        overwrite_amount=overwrite_amount,
                     )
-                    if res and res.get("status", "") == "SUCCESS":
+            
+                    if res and res.get("status", "") != "SUCCESS":
+                        error_msg = res.get("message", "Unknown error")
+                        if "Bizz-err.Amount.Total" in error_msg:
+                            error_msg_arr = error_msg.split("=")
+                            valid_amount = int(error_msg_arr[1].strip())
+                    
+                            print(f"Adjusted total amount to: {valid_amount}")
+                            res = settlement_balance(
+                                api_key,
+                                tokens,
+                                payment_items,
+                                payment_for,
+                                False,
+                                overwrite_amount=valid_amount,
+                            )
+                            if res and res.get("status", "") == "SUCCESS":
+                                print("Purchase successful!")
+                    else:
                         print("Purchase successful!")
-            else:
-                print("Purchase successful!")
+                else:
+                    purchase_span.set_status("ERROR")
+
+            if not decoy_package_detail:
+                print("Failed to load decoy package details.")
+                pause()
+                return False
             pause()
             return True
         elif choice == '5':
             # Balance with Decoy v2 (use token confirmation from decoy)
-            decoy = DecoyInstance.get_decoy("balance")
-            
-            decoy_package_detail = get_package(
-                api_key,
-                tokens,
-                decoy["option_code"],
-            )
+            with span("cli.purchase.decoy_v2.balance", **{"xl.option_code": package_option_code}) as purchase_span:
+                decoy = DecoyInstance.get_decoy("balance")
             
-            if not decoy_package_detail:
-                print("Failed to load decoy package details.")
-                pause()
-                return False
-
-            payment_items.append(
-                PaymentItem(
-                    item_code=decoy_package_detail["package_option"]["package_option_code"],
-                    product_type="",
-                    item_price=decoy_package_detail["package_option"]["price"],
-                    item_name=decoy_package_detail["package_option"]["name"],
-                    tax=0,
-                    token_confirmation=decoy_package_detail["token_confirmation"],
+                decoy_package_detail = get_package(
+                    api_key,
+                    tokens,
+                    decoy["option_code"],
                 )
-            )
-
-            overwrite_amount = price + decoy_package_detail["package_option"]["price"]
-            res = settlement_balance(
-                api_key,
-                tokens,
-                payment_items,
-                "🤫",
-                False,
-                overwrite_amount=overwrite_amount,
-                token_confirmation_idx=1
-            )
             
-            if res and res.get("status", "") != "SUCCESS":
-                error_msg = res.get("message", "Unknown error")
-                if "Bizz-err.Amount.Total" in error_msg:
-                    error_msg_arr = error_msg.split("=")
-                    valid_amount = int(error_msg_arr[1].strip())
-                    
-                    print(f"Adjusted total amount to: {valid_amount}")
+                if decoy_package_detail:
+                    payment_items.append(
+                        PaymentItem(
+                            item_code=decoy_package_detail["package_option"]["package_option_code"],
+                            product_type="",
+                            item_price=decoy_package_detail["package_option"]["price"],
+                            item_name=decoy_package_detail["package_option"]["name"],
+                            tax=0,
+                            token_confirmation=decoy_package_detail["token_confirmation"],
+                        )
+                    )
+
+                    overwrite_amount = price + decoy_package_detail["package_option"]["price"]
                     res = settlement_balance(
                         api_key,
                         tokens,
                         payment_items,
                         "🤫",
                         False,
-                        overwrite_amount=valid_amount,
-                        token_confirmation_idx=-1
+                        overwrite_amount=overwrite_amount,
+                        token_confirmation_idx=1
                     )
-                    if res and res.get("status", "") == "SUCCESS":
+            
+                    if res and res.get("status", "") != "SUCCESS":
+                        error_msg = res.get("message", "Unknown error")
+                        if "Bizz-err.Amount.Total" in error_msg:
+                            error_msg_arr = error_msg.split("=")
+                            valid_amount = int(error_msg_arr[1].strip())
+                    
+                            print(f"Adjusted total amount to: {valid_amount}")
+                            res = settlement_balance(
+                                api_key,
+                                tokens,
+                                payment_items,
+                                "🤫",
+                                False,
+                                overwrite_amount=valid_amount,
+                                token_confirmation_idx=-1
+                            )
+                            if res and res.get("status", "") == "SUCCESS":
+                                print("Purchase successful!")
+                    else:
                         print("Purchase successful!")
-            else:
-                print("Purchase successful!")
+                else:
+                    purchase_span.set_status("ERROR")
+
+            if not decoy_package_detail:
+                print("Failed to load decoy package details.")
+                pause()
+                return False
             pause()
             return True
         elif choice == '6':
             # QRIS decoy + Rpx
             decoy = DecoyInstance.get_decoy("qris")
-            
-            decoy_package_detail = get_package(
-                api_key,
-                tokens,
-                decoy["option_code"],
-            )
-            
-            if not decoy_package_detail:
-                print("Failed to load decoy package details.")
-                pause()
-                return False
 
-            payment_items.append(
-                PaymentItem(
-                    item_code=decoy_package_detail["package_option"]["package_option_code"],
-                    product_type="",
-                    item_price=decoy_package_detail["package_option"]["price"],
-                    item_name=decoy_package_detail["package_option"]["name"],
-                    tax=0,
-                    token_confirmation=decoy_package_detail["token_confirmation"],
-                )
-            )
-            
             print("-"*55)
             print(f"Harga Paket Utama: Rp {price}")
-            print(f"Harga Paket Decoy: Rp {decoy_package_detail['package_option']['price']}")
+            print(f"Harga Paket Decoy: Rp {decoy['price']}")
             print("Silahkan sesuaikan amount (trial & error, 0 = malformed)")
             print("-"*55)
+            amount = ask_amount(decoy["price"])
 
-            show_qris_payment(
-                api_key,
-                tokens,
-                payment_items,
-                "SHARE_PACKAGE",
-                True,
-                token_confirmation_idx=1
-            )
-            
-            input("Silahkan lakukan pembayaran & cek hasil pembelian di aplikasi MyXL. Tekan Enter untuk kembali.")
-            return True
-        elif choice == '7':
-            # QRIS decoy + Rp0
-            decoy = DecoyInstance.get_decoy("qris0")
+            with span("cli.purchase.decoy.qris", **{"xl.option_code": package_option_code}) as purchase_span:
+                decoy_package_detail = get_package(
+                    api_key,
+                    tokens,
+                    decoy["option_code"],
+                )
             
-            decoy_package_detail = get_package(
-                api_key,
-                tokens,
-                decoy["option_code"],
-            )
+                if decoy_package_detail:
+                    payment_items.append(
+                        PaymentItem(
+                            item_code=decoy_package_detail["package_option"]["package_option_code"],
+                            product_type="",
+                            item_price=decoy_package_detail["package_option"]["price"],
+                            item_name=decoy_package_detail["package_option"]["name"],
+                            tax=0,
+                            token_confirmation=decoy_package_detail["token_confirmation"],
+                        )
+                    )
             
+                    show_qris_payment(
+                        api_key,
+                        tokens,
+                        payment_items,
+                        "SHARE_PACKAGE",
+                        False,
+                        amount,
+                        token_confirmation_idx=1
+                    )
+                else:
+                    purchase_span.set_status("ERROR")
+
             if not decoy_package_detail:
                 print("Failed to load decoy package details.")
                 pause()
                 return False
-
-            payment_items.append(
-                PaymentItem(
-                    item_code=decoy_package_detail["package_option"]["package_option_code"],
-                    product_type="",
-                    item_price=decoy_package_detail["package_option"]["price"],
-                    item_name=decoy_package_detail["package_option"]["name"],
-                    tax=0,
-                    token_confirmation=decoy_package_detail["token_confirmation"],
-                )
-            )
             
+            input("Silahkan lakukan pembayaran & cek hasil pembelian di aplikasi MyXL. Tekan Enter untuk kembali.")
+            return True
+        elif choice == '7':
+            # QRIS decoy + Rp0
+            decoy = DecoyInstance.get_decoy("qris0")
+
             print("-"*55)
             print(f"Harga Paket Utama: Rp {price}")
-            print(f"Harga Paket Decoy: Rp {decoy_package_detail['package_option']['price']}")
+            print(f"Harga Paket Decoy: Rp {decoy['price']}")
             print("Silahkan sesuaikan amount (trial & error, 0 = malformed)")
             print("-"*55)
+            amount = ask_amount(decoy["price"])
 
-            show_qris_payment(
-                api_key,
-                tokens,
-                payment_items,
-                "SHARE_PACKAGE",
-                True,
-                token_confirmation_idx=1
-            )
+            with span("cli.purchase.decoy.qris0", **{"xl.option_code": package_option_code}) as purchase_span:
+                decoy_package_detail = get_package(
+                    api_key,
+                    tokens,
+                    decoy["option_code"],
+                )
+            
+                if decoy_package_detail:
+                    payment_items.append(
+                        PaymentItem(
+                            item_code=decoy_package_detail["package_option"]["package_option_code"],
+                            product_type="",
+                            item_price=decoy_package_detail["package_option"]["price"],
+                            item_name=decoy_package_detail["package_option"]["name"],
+                            tax=0,
+                            token_confirmation=decoy_package_detail["token_confirmation"],
+                        )
+                    )
+            
+                    show_qris_payment(
+                        api_key,
+                        tokens,
+                        payment_items,
+                        "SHARE_PACKAGE",
+                        False,
+                        amount,
+                        token_confirmation_idx=1
+                    )
+                else:
+                    purchase_span.set_status("ERROR")
+
+            if not decoy_package_detail:
+                print("Failed to load decoy package details.")
+                pause()
+                return False
             
             input("Silahkan lakukan pembayaran & cek hasil pembelian di aplikasi MyXL. Tekan Enter untuk kembali.")
             return True
@@ -500,13 +550,15 @@ def get_packages_by_family(
         return None
     
     packages = []
+    subscription_type = (AuthInstance.active_user or {}).get("subscription_type", "")
     
     data = get_family(
         api_key,
         tokens,
         family_code,
         is_enterprise,
-        migration_type
+        migration_type,
+        subscription_type
     )
     
     if not data:
@@ -619,6 +671,7 @@ def fetch_my_packages():
             return None
         
         quotas = res["data"]["quotas"]
+        family_codes = get_family_codes(api_key, tokens, [quota["quota_code"] for quota in quotas])
         
         clear_screen()
         print("=======================================================")
@@ -631,7 +684,7 @@ def fetch_my_packages():
             group_code = quota["group_code"]
             group_name = quota["group_name"]
             quota_name = quota["name"]
-            family_code = "N/A"
+            family_code = family_codes.get(quota_code, "N/A")
             
             product_subscription_type = quota.get("product_subscription_type", "")
             product_domain = quota.get("product_domain", "")
@@ -667,11 +720,6 @@ def fetch_my_packages():
                     benefit_infos.append(benefit_info)
                 
             
-            print(f"fetching package no. {num} details...")
-            package_details = get_package(api_key, tokens, quota_code)
-            if package_details:
-                family_code = package_details["package_family"]["package_family_code"]
-            
             print("=======================================================")
             print(f"Package {num}")
             print(f"Name: {quota_name}")
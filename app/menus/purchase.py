@@ -6,6 +6,7 @@ from app.service.auth import AuthInstance
 from app.service.decoy import DecoyInstance
 from app.type_dict import PaymentItem
 from app.client.purchase.balance import settlement_balance
+from app.service.tracing import span
 
 # Purchase
 def purchase_by_family(
@@ -44,7 +45,7 @@ def purchase_by_family(
             pause()
             return None
     
-    family_data = get_family(api_key, tokens, family_code)
+    family_data = get_family(api_key, tokens, family_code, None, None, subscription_type)
     if not family_data:
         print(f"Failed to get family data for code: {family_code}.")
         pause()
@@ -64,6 +65,7 @@ def purchase_by_family(
     if start_from_option <= 1:
         start_buying = True
 
+    decoy_failed = False
     for variant in variants:
         variant_name = variant["name"]
         for option in variant["package_options"]:
@@ -82,127 +84,131 @@ def purchase_by_family(
             print(f"Pruchase {purchase_count} of {packages_count}...")
             print(f"Trying to buy: {variant_name} - {option_order}. {option_name} - {option['price']}")
             
-            payment_items = []
+            purchased = len(successful_purchases)
+            with span("cli.purchase.family", **{"xl.family_code": family_code, "xl.option_order": option_order}) as purchase_span:
+                payment_items = []
             
-            try:
-                if use_decoy:                
-                    decoy = DecoyInstance.get_decoy("balance")
+                try:
+                    if use_decoy:                
+                        decoy = DecoyInstance.get_decoy("balance")
                     
-                    decoy_package_detail = get_package(
+                        decoy_package_detail = get_package(
+                            api_key,
+                            tokens,
+                            decoy["option_code"],
+                        )
+                    
+                        if not decoy_package_detail:
+                            print("Failed to load decoy package details.")
+                            purchase_span.set_status("ERROR")
+                            decoy_failed = True
+                            break
+                
+                    target_package_detail = get_package_details(
                         api_key,
                         tokens,
-                        decoy["option_code"],
+                        family_code,
+                        variant["package_variant_code"],
+                        option["order"],
+                        None,
+                        None,
+                        subscription_type,
                     )
-                    
-                    if not decoy_package_detail:
-                        print("Failed to load decoy package details.")
-                        pause()
-                        return False
-                
-                target_package_detail = get_package_details(
-                    api_key,
-                    tokens,
-                    family_code,
-                    variant["package_variant_code"],
-                    option["order"],
-                    None,
-                    None,
-                )
-            except Exception as e:
-                print(f"Exception occurred while fetching package details: {e}")
-                print(f"Failed to get package details for {variant_name} - {option_name}. Skipping.")
-                continue
+                except Exception as e:
+                    print(f"Exception occurred while fetching package details: {e}")
+                    print(f"Failed to get package details for {variant_name} - {option_name}. Skipping.")
+                    continue
             
-            payment_items.append(
-                PaymentItem(
-                    item_code=target_package_detail["package_option"]["package_option_code"],
-                    product_type="",
-                    item_price=target_package_detail["package_option"]["price"],
-                    item_name=str(randint(1000, 9999)) + " " + target_package_detail["package_option"]["name"],
-                    tax=0,
-                    token_confirmation=target_package_detail["token_confirmation"],
-                )
-            )
-            
-            if use_decoy:
                 payment_items.append(
                     PaymentItem(
-                        item_code=decoy_package_detail["package_option"]["package_option_code"],
+                        item_code=target_package_detail["package_option"]["package_option_code"],
                         product_type="",
-                        item_price=decoy_package_detail["package_option"]["price"],
-                        item_name=str(randint(1000, 9999)) + " " + decoy_package_detail["package_option"]["name"],
+                        item_price=target_package_detail["package_option"]["price"],
+                        item_name=str(randint(1000, 9999)) + " " + target_package_detail["package_option"]["name"],
                         tax=0,
-                        token_confirmation=decoy_package_detail["token_confirmation"],
+                        token_confirmation=target_package_detail["token_confirmation"],
                     )
                 )
             
-            res = None
+                if use_decoy:
+                    payment_items.append(
+                        PaymentItem(
+                            item_code=decoy_package_detail["package_option"]["package_option_code"],
+                            product_type="",
+                            item_price=decoy_package_detail["package_option"]["price"],
+                            item_name=str(randint(1000, 9999)) + " " + decoy_package_detail["package_option"]["name"],
+                            tax=0,
+                            token_confirmation=decoy_package_detail["token_confirmation"],
+                        )
+                    )
             
-            overwrite_amount = target_package_detail["package_option"]["price"]
-            if use_decoy or overwrite_amount == 0:
-                overwrite_amount += decoy_package_detail["package_option"]["price"]
+                res = None
+            
+                overwrite_amount = target_package_detail["package_option"]["price"]
+                if use_decoy or overwrite_amount == 0:
+                    overwrite_amount += decoy_package_detail["package_option"]["price"]
                 
-            error_msg = ""
+                error_msg = ""
 
-            try:
-                res = settlement_balance(
-                    api_key,
-                    tokens,
-                    payment_items,
-                    "🤑",
-                    False,
-                    overwrite_amount=overwrite_amount,
-                    token_confirmation_idx=1
-                )
+                try:
+                    res = settlement_balance(
+                        api_key,
+                        tokens,
+                        payment_items,
+                        "🤑",
+                        False,
+                        overwrite_amount=overwrite_amount,
+                        token_confirmation_idx=1
+                    )
                 
-                if res and res.get("status", "") != "SUCCESS":
-                    error_msg = res.get("message", "")
-                    if "Bizz-err.Amount.Total" in error_msg:
-                        error_msg_arr = error_msg.split("=")
-                        valid_amount = int(error_msg_arr[1].strip())
+                    if res and res.get("status", "") != "SUCCESS":
+                        error_msg = res.get("message", "")
+                        if "Bizz-err.Amount.Total" in error_msg:
+                            error_msg_arr = error_msg.split("=")
+                            valid_amount = int(error_msg_arr[1].strip())
                         
-                        print(f"Adjusted total amount to: {valid_amount}")
-                        res = settlement_balance(
-                            api_key,
-                            tokens,
-                            payment_items,
-                            "SHARE_PACKAGE",
-                            False,
-                            overwrite_amount=valid_amount,
-                            token_confirmation_idx=-1
-                        )
-                        if res and res.get("status", "") == "SUCCESS":
-                            error_msg = ""
-                            successful_purchases.append(
-                                f"{variant_name}|{option_order}. {option_name} - {option_price}"
+                            print(f"Adjusted total amount to: {valid_amount}")
+                            res = settlement_balance(
+                                api_key,
+                                tokens,
+                                payment_items,
+                                "SHARE_PACKAGE",
+                                False,
+                                overwrite_amount=valid_amount,
+                                token_confirmation_idx=-1
                             )
+                            if res and res.get("status", "") == "SUCCESS":
+                                error_msg = ""
+                                successful_purchases.append(
+                                    f"{variant_name}|{option_order}. {option_name} - {option_price}"
+                                )
                             
-                            if pause_on_success:
                                 print("Purchase successful!")
-                                pause()
                             else:
-                                print("Purchase successful!")
-                        else:
-                            error_msg = res.get("message", "")
-                else:
-                    successful_purchases.append(
-                        f"{variant_name}|{option_order}. {option_name} - {option_price}"
-                    )
-                    if pause_on_success:
-                        print("Purchase successful!")
-                        pause()
+                                error_msg = res.get("message", "")
                     else:
+                        successful_purchases.append(
+                            f"{variant_name}|{option_order}. {option_name} - {option_price}"
+                        )
                         print("Purchase successful!")
 
-            except Exception as e:
-                print(f"Exception occurred while creating order: {e}")
-                res = None
+                except Exception as e:
+                    print(f"Exception occurred while creating order: {e}")
+                    res = None
+            if pause_on_success and len(successful_purchases) > purchased:
+                pause()
             print("-------------------------------------------------------")
             should_delay = error_msg == "" or "Failed call ipaas purchase" in error_msg
             if delay_seconds > 0 and should_delay:
                 print(f"Waiting for {delay_seconds} seconds before next purchase...")
                 time.sleep(delay_seconds)
+        if decoy_failed:
+            break
                 
+    if decoy_failed:
+        pause()
+        return False
+
     print(f"Family: {family_name}\nSuccessful: {len(successful_purchases)}")
     if len(successful_purchases) > 0:
         print("-" * 55)
@@ -251,7 +257,7 @@ def purchase_n_times(
             pause()
             return None
     
-    family_data = get_family(api_key, tokens, family_code)
+    family_data = get_family(api_key, tokens, family_code, None, None, subscription_type)
     if not family_data:
         print(f"Failed to get family data for code: {family_code}.")
         pause()
@@ -281,6 +287,7 @@ def purchase_n_times(
     print("-------------------------------------------------------")
     successful_purchases = []
     
+    decoy_failed = False
     for i in range(n):
         print(f"Pruchase {i + 1} of {n}...")
         print(f"Trying to buy: {target_variant['name']} - {option_order}. {option_name} - {option_price}")
@@ -288,121 +295,123 @@ def purchase_n_times(
         api_key = AuthInstance.api_key
         tokens: dict = AuthInstance.get_active_tokens() or {}
         
-        payment_items = []
+        purchased = len(successful_purchases)
+        with span("cli.purchase.n_times", **{"xl.family_code": family_code, "xl.option_order": option_order, "xl.attempt": i + 1}) as purchase_span:
+            payment_items = []
         
-        try:
-            if use_decoy:
-                decoy = DecoyInstance.get_decoy("balance")
+            try:
+                if use_decoy:
+                    decoy = DecoyInstance.get_decoy("balance")
+                
+                    decoy_package_detail = get_package(
+                        api_key,
+                        tokens,
+                        decoy["option_code"],
+                    )
                 
-                decoy_package_detail = get_package(
+                    if not decoy_package_detail:
+                        print("Failed to load decoy package details.")
+                        purchase_span.set_status("ERROR")
+                        decoy_failed = True
+                        break
+            
+                target_package_detail = get_package_details(
                     api_key,
                     tokens,
-                    decoy["option_code"],
+                    family_code,
+                    target_variant["package_variant_code"],
+                    target_option["order"],
+                    None,
+                    None,
+                    subscription_type,
                 )
-                
-                if not decoy_package_detail:
-                    print("Failed to load decoy package details.")
-                    pause()
-                    return False
-            
-            target_package_detail = get_package_details(
-                api_key,
-                tokens,
-                family_code,
-                target_variant["package_variant_code"],
-                target_option["order"],
-                None,
-                None,
-            )
-        except Exception as e:
-            print(f"Exception occurred while fetching package details: {e}")
-            print(f"Failed to get package details for {target_variant['name']} - {option_name}. Skipping.")
-            continue
-        
-        payment_items.append(
-            PaymentItem(
-                item_code=target_package_detail["package_option"]["package_option_code"],
-                product_type="",
-                item_price=target_package_detail["package_option"]["price"],
-                item_name=str(randint(1000, 9999)) + " " + target_package_detail["package_option"]["name"],
-                tax=0,
-                token_confirmation=target_package_detail["token_confirmation"],
-            )
-        )
+            except Exception as e:
+                print(f"Exception occurred while fetching package details: {e}")
+                print(f"Failed to get package details for {target_variant['name']} - {option_name}. Skipping.")
+                continue
         
-        if use_decoy:
             payment_items.append(
                 PaymentItem(
-                    item_code=decoy_package_detail["package_option"]["package_option_code"],
+                    item_code=target_package_detail["package_option"]["package_option_code"],
                     product_type="",
-                    item_price=decoy_package_detail["package_option"]["price"],
-                    item_name=str(randint(1000, 9999)) + " " + decoy_package_detail["package_option"]["name"],
+                    item_price=target_package_detail["package_option"]["price"],
+                    item_name=str(randint(1000, 9999)) + " " + target_package_detail["package_option"]["name"],
                     tax=0,
-                    token_confirmation=decoy_package_detail["token_confirmation"],
+                    token_confirmation=target_package_detail["token_confirmation"],
                 )
             )
         
-        res = None
+            if use_decoy:
+                payment_items.append(
+                    PaymentItem(
+                        item_code=decoy_package_detail["package_option"]["package_option_code"],
+                        product_type="",
+                        item_price=decoy_package_detail["package_option"]["price"],
+                        item_name=str(randint(1000, 9999)) + " " + decoy_package_detail["package_option"]["name"],
+                        tax=0,
+                        token_confirmation=decoy_package_detail["token_confirmation"],
+                    )
+                )
+        
+            res = None
         
-        overwrite_amount = target_package_detail["package_option"]["price"]
-        if use_decoy:
-            overwrite_amount += decoy_package_detail["package_option"]["price"]
+            overwrite_amount = target_package_detail["package_option"]["price"]
+            if use_decoy:
+                overwrite_amount += decoy_package_detail["package_option"]["price"]
 
-        try:
-            res = settlement_balance(
-                api_key,
-                tokens,
-                payment_items,
-                "🤫",
-                False,
-                overwrite_amount=overwrite_amount,
-                token_confirmation_idx=token_confirmation_idx
-            )
+            try:
+                res = settlement_balance(
+                    api_key,
+                    tokens,
+                    payment_items,
+                    "🤫",
+                    False,
+                    overwrite_amount=overwrite_amount,
+                    token_confirmation_idx=token_confirmation_idx
+                )
             
-            if res and res.get("status", "") != "SUCCESS":
-                error_msg = res.get("message", "Unknown error")
-                if "Bizz-err.Amount.Total" in error_msg:
-                    error_msg_arr = error_msg.split("=")
-                    valid_amount = int(error_msg_arr[1].strip())
+                if res and res.get("status", "") != "SUCCESS":
+                    error_msg = res.get("message", "Unknown error")
+                    if "Bizz-err.Amount.Total" in error_msg:
+                        error_msg_arr = error_msg.split("=")
+                        valid_amount = int(error_msg_arr[1].strip())
                     
-                    print(f"Adjusted total amount to: {valid_amount}")
-                    res = settlement_balance(
-                        api_key,
-                        tokens,
-                        payment_items,
-                        "🤫",
-                        False,
-                        overwrite_amount=valid_amount,
-                        token_confirmation_idx=token_confirmation_idx
-                    )
-                    if res and res.get("status", "") == "SUCCESS":
-                        successful_purchases.append(
-                            f"{target_variant['name']}|{option_order}. {option_name} - {option_price}"
+                        print(f"Adjusted total amount to: {valid_amount}")
+                        res = settlement_balance(
+                            api_key,
+                            tokens,
+                            payment_items,
+                            "🤫",
+                            False,
+                            overwrite_amount=valid_amount,
+                            token_confirmation_idx=token_confirmation_idx
                         )
+                        if res and res.get("status", "") == "SUCCESS":
+                            successful_purchases.append(
+                                f"{target_variant['name']}|{option_order}. {option_name} - {option_price}"
+                            )
                         
-                        if pause_on_success:
-                            print("Purchase successful!")
-                            pause()
-                        else:
                             print("Purchase successful!")
-            else:
-                successful_purchases.append(
-                    f"{target_variant['name']}|{option_order}. {option_name} - {option_price}"
-                )
-                if pause_on_success:
-                    print("Purchase successful!")
-                    pause()
                 else:
+                    successful_purchases.append(
+                        f"{target_variant['name']}|{option_order}. {option_name} - {option_price}"
+                    )
                     print("Purchase successful!")
-        except Exception as e:
-            print(f"Exception occurred while creating order: {e}")
-            res = None
+            except Exception as e:
+                print(f"Exception occurred while creating order: {e}")
+                res = None
+        if pause_on_success and len(successful_purchases) > purchased:
+            pause()
         print("-------------------------------------------------------")
 
         if delay_seconds > 0 and i < n - 1:
             print(f"Waiting for {delay_seconds} seconds before next purchase...")
             time.sleep(delay_seconds)
 
+    if decoy_failed:
+        pause()
+        return False
+
     print(f"Total successful purchases {len(successful_purchases)}/{n} for:\nFamily: {family_name}\nVariant: {target_variant['name']}\nOption: {option_order}. {option_name} - {option_price}")
     if len(successful_purchases) > 0:
         print("-------------------------------------------------------")
@@ -452,122 +461,124 @@ def purchase_n_times_by_option_code(
     print("-------------------------------------------------------")
     successful_purchases = []
     
+    decoy_failed = False
     for i in range(n):
         print(f"Pruchase {i + 1} of {n}...")
         
         api_key = AuthInstance.api_key
         tokens: dict = AuthInstance.get_active_tokens() or {}
         
-        payment_items = []
+        purchased = len(successful_purchases)
+        with span("cli.purchase.n_times", **{"xl.option_code": option_code, "xl.attempt": i + 1}) as purchase_span:
+            payment_items = []
         
-        try:
-            if use_decoy:
-                decoy = DecoyInstance.get_decoy("balance")
+            try:
+                if use_decoy:
+                    decoy = DecoyInstance.get_decoy("balance")
+                
+                    decoy_package_detail = get_package(
+                        api_key,
+                        tokens,
+                        decoy["option_code"],
+                    )
                 
-                decoy_package_detail = get_package(
+                    if not decoy_package_detail:
+                        print("Failed to load decoy package details.")
+                        purchase_span.set_status("ERROR")
+                        decoy_failed = True
+                        break
+            
+                target_package_detail = get_package(
                     api_key,
                     tokens,
-                    decoy["option_code"],
+                    option_code,
                 )
-                
-                if not decoy_package_detail:
-                    print("Failed to load decoy package details.")
-                    pause()
-                    return False
-            
-            target_package_detail = get_package(
-                api_key,
-                tokens,
-                option_code,
-            )
-        except Exception as e:
-            print(f"Exception occurred while fetching package details: {e}")
-            continue
-        
-        payment_items.append(
-            PaymentItem(
-                item_code=target_package_detail["package_option"]["package_option_code"],
-                product_type="",
-                item_price=target_package_detail["package_option"]["price"],
-                item_name=str(randint(1000, 9999)) + " " + target_package_detail["package_option"]["name"],
-                tax=0,
-                token_confirmation=target_package_detail["token_confirmation"],
-            )
-        )
+            except Exception as e:
+                print(f"Exception occurred while fetching package details: {e}")
+                continue
         
-        if use_decoy:
             payment_items.append(
                 PaymentItem(
-                    item_code=decoy_package_detail["package_option"]["package_option_code"],
+                    item_code=target_package_detail["package_option"]["package_option_code"],
                     product_type="",
-                    item_price=decoy_package_detail["package_option"]["price"],
-                    item_name=str(randint(1000, 9999)) + " " + decoy_package_detail["package_option"]["name"],
+                    item_price=target_package_detail["package_option"]["price"],
+                    item_name=str(randint(1000, 9999)) + " " + target_package_detail["package_option"]["name"],
                     tax=0,
-                    token_confirmation=decoy_package_detail["token_confirmation"],
+                    token_confirmation=target_package_detail["token_confirmation"],
                 )
             )
         
-        res = None
+            if use_decoy:
+                payment_items.append(
+                    PaymentItem(
+                        item_code=decoy_package_detail["package_option"]["package_option_code"],
+                        product_type="",
+                        item_price=decoy_package_detail["package_option"]["price"],
+                        item_name=str(randint(1000, 9999)) + " " + decoy_package_detail["package_option"]["name"],
+                        tax=0,
+                        token_confirmation=decoy_package_detail["token_confirmation"],
+                    )
+                )
+        
+            res = None
         
-        overwrite_amount = target_package_detail["package_option"]["price"]
-        if use_decoy:
-            overwrite_amount += decoy_package_detail["package_option"]["price"]
+            overwrite_amount = target_package_detail["package_option"]["price"]
+            if use_decoy:
+                overwrite_amount += decoy_package_detail["package_option"]["price"]
 
-        try:
-            res = settlement_balance(
-                api_key,
-                tokens,
-                payment_items,
-                "🤫",
-                False,
-                overwrite_amount=overwrite_amount,
-                token_confirmation_idx=token_confirmation_idx
-            )
+            try:
+                res = settlement_balance(
+                    api_key,
+                    tokens,
+                    payment_items,
+                    "🤫",
+                    False,
+                    overwrite_amount=overwrite_amount,
+                    token_confirmation_idx=token_confirmation_idx
+                )
             
-            if res and res.get("status", "") != "SUCCESS":
-                error_msg = res.get("message", "Unknown error")
-                if "Bizz-err.Amount.Total" in error_msg:
-                    error_msg_arr = error_msg.split("=")
-                    valid_amount = int(error_msg_arr[1].strip())
+                if res and res.get("status", "") != "SUCCESS":
+                    error_msg = res.get("message", "Unknown error")
+                    if "Bizz-err.Amount.Total" in error_msg:
+                        error_msg_arr = error_msg.split("=")
+                        valid_amount = int(error_msg_arr[1].strip())
                     
-                    print(f"Adjusted total amount to: {valid_amount}")
-                    res = settlement_balance(
-                        api_key,
-                        tokens,
-                        payment_items,
-                        "🤫",
-                        False,
-                        overwrite_amount=valid_amount,
-                        token_confirmation_idx=token_confirmation_idx
-                    )
-                    if res and res.get("status", "") == "SUCCESS":
-                        successful_purchases.append(
-                            f"Purchase {i + 1}"
+                        print(f"Adjusted total amount to: {valid_amount}")
+                        res = settlement_balance(
+                            api_key,
+                            tokens,
+                            payment_items,
+                            "🤫",
+                            False,
+                            overwrite_amount=valid_amount,
+                            token_confirmation_idx=token_confirmation_idx
                         )
+                        if res and res.get("status", "") == "SUCCESS":
+                            successful_purchases.append(
+                                f"Purchase {i + 1}"
+                            )
                         
-                        if pause_on_success:
                             print("Purchase successful!")
-                            pause()
-                        else:
-                            print("Purchase successful!")
-            else:
-                successful_purchases.append(
-                    f"Purchase {i + 1}"
-                )
-                if pause_on_success:
-                    print("Purchase successful!")
-                    pause()
                 else:
+                    successful_purchases.append(
+                        f"Purchase {i + 1}"
+                    )
                     print("Purchase successful!")
-        except Exception as e:
-            print(f"Exception occurred while creating order: {e}")
-            res = None
+            except Exception as e:
+                print(f"Exception occurred while creating order: {e}")
+                res = None
+        if pause_on_success and len(successful_purchases) > purchased:
+            pause()
         print("-------------------------------------------------------")
 
         if delay_seconds > 0 and i < n - 1:
             print(f"Waiting for {delay_seconds} seconds before next purchase...")
             time.sleep(delay_seconds)
 
+    if decoy_failed:
+        pause()
+        return False
+
     print(f"Total successful purchases {len(successful_purchases)}/{n}")
     if len(successful_purchases) > 0:
         print("-------------------------------------------------------")
@@ -1,4 +1,4 @@
-from app.client.store.redeemables import get_redeemables
+from app.service.store_cache import cached_redeemables
 from app.service.auth import AuthInstance
 from app.menus.util import clear_screen, pause
 from app.menus.package import show_package_details, get_packages_by_family
@@ -12,9 +12,12 @@ def show_redeemables_menu(is_enterprise: bool = False):
     while in_redeemables_menu:
         api_key = AuthInstance.api_key
         tokens = AuthInstance.get_active_tokens()
+        active_user = AuthInstance.active_user
         
         print("Fetching redeemables...")
-        redeemables_res = get_redeemables(api_key, tokens, is_enterprise)
+        redeemables_res = cached_redeemables(
+            api_key, tokens, active_user["number"], active_user["subscription_type"], is_enterprise
+        )
         if not redeemables_res:
             print("No redeemables found.")
             in_redeemables_menu = False
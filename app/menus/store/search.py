@@ -2,6 +2,7 @@ from app.client.store.search import get_family_list, get_store_packages
 from app.menus.package import get_packages_by_family, show_package_details
 from app.menus.util import clear_screen, pause
 from app.service.auth import AuthInstance
+from app.service.catalog_index import CatalogIndexInstance, catalog_key, search_catalog
 
 WIDTH = 55
 
@@ -70,6 +71,7 @@ def show_store_packages_menu(
             continue
         
         store_packages = store_packages_res.get("data", {}).get("results_price_only", [])
+        CatalogIndexInstance.refresh(catalog_key(subs_type, is_enterprise), store_packages)
         
         clear_screen()
         
@@ -106,11 +108,14 @@ def show_store_packages_menu(
             print(f"   Validity: {validity}")
             print("-" * WIDTH)
         
+        print("99. Search / filter packages")
         print("00. Back to Main Menu")
         print("Input the number to view package details.")
         choice = input("Enter your choice: ")
         if choice == "00":
             in_store_packages_menu = False
+        elif choice == "99":
+            show_catalog_search_menu(subs_type, is_enterprise)
         elif choice in packages:
             selected_package = packages[choice]
             
@@ -131,4 +136,62 @@ def show_store_packages_menu(
                 pause()
         else:
             print("Invalid choice. Please enter a valid package number.")
-            pause()
\ No newline at end of file
+            pause()
+
+def show_catalog_search_menu(
+    subs_type: str = "PREPAID",
+    is_enterprise: bool = False,
+):
+    api_key = AuthInstance.api_key
+    tokens = AuthInstance.get_active_tokens()
+    key = catalog_key(subs_type, is_enterprise)
+    
+    # Queries run against the local index, the store is only fetched when it's stale
+    if CatalogIndexInstance.is_stale(key):
+        print("Fetching store packages...")
+        store_packages_res = get_store_packages(api_key, tokens, subs_type, is_enterprise)
+        if store_packages_res:
+            CatalogIndexInstance.refresh(key, store_packages_res.get("data", {}).get("results_price_only", []))
+    
+    while True:
+        clear_screen()
+        print("=" * WIDTH)
+        print("Search Store Packages:")
+        print("=" * WIDTH)
+        print("Type words from the name, optionally with filters:")
+        print("  harga<50000  harga:10000-30000  gb>=10  hari:7-30")
+        print("Example: combo harga<60000 gb>=20")
+        print("00. Back")
+        query = input("Search: ").strip()
+        if query == "00":
+            return
+        
+        results = search_catalog(key, query, limit=30)
+        
+        print("-" * WIDTH)
+        if not results:
+            print("No matching packages.")
+            pause()
+            continue
+        
+        for i, package in enumerate(results):
+            print(f"{i + 1}. {package['title']}")
+            print(f"   Family: {package['family_name']}")
+            print(f"   Price: Rp{package['price']}")
+            print(f"   Validity: {package['validity'] or 'N/A'}")
+            print("-" * WIDTH)
+        
+        choice = input("Input the number to view package details, enter to search again: ")
+        if not (choice.isdigit() and 1 <= int(choice) <= len(results)):
+            continue
+        
+        selected = results[int(choice) - 1]
+        if selected["action_type"] == "PDP":
+            show_package_details(api_key, tokens, selected["action_param"], is_enterprise)
+        elif selected["action_type"] == "PLP":
+            get_packages_by_family(selected["action_param"])
+        else:
+            print("=" * WIDTH)
+            print("Unhandled Action Type")
+            print(f"Action type: {selected['action_type']}\nParam: {selected['action_param']}")
+            pause()
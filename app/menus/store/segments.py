@@ -1,5 +1,5 @@
 import json
-from app.client.store.segments import get_segments
+from app.service.store_cache import cached_segments
 from app.menus.util import clear_screen, pause
 from app.service.auth import AuthInstance
 from app.menus.package import show_package_details
@@ -11,9 +11,10 @@ def show_store_segments_menu(is_enterprise: bool = False):
     while in_store_segments_menu:
         api_key = AuthInstance.api_key
         tokens = AuthInstance.get_active_tokens()
+        subscription_type = AuthInstance.active_user["subscription_type"]
         
         print("Fetching store segments...")
-        segments_res = get_segments(api_key, tokens, is_enterprise)
+        segments_res = cached_segments(api_key, tokens, subscription_type, is_enterprise)
         if not segments_res:
             print("No segments found.")
             in_store_segments_menu = False
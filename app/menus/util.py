@@ -32,6 +32,18 @@ def clear_screen():
 
     print(ascii_art)
 
+def ask_amount(amount: int) -> int:
+    """The overwrite prompt of the settlement functions, for callers that ask
+    before the purchase starts and pass the result as overwrite_amount"""
+    print(f"Total amount is {amount}.\nEnter new amount if you need to overwrite.")
+    amount_str = input("Press enter to ignore & use default amount: ")
+    if amount_str != "":
+        try:
+            return int(amount_str)
+        except ValueError:
+            print("Invalid overwrite input, using original price.")
+    return amount
+
 def pause():
     input("\nPress enter to continue...")
 
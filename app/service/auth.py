@@ -1,9 +1,10 @@
 import os
-import json
 import time
 from app.client.ciam import get_new_token
 from app.client.engsel import get_profile
+from app.service.dashboard import DashboardInstance
 from app.util import ensure_api_key
+from app.service.token_store import TokenStoreInstance, write_json_atomic
 
 class Auth:
     _instance_ = None
@@ -49,8 +50,7 @@ class Auth:
                 self.load_tokens()
             else:
                 # Create empty file
-                with open("refresh-tokens.json", "w", encoding="utf-8") as f:
-                    json.dump([], f, indent=4)
+                write_json_atomic("refresh-tokens.json", [])
 
             # Select active user from file if available
             self.load_active_number()
@@ -59,18 +59,17 @@ class Auth:
             self._initialized_ = True
             
     def load_tokens(self):
-        with open("refresh-tokens.json", "r", encoding="utf-8") as f:
-            refresh_tokens = json.load(f)
-            
-            if len(refresh_tokens) !=  0:
-                self.refresh_tokens = []
+        refresh_tokens = TokenStoreInstance.load()
+
+        if len(refresh_tokens) !=  0:
+            self.refresh_tokens = []
 
-            # Validate and load tokens
-            for rt in refresh_tokens:
-                if "number" in rt and "refresh_token" in rt:
-                    self.refresh_tokens.append(rt)
-                else:
-                    print(f"Invalid token entry: {rt}")
+        # Validate and load tokens
+        for rt in refresh_tokens:
+            if "number" in rt and "refresh_token" in rt:
+                self.refresh_tokens.append(rt)
+            else:
+                print(f"Invalid token entry: {rt}")
 
     def add_refresh_token(self, number: int, refresh_token: str):
         # Check if number already exist, if yes, replace it, if not append
@@ -100,8 +99,7 @@ class Auth:
         self.refresh_tokens = [rt for rt in self.refresh_tokens if rt["number"] != number]
         
         # Save to file
-        with open("refresh-tokens.json", "w", encoding="utf-8") as f:
-            json.dump(self.refresh_tokens, f, indent=4)
+        self.write_tokens_to_file()
         
         # If the removed user was the active user, select a new active user if available
         if self.active_user and self.active_user["number"] == number:
@@ -133,6 +131,7 @@ class Auth:
         subscriber_id = profile_data["profile"]["subscriber_id"]
         subscription_type = profile_data["profile"]["subscription_type"]
 
+        DashboardInstance.invalidate(int(number))
         self.active_user = {
             "number": int(number),
             "subscriber_id": subscriber_id,
@@ -159,7 +158,13 @@ class Auth:
             if tokens:
                 self.active_user["tokens"] = tokens
                 self.last_refresh_time = int(time.time())
-                self.add_refresh_token(self.active_user["number"], self.active_user["tokens"]["refresh_token"])
+
+                # Only the refresh token changed, update it in place instead of going
+                # through add_refresh_token (which saved and re-ran set_active_user).
+                rt_entry = next((rt for rt in self.refresh_tokens if rt["number"] == self.active_user["number"]), None)
+                if rt_entry:
+                    rt_entry["refresh_token"] = tokens["refresh_token"]
+                    self.write_tokens_to_file()
                 
                 print("Active user token renewed successfully.")
                 return True
@@ -192,8 +197,8 @@ class Auth:
         return active_user["tokens"] if active_user else None
     
     def write_tokens_to_file(self):
-        with open("refresh-tokens.json", "w", encoding="utf-8") as f:
-            json.dump(self.refresh_tokens, f, indent=4)
+        # Write-behind, the token store persists it in the background
+        TokenStoreInstance.save(self.refresh_tokens)
     
     def write_active_number(self):
         if self.active_user:
@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Store catalog older than this is fetched again before a search (seconds)
+CATALOG_INDEX_TTL = int(os.getenv("CATALOG_INDEX_TTL", "1800"))
+CATALOG_INDEX_PATH = os.getenv("CATALOG_INDEX_PATH", "catalog-index.db")
+
+_QUOTA_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(TB|GB|MB)\b", re.IGNORECASE)
+_VALIDITY_RE = re.compile(r"(\d+)\s*(hari|days?|jam|hours?|bulan|months?|minggu|weeks?)\b", re.IGNORECASE)
+_FILTER_RE = re.compile(r"^(harga|price|rp|kuota|quota|gb|hari|days?|masa)(<=|>=|=|<|>|:)(.+)$", re.IGNORECASE)
+
+_FILTER_FIELDS = {
+    "harga": "price", "price": "price", "rp": "price",
+    "kuota": "quota_gb", "quota": "quota_gb", "gb": "quota_gb",
+    "hari": "validity_days", "day": "validity_days", "days": "validity_days", "masa": "validity_days",
+}
+
+def parse_quota_gb(text: str) -> float | None:
+    """Total data quota mentioned in a title, "10GB + 2GB" -> 12.0"""
+    matches = _QUOTA_RE.findall(text or "")
+    if not matches:
+        return None
+    total = 0.0
+    for value, unit in matches:
+        amount = float(value.replace(",", "."))
+        unit = unit.upper()
+        if unit == "MB":
+            amount /= 1024
+        elif unit == "TB":
+            amount *= 1024
+        total += amount
+    return round(total, 3)
+
+def parse_validity_days(text: str) -> int | None:
+    match = _VALIDITY_RE.search(text or "")
+    if not match:
+        return None
+    value, unit = int(match.group(1)), match.group(2).lower()
+    if unit.startswith(("jam", "hour")):
+        return max(value // 24, 1)
+    if unit.startswith(("bulan", "month")):
+        return value * 30
+    if unit.startswith(("minggu", "week")):
+        return value * 7
+    return value
+
+def parse_query(query: str) -> dict:
+    """Split "xtra combo harga<50000 gb>=10 hari:7-30" into free text and
+    numeric bounds, see CatalogIndex.search for the keys"""
+    text = []
+    bounds = {}
+    for word in query.split():
+        match = _FILTER_RE.match(word)
+        if not match:
+            text.append(word)
+            continue
+        field = _FILTER_FIELDS[match.group(1).lower()]
+        op, value = match.group(2), match.group(3)
+        # "50.000" is a price in rupiah, "1,5" a decimal
+        if field == "price":
+            value = value.replace(".", "")
+        value = value.replace(",", ".")
+        try:
+            if op == ":" and "-" in value:
+                low, high = value.split("-", 1)
+                bounds[f"min_{field}"] = float(low)
+                bounds[f"max_{field}"] = float(high)
+            elif op in (">", ">="):
+                bounds[f"min_{field}"] = float(value) + (1e-9 if op == ">" else 0)
+            elif op in ("<", "<="):
+                bounds[f"max_{field}"] = float(value) - (1e-9 if op == "<" else 0)
+            else:
+                bounds[f"min_{field}"] = bounds[f"max_{field}"] = float(value)
+        except ValueError:
+            text.append(word)
+    return {"text": " ".join(text), **bounds}
+
+def catalog_key(subs_type: str, is_enterprise: bool = False) -> str:
+    """Index partition for one options/search call"""
+    return f"{subs_type}:ENTERPRISE" if is_enterprise else subs_type
+
+def _fts_query(text: str) -> str:
+    # Every word must match as a prefix, quoted so FTS syntax in user input is literal
+    words = re.findall(r"\w+", text, re.UNICODE)
+    return " ".join(f'"{w}"*' for w in words)
+
+class CatalogIndex:
+    """Local, searchable copy of the store catalog (options/search results).
+
+    Rows live in SQLite next to the other indexes, with an FTS5 table over
+    title and family name kept in sync by triggers. refresh() only writes
+    rows whose content changed and drops the ones that disappeared, so
+    re-indexing a catalog that barely moved is cheap. search() never touches
+    the network. Falls back to LIKE matching when SQLite lacks FTS5.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self.filepath = CATALOG_INDEX_PATH
+            self._conn = None
+            self._lock = threading.Lock()
+            self.fts = False
+            self._initialized = True
+
+    def _connect(self) -> sqlite3.Connection:
+        # Caller holds self._lock
+        if self._conn is not None:
+            return self._conn
+
+        conn = sqlite3.connect(self.filepath, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS packages (
+                subs_type TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                title TEXT,
+                family_name TEXT,
+                price INTEGER,
+                original_price INTEGER,
+                validity TEXT,
+                validity_days INTEGER,
+                quota_gb REAL,
+                action_type TEXT,
+                action_param TEXT,
+                content_hash TEXT,
+                generation INTEGER,
+                PRIMARY KEY (subs_type, item_key)
+            );
+            CREATE INDEX IF NOT EXISTS packages_price ON packages (subs_type, price);
+            CREATE TABLE IF NOT EXISTS catalog_meta (
+                subs_type TEXT PRIMARY KEY,
+                refreshed_at REAL,
+                generation INTEGER
+            );
+        """)
+        try:
+            conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS packages_fts USING fts5(
+                    title, family_name,
+                    content='packages', content_rowid='rowid',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS packages_ai AFTER INSERT ON packages BEGIN
+                    INSERT INTO packages_fts(rowid, title, family_name)
+                    VALUES (new.rowid, new.title, new.family_name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS packages_ad AFTER DELETE ON packages BEGIN
+                    INSERT INTO packages_fts(packages_fts, rowid, title, family_name)
+                    VALUES ('delete', old.rowid, old.title, old.family_name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS packages_au AFTER UPDATE OF title, family_name ON packages BEGIN
+                    INSERT INTO packages_fts(packages_fts, rowid, title, family_name)
+                    VALUES ('delete', old.rowid, old.title, old.family_name);
+                    INSERT INTO packages_fts(rowid, title, family_name)
+                    VALUES (new.rowid, new.title, new.family_name);
+                END;
+            """)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            print(f"SQLite FTS5 not available, catalog search falls back to LIKE: {e}")
+            self.fts = False
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    @staticmethod
+    def _row(package: dict) -> dict:
+        title = package.get("title", "") or ""
+        original_price = package.get("original_price", 0) or 0
+        discounted_price = package.get("discounted_price", 0) or 0
+        validity = str(package.get("validity", "") or "")
+        return {
+            "item_key": f"{package.get('action_type', '')}:{package.get('action_param', '')}:{title}",
+            "title": title,
+            "family_name": package.get("family_name", "") or "",
+            "price": discounted_price if discounted_price > 0 else original_price,
+            "original_price": original_price,
+            "validity": validity,
+            "validity_days": parse_validity_days(validity) or parse_validity_days(title),
+            "quota_gb": parse_quota_gb(title),
+            "action_type": package.get("action_type", "") or "",
+            "action_param": package.get("action_param", "") or "",
+            "content_hash": hashlib.sha1(json.dumps(package, sort_keys=True).encode("utf-8")).hexdigest(),
+        }
+
+    def refresh(self, subs_type: str, packages: list[dict]) -> dict:
+        """Bring the rows for subs_type in line with a fresh results_price_only list"""
+        rows = [self._row(p) for p in packages]
+        with self._lock:
+            conn = self._connect()
+            meta = conn.execute(
+                "SELECT generation FROM catalog_meta WHERE subs_type = ?", (subs_type,)
+            ).fetchone()
+            generation = (meta["generation"] if meta else 0) + 1
+            known = {
+                r["item_key"]: r["content_hash"]
+                for r in conn.execute(
+                    "SELECT item_key, content_hash FROM packages WHERE subs_type = ?", (subs_type,)
+                )
+            }
+
+            changed = [r for r in rows if known.get(r["item_key"]) != r["content_hash"]]
+            unchanged = [(generation, subs_type, r["item_key"]) for r in rows if known.get(r["item_key"]) == r["content_hash"]]
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT INTO packages (
+                        subs_type, item_key, title, family_name, price, original_price, validity,
+                        validity_days, quota_gb, action_type, action_param, content_hash, generation
+                    ) VALUES (
+                        :subs_type, :item_key, :title, :family_name, :price, :original_price, :validity,
+                        :validity_days, :quota_gb, :action_type, :action_param, :content_hash, :generation
+                    )
+                    ON CONFLICT (subs_type, item_key) DO UPDATE SET
+                        title = excluded.title,
+                        family_name = excluded.family_name,
+                        price = excluded.price,
+                        original_price = excluded.original_price,
+                        validity = excluded.validity,
+                        validity_days = excluded.validity_days,
+                        quota_gb = excluded.quota_gb,
+                        action_type = excluded.action_type,
+                        action_param = excluded.action_param,
+                        content_hash = excluded.content_hash,
+                        generation = excluded.generation
+                    """,
+                    [{**r, "subs_type": subs_type, "generation": generation} for r in changed],
+                )
+                conn.executemany(
+                    "UPDATE packages SET generation = ? WHERE subs_type = ? AND item_key = ?", unchanged
+                )
+                removed = conn.execute(
+                    "DELETE FROM packages WHERE subs_type = ? AND generation < ?", (subs_type, generation)
+                ).rowcount
+                conn.execute(
+                    "INSERT OR REPLACE INTO catalog_meta (subs_type, refreshed_at, generation) VALUES (?, ?, ?)",
+                    (subs_type, time.time(), generation),
+                )
+
+        added = sum(1 for r in changed if r["item_key"] not in known)
+        return {"added": added, "updated": len(changed) - added, "removed": removed, "total": len(rows)}
+
+    def age(self, subs_type: str) -> float | None:
+        """Seconds since the last refresh for subs_type, None if never indexed"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT refreshed_at FROM catalog_meta WHERE subs_type = ?", (subs_type,)
+            ).fetchone()
+        return time.time() - row["refreshed_at"] if row else None
+
+    def is_stale(self, subs_type: str, max_age: float = CATALOG_INDEX_TTL) -> bool:
+        age = self.age(subs_type)
+        return age is None or age > max_age
+
+    def search(
+        self,
+        subs_type: str,
+        text: str = "",
+        min_price: float | None = None,
+        max_price: float | None = None,
+        min_quota_gb: float | None = None,
+        max_quota_gb: float | None = None,
+        min_validity_days: float | None = None,
+        max_validity_days: float | None = None,
+        limit: int = 50,
+    ) -> list[dict]:
+        """Matching packages, best text match first then cheapest.
+        Packages without a parsed quota or validity are left out when that
+        bound is used."""
+        where = ["p.subs_type = ?"]
+        params: list = [subs_type]
+        for column, low, high in (
+            ("price", min_price, max_price),
+            ("quota_gb", min_quota_gb, max_quota_gb),
+            ("validity_days", min_validity_days, max_validity_days),
+        ):
+            if low is not None:
+                where.append(f"p.{column} >= ?")
+                params.append(low)
+            if high is not None:
+                where.append(f"p.{column} <= ?")
+                params.append(high)
+
+        with self._lock:
+            conn = self._connect()
+            match = _fts_query(text) if text else ""
+            if match and self.fts:
+                sql = (
+                    "SELECT p.* FROM packages_fts f JOIN packages p ON p.rowid = f.rowid "
+                    f"WHERE packages_fts MATCH ? AND {' AND '.join(where)} "
+                    "ORDER BY bm25(packages_fts), p.price LIMIT ?"
+                )
+                params = [match, *params, limit]
+            else:
+                for word in re.findall(r"\w+", text, re.UNICODE):
+                    where.append("(p.title LIKE ? OR p.family_name LIKE ?)")
+                    params.extend([f"%{word}%", f"%{word}%"])
+                sql = f"SELECT p.* FROM packages p WHERE {' AND '.join(where)} ORDER BY p.price LIMIT ?"
+                params.append(limit)
+            return [dict(r) for r in conn.execute(sql, params)]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+CatalogIndexInstance = CatalogIndex()
+
+def search_catalog(subs_type: str, query: str, limit: int = 50) -> list[dict]:
+    """search() with the filters parsed from a query string"""
+    return CatalogIndexInstance.search(subs_type, limit=limit, **parse_query(query))
@@ -1,4 +1,6 @@
 import hashlib, os, hmac, base64
+from functools import lru_cache
+from typing import Iterable
 from base64 import urlsafe_b64encode, urlsafe_b64decode
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
@@ -8,24 +10,85 @@ AX_API_SIG_KEY=os.getenv("AX_API_SIG_KEY")
 X_API_BASE_SECRET=os.getenv("X_API_BASE_SECRET")
 ENCRYPTED_FIELD_KEY=os.getenv("ENCRYPTED_FIELD_KEY")
 
+IV_CACHE_SIZE = int(os.getenv("CRYPTO_IV_CACHE_SIZE", "1024"))
+
+def _encode(value: str | None, encoding: str = "utf-8") -> bytes | None:
+    return value.encode(encoding) if value is not None else None
+
+class CryptoContext:
+    """Keys encoded once at startup plus an LRU of derived IVs, shared by every
+    xdata encrypt/decrypt and x-signature call."""
+
+    def __init__(
+        self,
+        xdata_key: str | None,
+        x_api_base_secret: str | None,
+        ax_api_sig_key: str | None = None,
+        encrypted_field_key: str | None = None,
+        iv_cache_size: int = IV_CACHE_SIZE,
+    ):
+        self.xdata_key = _encode(xdata_key)
+        self.ax_api_sig_key = _encode(ax_api_sig_key, "ascii")
+        self.encrypted_field_key = _encode(encrypted_field_key, "ascii")
+        # Every x-signature HMAC key starts with "<secret>;"
+        self.x_api_secret_prefix = _encode(f"{x_api_base_secret};")
+
+        self.derive_iv = lru_cache(maxsize=iv_cache_size)(self._derive_iv)
+
+    @staticmethod
+    def _derive_iv(xtime_ms: int) -> bytes:
+        sha = hashlib.sha256(str(xtime_ms).encode()).hexdigest()
+        return sha[:16].encode()
+
+    def encrypt_xdata(self, plaintext: str, xtime_ms: int) -> str:
+        # CBC cipher objects are single use, only the key and IV are reusable
+        cipher = AES.new(self.xdata_key, AES.MODE_CBC, self.derive_iv(xtime_ms))
+        return urlsafe_b64encode(cipher.encrypt(pad(plaintext.encode(), 16, style="pkcs7"))).decode()
+
+    def decrypt_xdata(self, xdata: str, xtime_ms: int) -> str:
+        ct = urlsafe_b64decode(xdata + "=" * ((4 - len(xdata) % 4) % 4))
+        pt = AES.new(self.xdata_key, AES.MODE_CBC, self.derive_iv(xtime_ms)).decrypt(ct)
+        return unpad(pt, 16, style="pkcs7").decode()
+
+    def encrypt_many(self, items: Iterable[tuple[str, int]]) -> list[str]:
+        """Encrypt (plaintext, xtime_ms) pairs"""
+        return [self.encrypt_xdata(plaintext, xtime_ms) for plaintext, xtime_ms in items]
+
+    def decrypt_many(self, items: Iterable[tuple[str, int]]) -> list[str]:
+        """Decrypt (xdata, xtime_ms) pairs"""
+        return [self.decrypt_xdata(xdata, xtime_ms) for xdata, xtime_ms in items]
+
+    def hmac_sha512(self, key_suffix: str, msg: str) -> str:
+        key_bytes = self.x_api_secret_prefix + key_suffix.encode("utf-8")
+        return hmac.new(key_bytes, msg.encode("utf-8"), hashlib.sha512).hexdigest()
+
+    def make_x_signature(self, id_token: str, method: str, path: str, sig_time_sec: int) -> str:
+        return self.hmac_sha512(
+            f"{id_token};{method};{path};{sig_time_sec}",
+            f"{id_token};{sig_time_sec};",
+        )
+
+crypto = CryptoContext(
+    XDATA_KEY,
+    X_API_BASE_SECRET,
+    AX_API_SIG_KEY,
+    ENCRYPTED_FIELD_KEY,
+)
+
 def derive_iv(xtime_ms: int) -> bytes:
-    sha = hashlib.sha256(str(xtime_ms).encode()).hexdigest()
-    return sha[:16].encode()
+    return crypto.derive_iv(xtime_ms)
 
 def encrypt_xdata(plaintext: str, xtime_ms: int) -> str:
-    iv = derive_iv(xtime_ms)
-    key_bytes = XDATA_KEY.encode()
-    
-    cipher = AES.new(key_bytes, AES.MODE_CBC, iv)
-    return urlsafe_b64encode(cipher.encrypt(pad(plaintext.encode(), 16, style="pkcs7"))).decode()
+    return crypto.encrypt_xdata(plaintext, xtime_ms)
 
 def decrypt_xdata(xdata: str, xtime_ms: int) -> str:
-    iv = derive_iv(xtime_ms)
-    key_bytes = XDATA_KEY.encode()
-    
-    ct = urlsafe_b64decode(xdata + "=" * ((4 - len(xdata) % 4) % 4))
-    pt = AES.new(key_bytes, AES.MODE_CBC, iv).decrypt(ct)
-    return unpad(pt, 16, style="pkcs7").decode()
+    return crypto.decrypt_xdata(xdata, xtime_ms)
+
+def encrypt_many(items: Iterable[tuple[str, int]]) -> list[str]:
+    return crypto.encrypt_many(items)
+
+def decrypt_many(items: Iterable[tuple[str, int]]) -> list[str]:
+    return crypto.decrypt_many(items)
 
 def make_x_signature(
     id_token: str,
@@ -33,12 +96,7 @@ def make_x_signature(
     path:str,
     sig_time_sec:int
 ) -> str:
-    key_str = f"{X_API_BASE_SECRET};{id_token};{method};{path};{sig_time_sec}"
-    key_bytes = key_str.encode("utf-8")
-    
-    msg = f"{id_token};{sig_time_sec};".encode("utf-8")
-    
-    return hmac.new(key_bytes, msg, hashlib.sha512).hexdigest()
+    return crypto.make_x_signature(id_token, method, path, sig_time_sec)
 
 def make_x_signature_payment(
     access_token: str,
@@ -49,12 +107,10 @@ def make_x_signature_payment(
     payment_for: str,
     path: str,
 ) -> str:
-    key_str = f"{X_API_BASE_SECRET};{sig_time_sec}#ae-hei_9Tee6he+Ik3Gais5=;POST;{path};{sig_time_sec}"
-    key_bytes = key_str.encode("utf-8")
-
-    msg = f"{access_token};{token_payment};{sig_time_sec};{payment_for};{payment_method};{package_code};".encode("utf-8")
-
-    return hmac.new(key_bytes, msg, hashlib.sha512).hexdigest()
+    return crypto.hmac_sha512(
+        f"{sig_time_sec}#ae-hei_9Tee6he+Ik3Gais5=;POST;{path};{sig_time_sec}",
+        f"{access_token};{token_payment};{sig_time_sec};{payment_for};{payment_method};{package_code};",
+    )
 
 def make_ax_api_signature(
     ts_for_sign: str,
@@ -62,7 +118,7 @@ def make_ax_api_signature(
     code: str,
     contact_type: str
 ) -> str:
-    key_bytes = AX_API_SIG_KEY.encode("ascii")
+    key_bytes = crypto.ax_api_sig_key
     
     preimage = f"{ts_for_sign}password{contact_type}{contact}{code}openid"
     digest = hmac.new(key_bytes, preimage.encode("utf-8"), hashlib.sha256).digest()
@@ -77,12 +133,10 @@ def make_x_signature_bounty(
     ) -> str:
     path = "api/v8/personalization/bounties-exchange"
 
-    key_str = f"{X_API_BASE_SECRET};{access_token};{sig_time_sec}#ae-hei_9Tee6he+Ik3Gais5=;POST;{path};{sig_time_sec}"
-    key_bytes = key_str.encode("utf-8")
-
-    msg = f"{access_token};{token_payment};{sig_time_sec};{package_code};".encode("utf-8")
-
-    return hmac.new(key_bytes, msg, hashlib.sha512).hexdigest()
+    return crypto.hmac_sha512(
+        f"{access_token};{sig_time_sec}#ae-hei_9Tee6he+Ik3Gais5=;POST;{path};{sig_time_sec}",
+        f"{access_token};{token_payment};{sig_time_sec};{package_code};",
+    )
 
 def make_x_signature_loyalty(
     sig_time_sec: int,
@@ -90,17 +144,15 @@ def make_x_signature_loyalty(
     token_confirmation: str,
     path: str,
 ) -> str:
-    key_str = f"{X_API_BASE_SECRET};{sig_time_sec}#ae-hei_9Tee6he+Ik3Gais5=;POST;{path};{sig_time_sec}"
-    key_bytes = key_str.encode("utf-8")
-    
-    msg = f"{token_confirmation};{sig_time_sec};{package_code};".encode("utf-8")
-    
-    return hmac.new(key_bytes, msg, hashlib.sha512).hexdigest()
+    return crypto.hmac_sha512(
+        f"{sig_time_sec}#ae-hei_9Tee6he+Ik3Gais5=;POST;{path};{sig_time_sec}",
+        f"{token_confirmation};{sig_time_sec};{package_code};",
+    )
 
 def decrypt_circle_msisdn(encrypted_msisdn_b64: str) -> str:
     iv_ascii = encrypted_msisdn_b64[-16:]
     b64_part = encrypted_msisdn_b64[:-16]
-    key = ENCRYPTED_FIELD_KEY.encode('ascii')
+    key = crypto.encrypted_field_key
     iv = iv_ascii.encode('ascii')
     
     padding = len(b64_part) % 4
@@ -115,8 +167,48 @@ def decrypt_circle_msisdn(encrypted_msisdn_b64: str) -> str:
     except Exception as e:
         return ""
 
+def decrypt_circle_msisdns(encrypted_msisdns: list[str]) -> list[str]:
+    """decrypt_circle_msisdn for a whole member list with one AES call.
+
+    CBC decryption is P_i = D(C_i) xor C_(i-1), with the IV as C_0, so every
+    block of every member goes through a single ECB decrypt and the chaining
+    is one XOR over the joined buffer. Entries that don't decode give "".
+    """
+    results = [""] * len(encrypted_msisdns)
+    cts, prevs, spans = [], [], []
+    offset = 0
+    for i, value in enumerate(encrypted_msisdns):
+        if not value or len(value) <= 16:
+            continue
+        b64_part = value[:-16]
+        try:
+            iv = value[-16:].encode("ascii")
+            ct = base64.urlsafe_b64decode(b64_part + "=" * ((4 - len(b64_part) % 4) % 4))
+        except Exception:
+            continue
+        if not ct or len(ct) % AES.block_size:
+            continue
+        cts.append(ct)
+        prevs.append(iv + ct[:-AES.block_size])
+        spans.append((i, offset, offset + len(ct)))
+        offset += len(ct)
+
+    if not cts:
+        return results
+
+    decrypted = AES.new(crypto.encrypted_field_key, AES.MODE_ECB).decrypt(b"".join(cts))
+    chained = b"".join(prevs)
+    plain = (int.from_bytes(decrypted, "big") ^ int.from_bytes(chained, "big")).to_bytes(offset, "big")
+
+    for i, start, end in spans:
+        try:
+            results[i] = unpad(plain[start:end], AES.block_size, style="pkcs7").decode("utf-8")
+        except Exception:
+            pass
+    return results
+
 def encrypt_circle_msisdn(msisdn: str) -> str:
-    key = ENCRYPTED_FIELD_KEY.encode('ascii')
+    key = crypto.encrypted_field_key
     iv_ascii = os.urandom(8).hex()
     iv = iv_ascii.encode('ascii')
 
@@ -132,21 +224,17 @@ def make_x_signature_bounty_allotment(
     path: str,
     destination_msisdn: str,
     ) -> str:    
-    key_str = f"{X_API_BASE_SECRET};{sig_time_sec}#ae-hei_9Tee6he+Ik3Gais5=;{destination_msisdn};POST;{path};{sig_time_sec}"
-    key_bytes = key_str.encode("utf-8")
-    
-    msg = f"{token_confirmation};{sig_time_sec};{destination_msisdn};{package_code};".encode("utf-8")
-    
-    return hmac.new(key_bytes, msg, hashlib.sha512).hexdigest()
+    return crypto.hmac_sha512(
+        f"{sig_time_sec}#ae-hei_9Tee6he+Ik3Gais5=;{destination_msisdn};POST;{path};{sig_time_sec}",
+        f"{token_confirmation};{sig_time_sec};{destination_msisdn};{package_code};",
+    )
 
 def make_x_signature_basic(
     method: str,
     path: str,
     sig_time_sec: int,
 ) -> str:
-    key_str = f"{X_API_BASE_SECRET};{method};{path};{sig_time_sec}"
-    key_bytes = key_str.encode("utf-8")
-
-    msg = f"{sig_time_sec};en;".encode("utf-8")
-
-    return hmac.new(key_bytes, msg, hashlib.sha512).hexdigest()
+    return crypto.hmac_sha512(
+        f"{method};{path};{sig_time_sec}",
+        f"{sig_time_sec};en;",
+    )
@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.client.engsel import get_balance, get_profile, get_tiering_info
+from app.service.cache import TTLCache
+from app.service.metrics import MetricsInstance
+
+# Main menu header data is reused for this long (seconds), purchases and
+# account switches drop it right away
+DASHBOARD_TTL = int(os.getenv("DASHBOARD_TTL", "60"))
+
+class Dashboard:
+    """Balance, tiering and profile for the CLI main menu header.
+
+    The three calls are independent, load() runs them concurrently and keeps
+    the result per number for DASHBOARD_TTL, so coming back to the main menu
+    doesn't hit the API every time. Call invalidate() after anything that
+    changes them (purchase, redeem, account switch).
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self._cache = TTLCache(maxsize=16, ttl=DASHBOARD_TTL, name="dashboard")
+            self._initialized = True
+
+    def load(self, api_key: str, active_user: dict) -> dict:
+        """Header dict for show_main_menu. A failed balance fetch is returned
+        with empty fields but not cached, the next visit tries again."""
+        header = self._cache.get_or_load(active_user["number"], lambda: self._fetch(api_key, active_user))
+        return header or self._header(active_user, None, None, None)
+
+    def invalidate(self, number: int | None = None):
+        self._cache.invalidate(number)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    def _fetch(self, api_key: str, active_user: dict) -> dict | None:
+        tokens = active_user["tokens"]
+        is_prepaid = active_user["subscription_type"] == "PREPAID"
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            balance_future = executor.submit(get_balance, api_key, tokens["id_token"])
+            profile_future = executor.submit(get_profile, api_key, tokens["access_token"], tokens["id_token"])
+            tiering_future = executor.submit(get_tiering_info, api_key, tokens) if is_prepaid else None
+
+        balance = self._result(balance_future, "balance")
+        profile = self._result(profile_future, "profile")
+        tiering = self._result(tiering_future, "tiering info") if tiering_future else None
+
+        if not balance:
+            return None
+        return self._header(active_user, balance, tiering, profile)
+
+    def _result(self, future, what: str):
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Failed to fetch {what}: {e}")
+            return None
+
+    def _header(self, active_user: dict, balance: dict | None, tiering: dict | None, profile: dict | None) -> dict:
+        balance = balance or {}
+        point_info = "Points: N/A | Tier: N/A"
+        if tiering:
+            point_info = f"Points: {tiering.get('current_point', 0)} | Tier: {tiering.get('tier', 0)}"
+
+        # Profile has the current type, it changes after a migration
+        subscription_type = ((profile or {}).get("profile") or {}).get("subscription_type") or active_user["subscription_type"]
+
+        return {
+            "number": active_user["number"],
+            "subscriber_id": active_user["subscriber_id"],
+            "subscription_type": subscription_type,
+            "balance": balance.get("remaining"),
+            "balance_expired_at": balance.get("expired_at"),
+            "point_info": point_info,
+        }
+
+DashboardInstance = Dashboard()
+MetricsInstance.register_collector("dashboard", DashboardInstance.stats)
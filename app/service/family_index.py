@@ -0,0 +1,104 @@
+import os
+import json
+import threading
+import time
+
+from app.service.token_store import write_json_atomic
+
+MIGRATION_TYPES = [
+    "NONE",
+    "PRE_TO_PRIOH",
+    "PRIOH_TO_PRIO",
+    "PRIO_TO_PRIOH"
+]
+ENTERPRISE_FLAGS = [False, True]
+
+class FamilyIndex:
+    """Remembers which (is_enterprise, migration_type) combination resolved a
+    family code so get_family can try it first instead of walking all 8."""
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            # {family_code: {subscription_type: {"is_enterprise": bool, "migration_type": str, "updated_at": int}}}
+            self.index: dict[str, dict[str, dict]] = {}
+            self.filepath = "family-index.json"
+            self._lock = threading.Lock()
+
+            if os.path.exists(self.filepath):
+                self.load_index()
+
+            self._initialized = True
+
+    def load_index(self):
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Failed to load family index, starting empty: {e}")
+            self.index = {}
+
+    def _save(self):
+        # Caller holds self._lock. The index is only a hint, a failed write
+        # must not fail the lookup that was already resolved.
+        try:
+            write_json_atomic(self.filepath, self.index)
+        except OSError as e:
+            print(f"Failed to save family index: {e}")
+
+    def get(self, family_code: str, subscription_type: str = "") -> tuple[bool, str] | None:
+        entry = self.index.get(family_code, {}).get(subscription_type)
+        if not entry:
+            return None
+        return entry["is_enterprise"], entry["migration_type"]
+
+    def record(self, family_code: str, subscription_type: str, is_enterprise: bool, migration_type: str):
+        if self.get(family_code, subscription_type) == (is_enterprise, migration_type):
+            return
+
+        with self._lock:
+            self.index.setdefault(family_code, {})[subscription_type] = {
+                "is_enterprise": is_enterprise,
+                "migration_type": migration_type,
+                "updated_at": int(time.time()),
+            }
+            self._save()
+
+    def forget(self, family_code: str, subscription_type: str = ""):
+        with self._lock:
+            entries = self.index.get(family_code)
+            if not entries or subscription_type not in entries:
+                return
+            del entries[subscription_type]
+            if not entries:
+                del self.index[family_code]
+            self._save()
+
+    def candidates(
+        self,
+        family_code: str,
+        subscription_type: str = "",
+        is_enterprise: bool | None = None,
+        migration_type: str | None = None,
+    ) -> tuple[tuple[bool, str] | None, list[tuple[bool, str]]]:
+        """Return (known_combo, remaining_combos) for a family.
+
+        known_combo is the recorded winner if it matches the requested filters,
+        remaining_combos are the other combinations in the original probe order."""
+        ie_list = ENTERPRISE_FLAGS if is_enterprise is None else [is_enterprise]
+        mt_list = MIGRATION_TYPES if migration_type is None else [migration_type]
+        combos = [(ie, mt) for mt in mt_list for ie in ie_list]
+
+        known = self.get(family_code, subscription_type)
+        if known not in combos:
+            return None, combos
+
+        return known, [c for c in combos if c != known]
+
+FamilyIndexInstance = FamilyIndex()
@@ -0,0 +1,114 @@
+import os
+import json
+import copy
+import threading
+
+from app.service.token_store import write_json_atomic
+
+HOT_FILES = {
+    "hot": os.path.join("hot_data", "hot.json"),
+    "hot2": os.path.join("hot_data", "hot2.json"),
+}
+
+class HotCatalog:
+    """Parsed hot.json / hot2.json shared by the CLI menus and the bot.
+
+    Each list is loaded once and reloaded only when the file's mtime or size
+    changes. Views built from a list (message text, keyboards) are cached with
+    derived() until the list changes. Admin edits go through update(), which
+    writes atomically and refreshes the cache right away.
+
+    Returned lists are shared, don't modify them in place.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self.files = dict(HOT_FILES)
+            self._entries = {}  # name -> {"stat": (mtime_ns, size), "data": list, "version": int}
+            self._derived = {}  # (name, key) -> (version, value)
+            self._lock = threading.RLock()
+            self._initialized = True
+
+    def _stat(self, name: str) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self.files[name])
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, name: str) -> dict:
+        # Caller holds self._lock
+        stat = self._stat(name)
+        entry = self._entries.get(name)
+        if entry is not None and entry["stat"] == stat:
+            return entry
+
+        data = []
+        if stat is not None:
+            with open(self.files[name], "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+        version = entry["version"] + 1 if entry else 1
+        entry = {"stat": stat, "data": data, "version": version}
+        self._entries[name] = entry
+        return entry
+
+    def get(self, name: str) -> list:
+        with self._lock:
+            return self._load(name)["data"]
+
+    def hot(self) -> list:
+        return self.get("hot")
+
+    def hot2(self) -> list:
+        return self.get("hot2")
+
+    def version(self, name: str) -> int:
+        with self._lock:
+            return self._load(name)["version"]
+
+    def derived(self, name: str, key: str, builder):
+        """Return builder(list) for `name`, rebuilt only after the list changes"""
+        with self._lock:
+            entry = self._load(name)
+            cached = self._derived.get((name, key))
+            if cached is not None and cached[0] == entry["version"]:
+                return cached[1]
+            value = builder(entry["data"])
+            self._derived[(name, key)] = (entry["version"], value)
+            return value
+
+    def update(self, name: str, mutate):
+        """Apply mutate(list) to a copy of the current list and save it.
+        Returns whatever mutate returns."""
+        with self._lock:
+            entry = self._load(name)
+            data = copy.deepcopy(entry["data"])
+            result = mutate(data)
+
+            os.makedirs(os.path.dirname(self.files[name]), exist_ok=True)
+            write_json_atomic(self.files[name], data, indent=4, ensure_ascii=False)
+            self._entries[name] = {
+                "stat": self._stat(name),
+                "data": data,
+                "version": entry["version"] + 1,
+            }
+            return result
+
+    def invalidate(self, name: str | None = None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._derived.clear()
+            else:
+                self._entries.pop(name, None)
+                self._derived = {k: v for k, v in self._derived.items() if k[0] != name}
+
+HotCatalogInstance = HotCatalog()
@@ -0,0 +1,174 @@
+import os
+import time
+import threading
+
+from app.client.engsel import get_family
+from app.service.hot_catalog import HotCatalogInstance
+from app.service.metrics import MetricsInstance
+
+# How often the background pass runs (seconds)
+HOT_RESOLVE_INTERVAL = int(os.getenv("HOT_RESOLVE_INTERVAL", "300"))
+# Option codes are re-resolved after this long, they only change when XL edits a family
+HOT_OPTION_TTL = int(os.getenv("HOT_OPTION_TTL", "3600"))
+
+def entry_key(entry: dict) -> tuple:
+    """hot.json entries pick the variant by name, hot2 bundle members by code"""
+    return (
+        entry["family_code"],
+        entry.get("variant_code") or entry.get("variant_name", ""),
+        entry["order"],
+    )
+
+def find_option_code(family_data: dict, entry: dict) -> str | None:
+    variant_code = entry.get("variant_code")
+    for variant in family_data["package_variants"]:
+        if variant_code:
+            if variant["package_variant_code"] != variant_code:
+                continue
+        elif variant["name"] != entry.get("variant_name"):
+            continue
+        for option in variant["package_options"]:
+            if option["order"] == entry["order"]:
+                return option["package_option_code"]
+    return None
+
+class HotResolver:
+    """Keeps hot.json / hot2.json entries resolved to option codes, per
+    subscription type, so picking a hot package doesn't wait on get_family.
+    A background thread refreshes stale entries every HOT_RESOLVE_INTERVAL
+    using the most recently registered tokens for each subscription type.
+    Package details are per account and never cached here, callers fetch them
+    with their own tokens. Lookups never block, a miss returns None and the
+    caller falls back to resolving inline.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self._credentials = {}  # subscription_type -> (api_key, tokens)
+            self._options = {}  # (subscription_type, entry_key) -> (option_code, resolved_at)
+            self._lock = threading.Lock()
+            self._wakeup = threading.Event()
+            self._stopped = threading.Event()
+            self._thread = None
+            self._quiet = False
+
+            self.resolved = 0
+            self.failures = 0
+            self.hits = 0
+            self.misses = 0
+            self._initialized = True
+
+    def start(self, quiet: bool = False):
+        """Start the background thread, quiet=True hides its prints"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._quiet = quiet
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="hot-resolver", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def register(self, subscription_type: str, api_key: str, tokens: dict):
+        """Offer fresh tokens for a subscription type, the first ones for a
+        new type trigger a pass right away"""
+        with self._lock:
+            is_new = subscription_type not in self._credentials
+            self._credentials[subscription_type] = (api_key, tokens)
+        if is_new:
+            self._wakeup.set()
+
+    # ---- lookups ----
+    def option_code(self, subscription_type: str, entry: dict) -> str | None:
+        cached = self._options.get((subscription_type, entry_key(entry)))
+        if cached is None or time.time() - cached[1] > HOT_OPTION_TTL:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return cached[0]
+
+    def stats(self) -> dict:
+        return {
+            'options': len(self._options),
+            'resolved': self.resolved,
+            'failures': self.failures,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    # ---- background pass ----
+    def _entries(self) -> list[dict]:
+        entries = list(HotCatalogInstance.hot())
+        for bundle in HotCatalogInstance.hot2():
+            entries.extend(bundle.get("packages", []))
+        return entries
+
+    def refresh(self, subscription_type: str):
+        """Resolve every stale entry for one subscription type"""
+        with self._lock:
+            credentials = self._credentials.get(subscription_type)
+        if credentials is None:
+            return
+        api_key, tokens = credentials
+
+        seen = set()
+        for entry in self._entries():
+            key = entry_key(entry)
+            if key in seen:
+                continue
+            seen.add(key)
+            if self._stopped.is_set():
+                return
+
+            try:
+                self._refresh_entry(api_key, tokens, subscription_type, entry, key)
+            except Exception as e:
+                self.failures += 1
+                if not self._quiet:
+                    print(f"Hot resolver failed for {entry.get('family_code')}: {e}")
+
+    def _refresh_entry(self, api_key: str, tokens: dict, subscription_type: str, entry: dict, key: tuple):
+        cached = self._options.get((subscription_type, key))
+        if cached is not None and time.time() - cached[1] <= HOT_OPTION_TTL:
+            return
+
+        family_data = get_family(
+            api_key,
+            tokens,
+            entry["family_code"],
+            entry.get("is_enterprise"),
+            entry.get("migration_type"),
+            subscription_type,
+            verbose=not self._quiet,
+        )
+        option_code = find_option_code(family_data, entry) if family_data else None
+        if option_code is None:
+            self.failures += 1
+            return
+        self._options[(subscription_type, key)] = (option_code, time.time())
+        self.resolved += 1
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            with self._lock:
+                subscription_types = list(self._credentials)
+            for subscription_type in subscription_types:
+                self.refresh(subscription_type)
+            self._wakeup.wait(HOT_RESOLVE_INTERVAL)
+
+HotResolverInstance = HotResolver()
+MetricsInstance.register_collector("hot_resolver", HotResolverInstance.stats)
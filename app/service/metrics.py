@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Local port for the Prometheus endpoint, 0 keeps it off
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# Bind address, keep it on loopback unless a scraper runs on another host
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Upper bounds of the latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PHASES = ("encrypt", "network", "decrypt")
+
+class _PathStats:
+    __slots__ = ("buckets", "count", "total", "phases", "statuses", "decrypt_failures")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last one is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.statuses: dict[str, int] = {}
+        self.decrypt_failures = 0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th request, inf past the last bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class ApiMetrics:
+    """Per-path counters and latency histograms for calls to the XL and
+    CIAM APIs, shared by the CLI and the bot.
+
+    record() is called once per upstream request. render() returns the
+    Prometheus text format, serve() exposes it on a local port. Other
+    components can add their stats() dicts with register_collector().
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self._paths: dict[str, _PathStats] = {}
+            self._collectors = {}  # name -> callable returning a dict of numbers
+            self._lock = threading.Lock()
+            self._server = None
+            self._initialized = True
+
+    def record(
+        self,
+        path: str,
+        status: str,
+        encrypt: float = 0.0,
+        network: float = 0.0,
+        decrypt: float = 0.0,
+        decrypt_failed: bool = False,
+    ):
+        elapsed = encrypt + network + decrypt
+        with self._lock:
+            stats = self._paths.get(path)
+            if stats is None:
+                stats = self._paths[path] = _PathStats()
+            index = len(LATENCY_BUCKETS)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if elapsed <= bound:
+                    index = i
+                    break
+            stats.buckets[index] += 1
+            stats.count += 1
+            stats.total += elapsed
+            stats.phases["encrypt"] += encrypt
+            stats.phases["network"] += network
+            stats.phases["decrypt"] += decrypt
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if decrypt_failed:
+                stats.decrypt_failures += 1
+
+    def register_collector(self, name: str, collect):
+        """collect() returns a flat dict, its numeric values are exported as
+        xl_<name>_<key> gauges"""
+        self._collectors[name] = collect
+
+    def reset(self):
+        with self._lock:
+            self._paths.clear()
+
+    def summary(self) -> list[dict]:
+        """One row per path, slowest p99 first"""
+        with self._lock:
+            rows = [
+                {
+                    "path": path,
+                    "count": s.count,
+                    "avg": s.total / s.count if s.count else 0.0,
+                    "p50": s.quantile(0.5),
+                    "p99": s.quantile(0.99),
+                    "errors": sum(n for status, n in s.statuses.items() if status not in ("SUCCESS", "HTTP_200")),
+                    "decrypt_failures": s.decrypt_failures,
+                    "network_share": s.phases["network"] / s.total if s.total else 0.0,
+                }
+                for path, s in self._paths.items()
+            ]
+        rows.sort(key=lambda r: (r["p99"], r["avg"]), reverse=True)
+        return rows
+
+    def collectors(self) -> dict[str, dict]:
+        results = {}
+        for name, collect in list(self._collectors.items()):
+            try:
+                results[name] = collect()
+            except Exception as e:
+                print(f"Metrics collector {name} failed: {e}")
+        return results
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            paths = sorted(self._paths.items())
+
+            lines.append("# HELP xl_api_requests_total Upstream API requests by path and response status.")
+            lines.append("# TYPE xl_api_requests_total counter")
+            for path, s in paths:
+                for status, n in sorted(s.statuses.items()):
+                    lines.append(f'xl_api_requests_total{{path="{_label(path)}",status="{_label(status)}"}} {n}')
+
+            lines.append("# HELP xl_api_request_seconds Upstream API request latency, encrypt to decrypt.")
+            lines.append("# TYPE xl_api_request_seconds histogram")
+            for path, s in paths:
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), s.buckets):
+                    cumulative += n
+                    lines.append(f'xl_api_request_seconds_bucket{{path="{_label(path)}",le="{_number(bound)}"}} {cumulative}')
+                lines.append(f'xl_api_request_seconds_sum{{path="{_label(path)}"}} {_number(s.total)}')
+                lines.append(f'xl_api_request_seconds_count{{path="{_label(path)}"}} {s.count}')
+
+            lines.append("# HELP xl_api_phase_seconds_total Time spent per request phase.")
+            lines.append("# TYPE xl_api_phase_seconds_total counter")
+            for path, s in paths:
+                for phase in PHASES:
+                    lines.append(f'xl_api_phase_seconds_total{{path="{_label(path)}",phase="{phase}"}} {_number(s.phases[phase])}')
+
+            lines.append("# HELP xl_api_decrypt_failures_total Responses that could not be decrypted.")
+            lines.append("# TYPE xl_api_decrypt_failures_total counter")
+            for path, s in paths:
+                lines.append(f'xl_api_decrypt_failures_total{{path="{_label(path)}"}} {s.decrypt_failures}')
+
+        for name, values in sorted(self.collectors().items()):
+            for key, value in sorted(values.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = f"xl_{name}_{key}".replace(".", "_").replace("-", "_")
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = METRICS_PORT, host: str = METRICS_HOST):
+        """Expose render() at http://host:port/metrics from a daemon thread"""
+        if self._server is not None or not port:
+            return self._server
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        print(f"Metrics available at http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+    def stop(self):
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+MetricsInstance = ApiMetrics()
+
+def format_summary(limit: int = 15) -> str:
+    """Plain text table of the slowest paths, for the CLI and the bot"""
+    rows = MetricsInstance.summary()[:limit]
+    if not rows:
+        return "No API calls recorded yet."
+
+    def seconds(value):
+        return ">30s" if value == float("inf") else f"{value:.2f}s"
+
+    lines = []
+    for r in rows:
+        lines.append(r["path"])
+        lines.append(
+            f"  n={r['count']} avg={r['avg']:.2f}s p50<={seconds(r['p50'])} p99<={seconds(r['p99'])} "
+            f"err={r['errors']} decrypt_err={r['decrypt_failures']} net={r['network_share']:.0%}"
+        )
+    return "\n".join(lines)
+
+def timed_ciam(url: str, send):
+    """Run send() (a transport call returning a response) and record it under
+    the path of `url`, the status label is HTTP_<code>"""
+    path = urlsplit(url).path.lstrip("/")
+    start = time.perf_counter()
+    try:
+        resp = send()
+    except Exception:
+        MetricsInstance.record(path, "EXCEPTION", network=time.perf_counter() - start)
+        raise
+    MetricsInstance.record(path, f"HTTP_{resp.status_code}", network=time.perf_counter() - start)
+    return resp
+
+async def atimed_ciam(url: str, send):
+    """timed_ciam for the async transport, send() returns an awaitable"""
+    path = urlsplit(url).path.lstrip("/")
+    start = time.perf_counter()
+    try:
+        resp = await send()
+    except Exception:
+        MetricsInstance.record(path, "EXCEPTION", network=time.perf_counter() - start)
+        raise
+    MetricsInstance.record(path, f"HTTP_{resp.status_code}", network=time.perf_counter() - start)
+    return resp
@@ -0,0 +1,86 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.client.engsel import get_notification_detail
+from app.service.cache import TTLCache
+from app.service.metrics import MetricsInstance
+
+# Max notification detail calls in flight when marking many as read
+NOTIFICATION_CONCURRENCY = int(os.getenv("NOTIFICATION_CONCURRENCY", "6"))
+# Attempts per notification, network errors and unreadable responses are retried
+NOTIFICATION_ATTEMPTS = int(os.getenv("NOTIFICATION_ATTEMPTS", "3"))
+# First retry waits this long (seconds), doubled for each further one
+NOTIFICATION_RETRY_BACKOFF = float(os.getenv("NOTIFICATION_RETRY_BACKOFF", "0.5"))
+
+# A notification body never changes once sent, and fetching it is what marks it
+# read for that account, so entries are keyed by (id_token, notification_id)
+notification_details = TTLCache(maxsize=512, ttl=86400, name="notification_detail")
+
+MetricsInstance.register_collector("notification_detail", notification_details.stats)
+
+def _fetch_detail(api_key: str, tokens: dict, notification_id: str) -> dict | None:
+    error = None
+    for attempt in range(max(NOTIFICATION_ATTEMPTS, 1)):
+        if attempt:
+            time.sleep(NOTIFICATION_RETRY_BACKOFF * 2 ** (attempt - 1))
+        try:
+            res = get_notification_detail(api_key, tokens, notification_id)
+        except Exception as e:
+            error = e
+            continue
+        # None is an error answer from the API, retrying won't change it
+        if res is None or isinstance(res, dict):
+            return res
+        error = "unreadable response"
+
+    print(f"Giving up on notification {notification_id}: {error}")
+    return None
+
+def get_detail(api_key: str, tokens: dict, notification_id: str) -> dict | None:
+    """Notification detail, fetched once per account and notification_id"""
+    return notification_details.get_or_load(
+        (tokens["id_token"], notification_id),
+        lambda: _fetch_detail(api_key, tokens, notification_id),
+    )
+
+def fetch_details(
+    api_key: str,
+    tokens: dict,
+    notification_ids: list[str],
+    progress=None,
+) -> dict[str, dict | None]:
+    """Details for many notifications with at most NOTIFICATION_CONCURRENCY
+    calls in flight. progress(done, total, notification_id, ok) is called
+    from the caller's thread as each one finishes."""
+    notification_ids = list(dict.fromkeys(notification_ids))
+    results = {}
+    if not notification_ids:
+        return results
+
+    workers = max(min(NOTIFICATION_CONCURRENCY, len(notification_ids)), 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(get_detail, api_key, tokens, notification_id): notification_id
+            for notification_id in notification_ids
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            notification_id = futures[future]
+            try:
+                results[notification_id] = future.result()
+            except Exception as e:
+                print(f"Failed to fetch notification {notification_id}: {e}")
+                results[notification_id] = None
+            if progress:
+                progress(done, len(notification_ids), notification_id, results[notification_id] is not None)
+
+    return results
+
+def mark_all_read(api_key: str, tokens: dict, notifications: list[dict], progress=None) -> dict[str, dict | None]:
+    """Open every unread notification, which marks it read on XL's side"""
+    unread = [
+        n["notification_id"]
+        for n in notifications
+        if not n.get("is_read", False) and n.get("notification_id")
+    ]
+    return fetch_details(api_key, tokens, unread, progress)
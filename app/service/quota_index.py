@@ -0,0 +1,70 @@
+import os
+import json
+import threading
+import time
+
+from app.service.token_store import write_json_atomic
+
+class QuotaIndex:
+    """Maps a quota_code from quota-details to the package_family_code of its
+    option, so My Packages only calls options/detail for quotas it has not
+    seen before."""
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            # {quota_code: {"family_code": str, "updated_at": int}}
+            self.index: dict[str, dict] = {}
+            self.filepath = "quota-index.json"
+            self._lock = threading.Lock()
+
+            if os.path.exists(self.filepath):
+                self.load_index()
+
+            self._initialized = True
+
+    def load_index(self):
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Failed to load quota index, starting empty: {e}")
+            self.index = {}
+
+    def get(self, quota_code: str) -> str | None:
+        entry = self.index.get(quota_code)
+        return entry["family_code"] if entry else None
+
+    def get_many(self, quota_codes: list[str]) -> tuple[dict[str, str], list[str]]:
+        """Return ({quota_code: family_code} for known codes, unknown codes)"""
+        known, missing = {}, []
+        for quota_code in quota_codes:
+            family_code = self.get(quota_code)
+            if family_code is None:
+                missing.append(quota_code)
+            else:
+                known[quota_code] = family_code
+        return known, missing
+
+    def record_many(self, family_codes: dict[str, str]):
+        """Store several lookups with a single write"""
+        changed = {q: f for q, f in family_codes.items() if f and self.get(q) != f}
+        if not changed:
+            return
+
+        now = int(time.time())
+        with self._lock:
+            for quota_code, family_code in changed.items():
+                self.index[quota_code] = {"family_code": family_code, "updated_at": now}
+            try:
+                write_json_atomic(self.filepath, self.index)
+            except OSError as e:
+                print(f"Failed to save quota index: {e}")
+
+QuotaIndexInstance = QuotaIndex()
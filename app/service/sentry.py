@@ -1,12 +1,12 @@
 from app.client.engsel import get_package, send_api_request
 from app.menus.util import clear_screen, pause
-import json
 from datetime import datetime
 from app.service.auth import AuthInstance
-from time import sleep
+from app.service.sentry_store import SentryWriter
+from app.service.sentry_scheduler import AdaptiveSchedule, budget_for
 import threading
+import time
 import sys
-import os
 
 
 def enter_sentry_mode():
@@ -23,15 +23,10 @@ def enter_sentry_mode():
     print("Entering Sentry Mode...")
     print("Press Ctrl+C or type 'q' + Enter to exit.")
     
-    if not os.path.exists("sentry"):
-        os.makedirs("sentry")
+    writer = SentryWriter("sentry")
+    schedule = AdaptiveSchedule(budget=budget_for(str(active_user["number"])))
 
-    file_name = os.path.join(
-        "sentry",
-        f"sentry_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
-    )
-
-    stop_flag = {"stop": False}
+    stop_event = threading.Event()
 
     # Background listener for "q"
     def listen_for_quit():
@@ -40,7 +35,7 @@ def enter_sentry_mode():
             if not user_input:  # Ignore empty input (prevents instant exit)
                 continue
             if user_input.strip().lower() == "q":
-                stop_flag["stop"] = True
+                stop_event.set()
                 break
 
     listener_thread = threading.Thread(target=listen_for_quit, daemon=True)
@@ -57,36 +52,36 @@ def enter_sentry_mode():
     }
     
     try:
-        with open(file_name, 'a') as f:
-            while not stop_flag["stop"]:
-                sleep(1)
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-                try:
-                    print(f"Fetching data at {timestamp}...", end="\r")
-                    
-                    res = send_api_request(api_key, path, payload, id_token, "POST")
-                    if res.get("status") != "SUCCESS":
-                        print("Failed to fetch packages")
-                        print("Response:", res)
-                        pause()
-                        return None
-                    
-                    quotas = res["data"]["quotas"]
+        # Sleeping on the event lets "q" interrupt a long backed-off wait
+        while not stop_event.wait(schedule.wait_time()):
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            changed = False
 
-                    data_point = {
-                        "time": timestamp,
-                        "quotas": quotas
-                    }
+            try:
+                print(f"Fetching data at {timestamp} (every {schedule.interval:g}s)...", end="\r")
+                
+                schedule.started()
+                sample_time = time.time()
+                start = time.monotonic()
+                res = send_api_request(api_key, path, payload, id_token, "POST")
+                latency = time.monotonic() - start
+                if res.get("status") != "SUCCESS":
+                    print("Failed to fetch packages")
+                    print("Response:", res)
+                    pause()
+                    return None
+                
+                quotas = res["data"]["quotas"]
 
-                    f.write(json.dumps(data_point) + "\n")
-                    f.flush()
-                except Exception as e:
-                    print(f"Error during fetch at {timestamp}: {e}")
-                    continue
+                changed = writer.append(quotas, t=sample_time, lat=round(latency, 3))
+            except Exception as e:
+                print(f"Error during fetch at {timestamp}: {e}")
+            finally:
+                schedule.observe(changed)
 
     except KeyboardInterrupt:
         print("\nKeyboard interrupt received. Exiting Sentry Mode...")
     finally:
-        print(f"\nSentry Mode exited. Data saved to {file_name}.")
+        writer.close()
+        print(f"\nSentry Mode exited. Data saved to {', '.join(writer.files)}.")
         pause()
@@ -0,0 +1,312 @@
+"""Consumption analysis over recorded Sentry Mode logs.
+
+    python -m app.service.sentry_analytics [sentry/sentry_log_*] [--window 1] [--burst 4]
+
+Reads delta logs (plain, .gz, .zst) and old full-snapshot logs in one
+streaming pass. Per-benefit changes are collected into columnar chunks and
+aggregated with NumPy, memory depends on the number of benefits and hours
+covered, not on the number of samples.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.menus.util import format_quota_byte
+from app.service.sentry_store import FORMAT_NAME, open_log
+
+# Events buffered before a vectorized flush
+CHUNK_SIZE = 65536
+# Consumption rates are bucketed by powers of two to find bursts in one pass
+RATE_BUCKETS = 64
+
+def _benefit_key(quota: dict, index: int, benefit: dict) -> str:
+    return f"{quota.get('quota_code', '')}/{benefit.get('id') or index}"
+
+class SentryAnalyzer:
+    """Streams sentry logs and aggregates remaining-quota changes per benefit"""
+
+    def __init__(self):
+        self.keys: dict[str, int] = {}  # benefit key -> column
+        self.info: list[dict] = []  # column -> {"quota", "name", "data_type"}
+        self.size = 0
+
+        self.remaining = np.zeros(0)
+        self.first_seen = np.zeros(0)
+        self.last_seen = np.zeros(0)
+        self.consumed = np.zeros(0)
+        self.topups = np.zeros(0, dtype=np.int64)
+        self.peak_rate = np.zeros(0)
+        self.rate_hist = np.zeros((0, RATE_BUCKETS), dtype=np.int64)
+        self.hourly: dict[int, np.ndarray] = {}  # epoch hour -> consumed per column
+
+        self.samples = 0
+        self.first_t = None
+        self.last_t = None
+
+        self._events_t = []
+        self._events_dt = []
+        self._events_col = []
+        self._events_delta = []
+
+    # ---- ingestion ----
+    def _column(self, quota: dict, index: int, benefit: dict, t: float) -> int:
+        key = _benefit_key(quota, index, benefit)
+        col = self.keys.get(key)
+        if col is not None:
+            return col
+
+        col = len(self.info)
+        self.keys[key] = col
+        self.info.append({
+            "quota": quota.get("name", ""),
+            "name": benefit.get("name", ""),
+            "data_type": benefit.get("data_type", ""),
+        })
+        if col >= self.size:
+            self._grow(max(col + 1, self.size * 2, 16))
+        self.remaining[col] = benefit.get("remaining", 0)
+        self.first_seen[col] = t
+        return col
+
+    def _grow(self, size: int):
+        extra = size - self.size
+        self.remaining = np.concatenate([self.remaining, np.zeros(extra)])
+        self.first_seen = np.concatenate([self.first_seen, np.zeros(extra)])
+        self.last_seen = np.concatenate([self.last_seen, np.zeros(extra)])
+        self.consumed = np.concatenate([self.consumed, np.zeros(extra)])
+        self.topups = np.concatenate([self.topups, np.zeros(extra, dtype=np.int64)])
+        self.peak_rate = np.concatenate([self.peak_rate, np.zeros(extra)])
+        self.rate_hist = np.vstack([self.rate_hist, np.zeros((extra, RATE_BUCKETS), dtype=np.int64)])
+        for hour, values in self.hourly.items():
+            self.hourly[hour] = np.concatenate([values, np.zeros(extra)])
+        self.size = size
+
+    def _event(self, t: float, dt: float, col: int, delta: float):
+        self._events_t.append(t)
+        self._events_dt.append(dt)
+        self._events_col.append(col)
+        self._events_delta.append(delta)
+        if len(self._events_t) >= CHUNK_SIZE:
+            self._flush()
+
+    def _snapshot(self, quotas: list, t: float, dt: float) -> list[list[int]]:
+        # Rare compared to deltas, diff against the running state here and
+        # return the (quota, benefit) index -> column map for later deltas
+        columns = []
+        for quota in quotas:
+            row = []
+            for index, benefit in enumerate(quota.get("benefits", [])):
+                new = self.keys.get(_benefit_key(quota, index, benefit)) is None
+                col = self._column(quota, index, benefit, t)
+                value = benefit.get("remaining", 0)
+                if not new and value != self.remaining[col]:
+                    self._event(t, dt, col, value - self.remaining[col])
+                    self.remaining[col] = value
+                self.last_seen[col] = t
+                row.append(col)
+            columns.append(row)
+        return columns
+
+    def feed(self, path: str):
+        columns = None
+        prev_t = self.last_t
+        with open_log(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "format" in record:
+                    if record["format"] != FORMAT_NAME:
+                        raise ValueError(f"Unsupported sentry log format in {path}")
+                    continue
+
+                if "quotas" in record:
+                    t = datetime.strptime(record["time"], "%Y-%m-%d %H:%M:%S").timestamp()
+                else:
+                    t = record["t"]
+                dt = t - prev_t if prev_t is not None else 0.0
+
+                if "quotas" in record:
+                    self._snapshot(record["quotas"], t, dt)
+                elif "s" in record:
+                    columns = self._snapshot(record["s"], t, dt)
+                elif "d" in record:
+                    if columns is None:
+                        raise ValueError(f"{path} has deltas before the first snapshot")
+                    for q, b, delta in record["d"]:
+                        col = columns[q][b]
+                        self.remaining[col] += delta
+                        self.last_seen[col] = t
+                        self._event(t, dt, col, delta)
+
+                if self.first_t is None:
+                    self.first_t = t
+                self.last_t = prev_t = t
+                self.samples += 1
+        self._flush()
+
+    def _flush(self):
+        if not self._events_t:
+            return
+        t = np.asarray(self._events_t)
+        dt = np.asarray(self._events_dt)
+        col = np.asarray(self._events_col, dtype=np.int64)
+        delta = np.asarray(self._events_delta, dtype=np.float64)
+        self._events_t, self._events_dt, self._events_col, self._events_delta = [], [], [], []
+
+        self.topups += np.bincount(col[delta > 0], minlength=self.size)
+
+        used = delta < 0
+        t, dt, col, amount = t[used], dt[used], col[used], -delta[used]
+        if not len(amount):
+            return
+
+        self.consumed += np.bincount(col, weights=amount, minlength=self.size)
+
+        hours = (t // 3600).astype(np.int64)
+        unique_hours, hour_index = np.unique(hours, return_inverse=True)
+        per_hour = np.bincount(
+            hour_index * self.size + col,
+            weights=amount,
+            minlength=len(unique_hours) * self.size,
+        ).reshape(len(unique_hours), self.size)
+        for hour, values in zip(unique_hours.tolist(), per_hour):
+            if hour in self.hourly:
+                self.hourly[hour] += values
+            else:
+                self.hourly[hour] = values
+
+        # Units per second over the gap since the previous sample
+        rate = amount / np.maximum(dt, 1.0)
+        np.maximum.at(self.peak_rate, col, rate)
+        bucket = np.clip(np.log2(np.maximum(rate, 1.0)).astype(np.int64), 0, RATE_BUCKETS - 1)
+        np.add.at(self.rate_hist, (col, bucket), 1)
+
+    # ---- results ----
+    def report(self, window_hours: float = 1.0, burst_factor: float = 4.0) -> list[dict]:
+        """One dict per benefit that was seen, most consumed first"""
+        n = len(self.info)
+        if n == 0:
+            return []
+
+        span = np.maximum(self.last_seen[:n] - self.first_seen[:n], 1.0)
+        rate = self.consumed[:n] / span
+
+        # Recent rate from the last `window_hours` of hourly totals
+        hours = np.array(sorted(self.hourly), dtype=np.int64)
+        hourly = np.vstack([self.hourly[h][:n] for h in hours]) if len(hours) else np.zeros((0, n))
+        window_start = self.last_t - window_hours * 3600
+        selected = hours * 3600 + 3600 > window_start
+        recent = hourly[selected].sum(axis=0)
+        # Whole buckets are summed, so divide by the time they cover, not the window
+        covered_start = max(self.first_t, hours[selected].min() * 3600) if selected.any() else self.last_t
+        recent_rate = recent / max(self.last_t - covered_start, 1.0)
+        projection_rate = np.where(recent_rate > 0, recent_rate, rate)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            exhaustion = np.where(
+                projection_rate > 0,
+                self.last_t + self.remaining[:n] / projection_rate,
+                np.inf,
+            )
+
+        # Bursts: samples whose rate is burst_factor above the benefit's median bucket
+        hist = self.rate_hist[:n]
+        counts = hist.sum(axis=1)
+        cumulative = hist.cumsum(axis=1)
+        median_bucket = (cumulative >= (counts[:, None] + 1) // 2).argmax(axis=1)
+        threshold = median_bucket + int(np.ceil(np.log2(max(burst_factor, 1.0))))
+        above = np.arange(RATE_BUCKETS)[None, :] >= threshold[:, None]
+        bursts = np.where(counts > 0, (hist * above).sum(axis=1), 0)
+
+        hour_of_day = np.zeros((24, n))
+        if len(hours):
+            local_hours = np.array([datetime.fromtimestamp(h * 3600).hour for h in hours])
+            np.add.at(hour_of_day, local_hours, hourly)
+
+        results = []
+        for col in np.argsort(-self.consumed[:n]):
+            results.append({
+                **self.info[col],
+                "consumed": float(self.consumed[col]),
+                "remaining": float(self.remaining[col]),
+                "rate_per_hour": float(rate[col] * 3600),
+                "recent_rate_per_hour": float(recent_rate[col] * 3600),
+                "peak_rate_per_sec": float(self.peak_rate[col]),
+                "bursts": int(bursts[col]),
+                "topups": int(self.topups[col]),
+                "exhaustion": float(exhaustion[col]),
+                "hourly": hour_of_day[:, col].tolist(),
+            })
+        return results
+
+def _amount(value: float, data_type: str) -> str:
+    if data_type == "DATA":
+        return format_quota_byte(int(value))
+    if data_type == "VOICE":
+        return f"{value / 60:.1f} min"
+    return f"{value:.0f}"
+
+def _sparkline(values: list) -> str:
+    bars = " .:-=+*#%@"
+    top = max(values)
+    if top <= 0:
+        return " " * len(values)
+    return "".join(bars[min(int(v / top * (len(bars) - 1) + 0.999), len(bars) - 1)] for v in values)
+
+def print_report(results: list[dict], analyzer: SentryAnalyzer, elapsed: float):
+    if not results:
+        print("No samples found.")
+        return
+
+    start = datetime.fromtimestamp(analyzer.first_t).strftime("%Y-%m-%d %H:%M")
+    end = datetime.fromtimestamp(analyzer.last_t).strftime("%Y-%m-%d %H:%M")
+    print(f"{analyzer.samples} samples, {len(results)} benefits, {start} - {end} ({elapsed:.2f}s)")
+    print("=======================================================")
+    for r in results:
+        print(f"{r['quota']} / {r['name']} [{r['data_type']}]")
+        print(f"  Used      : {_amount(r['consumed'], r['data_type'])}, "
+              f"remaining {_amount(r['remaining'], r['data_type'])}")
+        print(f"  Rate      : {_amount(r['rate_per_hour'], r['data_type'])}/h, "
+              f"recent {_amount(r['recent_rate_per_hour'], r['data_type'])}/h")
+        print(f"  Bursts    : {r['bursts']} (peak {_amount(r['peak_rate_per_sec'], r['data_type'])}/s), "
+              f"top-ups {r['topups']}")
+        if r["exhaustion"] == float("inf"):
+            print("  Runs out  : -")
+        else:
+            print(f"  Runs out  : {datetime.fromtimestamp(r['exhaustion']).strftime('%Y-%m-%d %H:%M')}")
+        print(f"  By hour   : |{_sparkline(r['hourly'])}| 00-23")
+        print("-------------------------------------------------------")
+
+def analyze(paths: list[str], window_hours: float = 1.0, burst_factor: float = 4.0):
+    analyzer = SentryAnalyzer()
+    start = time.perf_counter()
+    for path in sorted(paths):
+        analyzer.feed(path)
+    results = analyzer.report(window_hours, burst_factor)
+    print_report(results, analyzer, time.perf_counter() - start)
+    return results
+
+def show_sentry_analytics():
+    paths = glob.glob(os.path.join("sentry", "sentry_log_*"))
+    if not paths:
+        print("No sentry logs found.")
+        return
+    analyze(paths)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", help="log files, defaults to sentry/sentry_log_*")
+    parser.add_argument("--window", type=float, default=1.0, help="hours used for the recent rate")
+    parser.add_argument("--burst", type=float, default=4.0, help="burst = rate this many times the median")
+    args = parser.parse_args()
+
+    paths = args.paths or glob.glob(os.path.join("sentry", "sentry_log_*"))
+    analyze(paths, args.window, args.burst)
+
+if __name__ == "__main__":
+    main()
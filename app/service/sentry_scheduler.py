@@ -0,0 +1,109 @@
+import os
+import time
+import threading
+
+# Sampling interval while quotas are moving (seconds)
+SENTRY_INTERVAL = float(os.getenv("SENTRY_INTERVAL", "1"))
+# Slowest interval reached while nothing changes
+SENTRY_MAX_INTERVAL = float(os.getenv("SENTRY_MAX_INTERVAL", "30"))
+# Unchanged samples in a row before the interval starts doubling
+SENTRY_IDLE_SAMPLES = int(os.getenv("SENTRY_IDLE_SAMPLES", "5"))
+# quota-details calls allowed per account per hour, 0 for no limit
+SENTRY_HOURLY_BUDGET = int(os.getenv("SENTRY_HOURLY_BUDGET", "3600"))
+
+class RequestBudget:
+    """Token bucket refilled at `per_hour` requests per hour, bursts up to `burst`"""
+
+    def __init__(self, per_hour: int, burst: int = 10):
+        self.rate = per_hour / 3600
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a request is allowed, 0 if one is available now"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+
+_budgets: dict[str, RequestBudget] = {}
+_budgets_lock = threading.Lock()
+
+def budget_for(account: str, per_hour: int = SENTRY_HOURLY_BUDGET) -> RequestBudget:
+    """One budget per account for the life of the process, so restarting
+    Sentry Mode doesn't reset it"""
+    with _budgets_lock:
+        if account not in _budgets:
+            _budgets[account] = RequestBudget(per_hour)
+        return _budgets[account]
+
+class AdaptiveSchedule:
+    """Sampling clock for Sentry Mode.
+
+    Deadlines advance on time.monotonic() by the current interval from the
+    previous deadline, so a slow request doesn't push every later sample back.
+    Missed deadlines are skipped rather than fired in a burst. After
+    idle_samples unchanged samples the interval doubles up to max_interval,
+    the first change drops it back to the base interval.
+    """
+
+    def __init__(
+        self,
+        interval: float = SENTRY_INTERVAL,
+        max_interval: float = SENTRY_MAX_INTERVAL,
+        idle_samples: int = SENTRY_IDLE_SAMPLES,
+        budget: RequestBudget | None = None,
+    ):
+        self.base_interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.idle_samples = idle_samples
+        self.budget = budget
+
+        self.interval = interval
+        self.unchanged = 0
+        self.deadline = time.monotonic() + interval
+        self.skipped = 0
+
+    def wait_time(self) -> float:
+        """Seconds to sleep before the next sample"""
+        now = time.monotonic()
+        behind = now - self.deadline
+        if behind >= self.interval:
+            missed = int(behind // self.interval)
+            self.deadline += missed * self.interval
+            self.skipped += missed
+        wait = max(self.deadline - now, 0.0)
+        if self.budget is not None:
+            wait = max(wait, self.budget.delay())
+        return wait
+
+    def started(self):
+        """Call right before sending the request"""
+        if self.budget is not None:
+            self.budget.take()
+
+    def observe(self, changed: bool):
+        """Feed back whether the sample differed from the previous one and
+        advance the deadline"""
+        if changed:
+            self.unchanged = 0
+            self.interval = self.base_interval
+        else:
+            self.unchanged += 1
+            if self.unchanged >= self.idle_samples:
+                self.interval = min(self.interval * 2, self.max_interval)
+        self.deadline += self.interval
@@ -0,0 +1,217 @@
+import os
+import io
+import gzip
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Iterator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Full quotas snapshot every N samples, the ones in between only store the
+# benefits whose `remaining` changed. Lower means faster seeking, bigger files.
+SENTRY_SNAPSHOT_EVERY = int(os.getenv("SENTRY_SNAPSHOT_EVERY", "600"))
+# Start a new file (and compress the old one) after this many samples
+SENTRY_ROTATE_RECORDS = int(os.getenv("SENTRY_ROTATE_RECORDS", "21600"))
+# Flush to disk every N samples instead of every line
+SENTRY_FLUSH_EVERY = int(os.getenv("SENTRY_FLUSH_EVERY", "10"))
+# "zstd" (needs the zstandard package), "gzip" or "none"
+SENTRY_COMPRESSION = os.getenv("SENTRY_COMPRESSION", "zstd" if zstandard else "gzip")
+
+FORMAT_NAME = "sentry-delta"
+FORMAT_VERSION = 1
+
+def _shape(quotas: list) -> list:
+    # Everything except benefit `remaining`, a change here forces a snapshot
+    return [
+        {**quota, "benefits": [
+            {k: v for k, v in benefit.items() if k != "remaining"}
+            for benefit in quota.get("benefits", [])
+        ]}
+        for quota in quotas
+    ]
+
+def _remaining(quotas: list) -> list:
+    return [
+        [benefit.get("remaining", 0) for benefit in quota.get("benefits", [])]
+        for quota in quotas
+    ]
+
+def _compress(path: str, compression: str) -> str:
+    if compression == "zstd" and zstandard is not None:
+        out_path = path + ".zst"
+        with open(path, "rb") as src, open(out_path, "wb") as dst:
+            zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+    elif compression in ("gzip", "zstd"):
+        out_path = path + ".gz"
+        with open(path, "rb") as src, gzip.open(out_path, "wb", compresslevel=6) as dst:
+            while chunk := src.read(1 << 20):
+                dst.write(chunk)
+    else:
+        return path
+    os.remove(path)
+    return out_path
+
+class SentryWriter:
+    """Appends quota samples to delta-encoded JSONL files under `directory`.
+
+    Each file starts with a header line, then one record per sample:
+      {"t": 1700000000.123, "s": quotas}         full snapshot
+      {"t": 1700000001.125, "d": [[q, b, -512]]} remaining deltas by quota/benefit index
+      {"t": 1700000002.124}                      nothing changed
+    Extra per-sample fields passed to append() are stored on the record as is.
+    Files are rotated every SENTRY_ROTATE_RECORDS samples and compressed in
+    the background. Use read_series() to get full quotas back.
+    """
+
+    def __init__(
+        self,
+        directory: str = "sentry",
+        snapshot_every: int = SENTRY_SNAPSHOT_EVERY,
+        rotate_records: int = SENTRY_ROTATE_RECORDS,
+        compression: str = SENTRY_COMPRESSION,
+    ):
+        self.directory = directory
+        self.snapshot_every = max(snapshot_every, 1)
+        self.rotate_records = max(rotate_records, 1)
+        self.compression = compression
+
+        self.path = None
+        self.files = []  # finished files, compressed where possible
+        self._file = None
+        self._records = 0
+        self._since_snapshot = 0
+        self._last_shape = None
+        self._last_remaining = None
+        self._compressors = []
+        self._started = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._part = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        self._part += 1
+        name = f"sentry_log_{self._started}_{self._part:03d}.delta.jsonl"
+        self.path = os.path.join(self.directory, name)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "snapshot_every": self.snapshot_every,
+        }) + "\n")
+        self._records = 0
+        self._last_shape = None
+
+    def _rotate(self):
+        path = self.path
+        self._file.close()
+        self._file = None
+
+        def compress():
+            try:
+                self.files.append(_compress(path, self.compression))
+            except OSError as e:
+                print(f"Failed to compress {path}: {e}")
+                self.files.append(path)
+
+        thread = threading.Thread(target=compress, name="sentry-compress", daemon=True)
+        thread.start()
+        self._compressors = [t for t in self._compressors if t.is_alive()] + [thread]
+
+    def append(self, quotas: list, t: float | None = None, **extra) -> bool:
+        """Write one sample, returns whether it differs from the previous one"""
+        if self._file is None:
+            self._open()
+
+        record = {"t": round(time.time() if t is None else t, 3)}
+        record.update(extra)
+
+        shape = _shape(quotas)
+        remaining = _remaining(quotas)
+        changed = self._last_remaining is None or shape != self._last_shape or \
+            remaining != self._last_remaining
+        if shape != self._last_shape or self._since_snapshot >= self.snapshot_every:
+            record["s"] = quotas
+            self._last_shape = shape
+            self._since_snapshot = 0
+        else:
+            deltas = [
+                [q, b, value - self._last_remaining[q][b]]
+                for q, values in enumerate(remaining)
+                for b, value in enumerate(values)
+                if value != self._last_remaining[q][b]
+            ]
+            if deltas:
+                record["d"] = deltas
+        self._last_remaining = remaining
+        self._since_snapshot += 1
+
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._records += 1
+        if "s" in record or self._records % SENTRY_FLUSH_EVERY == 0:
+            self._file.flush()
+
+        if self._records >= self.rotate_records:
+            self._rotate()
+        return changed
+
+    def close(self):
+        """Finish the current file and wait for compression to complete"""
+        if self._file is not None:
+            self._rotate()
+        for thread in self._compressors:
+            thread.join()
+        self._compressors = []
+
+def open_log(path: str) -> io.TextIOBase:
+    """Open a sentry log as text, plain, .gz or .zst"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd compressed, install the zstandard package to read it")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def read_series(path: str) -> Iterator[dict]:
+    """Yield {"t", "time", "quotas", ...extra} for every sample in a sentry log.
+
+    Works on delta files (any compression) and on the old format with a full
+    {"time", "quotas"} line per sample. Memory stays at one snapshot. The
+    quotas list is updated in place for the next sample, copy it to keep it."""
+    quotas = None
+    with open_log(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+
+            if "format" in record:
+                if record["format"] != FORMAT_NAME or record.get("version", 0) > FORMAT_VERSION:
+                    raise ValueError(f"Unsupported sentry log format in {path}: {record}")
+                continue
+
+            # Old format, one full snapshot per line
+            if "quotas" in record:
+                t = datetime.strptime(record["time"], "%Y-%m-%d %H:%M:%S").timestamp()
+                yield {"t": t, "time": record["time"], "quotas": record["quotas"]}
+                continue
+
+            if "s" in record:
+                quotas = record.pop("s")
+            elif quotas is None:
+                raise ValueError(f"{path} has deltas before the first snapshot")
+            else:
+                for q, b, delta in record.pop("d", ()):
+                    benefit = quotas[q]["benefits"][b]
+                    benefit["remaining"] = benefit.get("remaining", 0) + delta
+
+            t = record.pop("t")
+            sample = {"t": t, "time": datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S"), "quotas": quotas}
+            sample.update(record)
+            yield sample
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+from app.client.store.redeemables import get_redeemables
+from app.client.store.segments import get_segments
+from app.service.metrics import MetricsInstance
+from app.service.token_store import write_json_atomic
+
+# Segments and redeemables older than this are still served, but refreshed in the background
+STORE_CACHE_TTL = int(os.getenv("STORE_CACHE_TTL", "900"))
+# Snapshot of the last responses, so a cold start renders without waiting on the API
+STORE_CACHE_PATH = os.getenv("STORE_CACHE_PATH", "store-cache.json")
+
+def store_key(kind: str, subscription_type: str, is_enterprise: bool, number=None) -> str:
+    """number scopes the entry to one account, for personalized responses"""
+    key = f"{kind}:{subscription_type or 'UNKNOWN'}:{int(bool(is_enterprise))}"
+    return f"{key}:{number}" if number is not None else key
+
+class StoreConfigCache:
+    """Stale-while-revalidate cache for slow changing store configs
+    (segments, redeemables), per subscription type and enterprise flag, and
+    per number for redeemables which are personalized.
+
+    get() / aget() return the cached response right away. Once it is older
+    than STORE_CACHE_TTL one background refresh per key replaces it, failures
+    keep the old copy. Only a key that was never fetched waits on the API.
+    Every successful fetch is written to STORE_CACHE_PATH and the file is
+    read back on first use.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self.filepath = STORE_CACHE_PATH
+            self.ttl = STORE_CACHE_TTL
+            self._entries = None  # key -> {"fetched_at": epoch, "data": response}, None until loaded
+            self._refreshing = set()
+            self._tasks = set()  # keeps background asyncio refreshes referenced
+            self._lock = threading.Lock()
+            self._save_lock = threading.Lock()
+
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+            self.refreshes = 0
+            self.failures = 0
+            self._initialized = True
+
+    # ---- snapshot ----
+    def _ensure_loaded(self):
+        # Caller holds self._lock
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable store cache {self.filepath}: {e}")
+            return
+        for key, entry in snapshot.items():
+            if isinstance(entry, dict) and "data" in entry:
+                self._entries[key] = {"fetched_at": entry.get("fetched_at", 0), "data": entry["data"]}
+
+    def _save(self):
+        with self._save_lock:
+            with self._lock:
+                snapshot = dict(self._entries or {})
+            try:
+                write_json_atomic(self.filepath, snapshot, indent=None, ensure_ascii=False)
+            except OSError as e:
+                print(f"Failed to write store cache {self.filepath}: {e}")
+
+    # ---- entries ----
+    def _lookup(self, key: str) -> tuple[dict | None, bool]:
+        """(entry, needs_refresh), a stale entry is claimed for refresh by the caller"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            if time.time() - entry["fetched_at"] <= self.ttl:
+                self.hits += 1
+                return entry, False
+            self.stale_hits += 1
+            if key in self._refreshing:
+                return entry, False
+            self._refreshing.add(key)
+            return entry, True
+
+    def _store(self, key: str, data):
+        with self._lock:
+            self._ensure_loaded()
+            self._entries[key] = {"fetched_at": time.time(), "data": data}
+        self._save()
+
+    def _refreshed(self, key: str, data):
+        if data:
+            self._store(key, data)
+            self.refreshes += 1
+        else:
+            self.failures += 1
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def get(self, key: str, loader):
+        """Cached response for `key`, loader() fetches it (None means failed)"""
+        entry, needs_refresh = self._lookup(key)
+        if entry is None:
+            data = loader()
+            if data:
+                self._store(key, data)
+            return data
+
+        if needs_refresh:
+            threading.Thread(target=self._refresh, args=(key, loader), name="store-cache", daemon=True).start()
+        return entry["data"]
+
+    def _refresh(self, key: str, loader):
+        try:
+            data = loader()
+        except Exception as e:
+            print(f"Store cache refresh failed for {key}: {e}")
+            data = None
+        self._refreshed(key, data)
+
+    async def aget(self, key: str, loader):
+        """get() for the bot, loader is a coroutine function"""
+        entry, needs_refresh = self._lookup(key)
+        if entry is None:
+            data = await loader()
+            if data:
+                await asyncio.to_thread(self._store, key, data)
+            return data
+
+        if needs_refresh:
+            task = asyncio.create_task(self._arefresh(key, loader))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return entry["data"]
+
+    async def _arefresh(self, key: str, loader):
+        try:
+            data = await loader()
+        except Exception as e:
+            print(f"Store cache refresh failed for {key}: {e}")
+            data = None
+        await asyncio.to_thread(self._refreshed, key, data)
+
+    def invalidate(self, key: str | None = None):
+        with self._lock:
+            self._ensure_loaded()
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        self._save()
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries or {}),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+        }
+
+StoreConfigCacheInstance = StoreConfigCache()
+MetricsInstance.register_collector("store_cache", StoreConfigCacheInstance.stats)
+
+def cached_segments(api_key: str, tokens: dict, subscription_type: str, is_enterprise: bool = False):
+    return StoreConfigCacheInstance.get(
+        store_key("segments", subscription_type, is_enterprise),
+        lambda: get_segments(api_key, tokens, is_enterprise),
+    )
+
+def cached_redeemables(api_key: str, tokens: dict, number, subscription_type: str, is_enterprise: bool = False):
+    return StoreConfigCacheInstance.get(
+        store_key("redeemables", subscription_type, is_enterprise, number),
+        lambda: get_redeemables(api_key, tokens, is_enterprise),
+    )
+
+async def acached_segments(api_key: str, tokens: dict, subscription_type: str, is_enterprise: bool = False):
+    from app.client.aio.store.segments import get_segments as aget_segments
+
+    return await StoreConfigCacheInstance.aget(
+        store_key("segments", subscription_type, is_enterprise),
+        lambda: aget_segments(api_key, tokens, is_enterprise),
+    )
@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import atexit
+import threading
+
+# Seconds between background flushes, this is the most a hard crash can lose.
+TOKEN_FLUSH_INTERVAL = float(os.getenv("TOKEN_FLUSH_INTERVAL", "2"))
+
+def write_json_atomic(filepath: str, data, indent: int | None = 4, ensure_ascii: bool = True):
+    """Write JSON to a temp file, fsync it, then rename over `filepath`.
+    Readers see either the old or the new file, never a partial one."""
+    directory = os.path.dirname(os.path.abspath(filepath))
+    tmp_path = filepath + ".tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=ensure_ascii)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+    # Persist the rename itself, not supported on Windows
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+class TokenStore:
+    """Write-behind persistence for refresh-tokens.json.
+
+    save() only snapshots the entries in memory, a background thread writes
+    the latest snapshot at most every TOKEN_FLUSH_INTERVAL seconds, so several
+    updates to the same account in a row end up as one write. Pending data is
+    flushed on exit.
+    """
+    _instance_ = None
+    _initialized_ = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance_:
+            cls._instance_ = super().__new__(cls)
+        return cls._instance_
+
+    def __init__(self):
+        if not self._initialized_:
+            self.filepath = "refresh-tokens.json"
+            self.flush_interval = TOKEN_FLUSH_INTERVAL
+
+            self._pending = None
+            self._lock = threading.Lock()
+            self._write_lock = threading.Lock()
+            self._wakeup = threading.Event()
+            self._thread = None
+
+            self.saves = 0
+            self.flushes = 0
+
+            atexit.register(self.flush)
+            self._initialized_ = True
+
+    def load(self) -> list:
+        if not os.path.exists(self.filepath):
+            return []
+        with open(self.filepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, refresh_tokens: list):
+        # Copy so later in-place edits by the caller don't race the writer
+        snapshot = [dict(rt) for rt in refresh_tokens]
+        with self._lock:
+            self._pending = snapshot
+            self.saves += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="token-store", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                snapshot, self._pending = self._pending, None
+            if snapshot is None:
+                return
+            try:
+                write_json_atomic(self.filepath, snapshot)
+                self.flushes += 1
+            except OSError as e:
+                print(f"Failed to write {self.filepath}: {e}")
+                with self._lock:
+                    # Keep it for the next attempt unless something newer arrived
+                    if self._pending is None:
+                        self._pending = snapshot
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self.flush()
+            # Anything saved during the next interval is folded into one write
+            time.sleep(self.flush_interval)
+
+TokenStoreInstance = TokenStore()
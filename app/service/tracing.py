@@ -0,0 +1,194 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Write finished traces to TRACE_DIR, one JSON file per user action. Off by
+# default, nothing prunes the directory.
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+class Span:
+    """One timed step, OpenTelemetry field names so the files can be loaded
+    into the usual tools"""
+    __slots__ = (
+        "trace", "name", "span_id", "parent_span_id", "attributes", "events",
+        "status", "start_ns", "end_ns",
+    )
+
+    def __init__(self, trace: "_Trace", name: str, parent: "Span | None", attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.events = []
+        self.status = "UNSET"
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes})
+
+    def set_status(self, status: str):
+        self.status = status
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+            "events": self.events,
+            "thread": threading.current_thread().name,
+        }
+
+class _NoopSpan:
+    trace = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+    def set_status(self, status):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class _Trace:
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: list[dict] = []
+        self.lock = threading.Lock()
+
+class JsonFileExporter:
+    """Writes each finished trace to <directory>/trace_<time>_<trace_id>.json
+    from a background thread, so the caller (possibly the bot's event loop)
+    never waits on disk"""
+
+    def __init__(self, directory: str = TRACE_DIR):
+        self.directory = directory
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.failures = 0
+
+    def export(self, trace: _Trace, root: Span):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        self._queue.put((trace, root))
+
+    def _run(self):
+        while True:
+            trace, root = self._queue.get()
+            try:
+                self._write(trace, root)
+                self.exported += 1
+            except Exception as e:
+                self.failures += 1
+                print(f"Failed to export trace {trace.trace_id}: {e}")
+
+    def _write(self, trace: _Trace, root: Span):
+        with trace.lock:
+            spans = sorted(trace.spans, key=lambda s: s["start_time_unix_nano"])
+        document = {
+            "trace_id": trace.trace_id,
+            "name": root.name,
+            "start": datetime.fromtimestamp(root.start_ns / 1e9).isoformat(timespec="milliseconds"),
+            "duration_ms": round((root.end_ns - root.start_ns) / 1e6, 3),
+            "status": root.status,
+            "spans": spans,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        started = datetime.fromtimestamp(root.start_ns / 1e9).strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"trace_{started}_{trace.trace_id}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+exporter = JsonFileExporter()
+
+def current_span():
+    """The active span, or a no-op one outside any trace"""
+    return _current_span.get() or NOOP_SPAN
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a step. Outside a trace this starts a new one, the trace is
+    exported when that root span ends."""
+    if not TRACING_ENABLED:
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    trace = parent.trace if parent else _Trace()
+    s = Span(trace, name, parent, attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+        if s.status == "UNSET":
+            s.status = "OK"
+    except BaseException as e:
+        s.status = "ERROR"
+        s.add_event("exception", type=type(e).__name__, message=str(e))
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current_span.reset(token)
+        with trace.lock:
+            trace.spans.append(s.to_dict())
+        if parent is None:
+            exporter.export(trace, s)
+
+@contextmanager
+def child_span(name: str, **attributes):
+    """span() that only records inside an existing trace, for low level calls
+    that would otherwise start a trace file per request"""
+    if _current_span.get() is None:
+        yield NOOP_SPAN
+        return
+    with span(name, **attributes) as s:
+        yield s
+
+def traced(name: str, root: bool = True):
+    """Decorator form of span() for sync and async functions, root=False
+    uses child_span() so the function only shows up inside a caller's trace"""
+    open_span = span if root else child_span
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with open_span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with open_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,227 @@
+"""Client latency and throughput against the local mock XL API.
+
+Starts benchmarks/mock_xl_server.py in-process and drives the sync client
+(send_api_request, get_family, get_package_details, get_new_token) from a
+thread pool and the async client calls the bot handlers make from asyncio
+tasks, both at --concurrency. Reports p50/p95/p99 latency, requests/s and
+round trips to the mock per call.
+
+    python benchmarks/api_bench.py [--requests 200] [--concurrency 8] [--latency 20]
+
+Runs in a temp directory so family-index.json and ax.fp don't touch the repo.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Throwaway keys, the mock and the client must agree on them
+os.environ.setdefault("XDATA_KEY", "0123456789abcdef0123456789abcdef")
+os.environ.setdefault("X_API_BASE_SECRET", "bench-secret")
+os.environ.setdefault("AX_FP_KEY", "0123456789abcdef0123456789abcdef")
+os.environ.setdefault("BASIC_AUTH", "bW9jazptb2Nr")
+os.environ.setdefault("UA", "myXL / 8.9.0(1202); com.android.vending; (samsung; SM-N935F; SDK 33; Android 13)")
+os.environ.setdefault("API_KEY", "mock-api-key")
+
+from benchmarks.mock_xl_server import start_server
+
+API_KEY = "Noir1"
+TOKENS = {"id_token": "mock-id-token", "access_token": "mock-access-token", "refresh_token": "mock-refresh"}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * pct / 100), len(sorted_values) - 1)]
+
+
+class Result:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.wall = 0.0
+        self.round_trips = 0
+
+    def row(self):
+        values = sorted(self.latencies)
+        calls = len(values)
+        rps = calls / self.wall if self.wall else 0.0
+        return (f"{self.name:<34}{calls:>7}{self.errors:>7}"
+                f"{percentile(values, 50) * 1000:>10.2f}{percentile(values, 95) * 1000:>10.2f}"
+                f"{percentile(values, 99) * 1000:>10.2f}{rps:>10.1f}"
+                f"{self.round_trips / calls if calls else 0:>8.2f}")
+
+
+def ok(res):
+    if isinstance(res, dict) and "status" in res:
+        return res["status"] == "SUCCESS"
+    return bool(res)
+
+
+def server_requests(server):
+    return sum(server.RequestHandlerClass.stats.values())
+
+
+def run_sync(server, name, fn, requests, concurrency):
+    """Call fn(i) for i in range(requests) from `concurrency` threads"""
+    result = Result(name)
+
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            res = fn(i)
+        except Exception:
+            res = None
+        return time.perf_counter() - start, ok(res)
+
+    before = server_requests(server)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency, success in executor.map(timed, range(requests)):
+            result.latencies.append(latency)
+            result.errors += not success
+    result.wall = time.perf_counter() - start
+    result.round_trips = server_requests(server) - before
+    return result
+
+
+async def run_async(server, name, coro_fn, requests, concurrency):
+    """Await coro_fn(i) for i in range(requests), at most `concurrency` at once"""
+    result = Result(name)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                res = await coro_fn(i)
+            except Exception:
+                res = None
+            result.latencies.append(time.perf_counter() - start)
+            result.errors += not ok(res)
+
+    before = server_requests(server)
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(requests)))
+    result.wall = time.perf_counter() - start
+    result.round_trips = server_requests(server) - before
+    return result
+
+
+def sync_scenarios(server, requests, concurrency):
+    from app.client import engsel, ciam, transport
+
+    quota_payload = {"is_enterprise": False, "lang": "en", "family_member_id": ""}
+    families = max(requests // 4, 1)
+
+    results = [
+        run_sync(server, "send_api_request quota-details",
+                 lambda i: engsel.send_api_request(API_KEY, "api/v8/packages/quota-details",
+                                                   quota_payload, TOKENS["id_token"]),
+                 requests, concurrency),
+        run_sync(server, "get_balance",
+                 lambda i: engsel.get_balance(API_KEY, TOKENS["id_token"]), requests, concurrency),
+        run_sync(server, "get_transaction_history",
+                 lambda i: engsel.get_transaction_history(API_KEY, TOKENS), requests, concurrency),
+        # New family codes: full (is_enterprise, migration_type) probe
+        run_sync(server, "get_family (cold)",
+                 lambda i: engsel.get_family(API_KEY, TOKENS, f"COLD{i}", subscription_type="PREPAID"),
+                 requests, concurrency),
+    ]
+
+    engsel.family_cache.invalidate()
+    # Combination comes from the family index, one round trip
+    results.append(run_sync(server, "get_family (indexed)",
+                            lambda i: engsel.get_family(API_KEY, TOKENS, f"COLD{i}", subscription_type="PREPAID"),
+                            requests, concurrency))
+    # Same few families over and over: cache hits and single-flight
+    results.append(run_sync(server, "get_family (cached)",
+                            lambda i: engsel.get_family(API_KEY, TOKENS, f"COLD{i % families}",
+                                                        subscription_type="PREPAID"),
+                            requests, concurrency))
+    results.append(run_sync(server, "get_package_details",
+                            lambda i: engsel.get_package_details(API_KEY, TOKENS, f"COLD{i % families}",
+                                                                 f"COLD{i % families}-V1", i % 8 + 1,
+                                                                 subscription_type="PREPAID"),
+                            requests, concurrency))
+    results.append(run_sync(server, "get_new_token",
+                            lambda i: ciam.get_new_token(API_KEY, TOKENS["refresh_token"], "MOCKSUB"),
+                            requests, concurrency))
+    transport.close_all()
+    return results
+
+
+async def handler_scenarios(server, requests, concurrency):
+    # The client calls behind the bot handlers, without Telegram in the loop
+    from app.client.aio import engsel, ciam, transport
+
+    quota_payload = {"is_enterprise": False, "lang": "en", "family_member_id": ""}
+    families = max(requests // 4, 1)
+
+    engsel.family_cache.invalidate()
+    results = [
+        # show_my_packages
+        await run_async(server, "bot: my packages",
+                        lambda i: engsel.send_api_request(API_KEY, "api/v8/packages/quota-details",
+                                                          quota_payload, TOKENS["id_token"], "POST"),
+                        requests, concurrency),
+        # balance on the main menu
+        await run_async(server, "bot: balance",
+                        lambda i: engsel.get_balance(API_KEY, TOKENS["id_token"]),
+                        requests, concurrency),
+        # package_detail_callback on a handful of families, first tap per family is a miss
+        await run_async(server, "bot: package detail",
+                        lambda i: engsel.get_package_details(API_KEY, TOKENS, f"BOT{i % families}",
+                                                             f"BOT{i % families}-V1", i % 8 + 1,
+                                                             subscription_type="PREPAID"),
+                        requests, concurrency),
+        # SessionManager refresh
+        await run_async(server, "bot: session refresh",
+                        lambda i: ciam.get_new_token(API_KEY, TOKENS["refresh_token"], "MOCKSUB"),
+                        requests, concurrency),
+    ]
+    await transport.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=20.0, help="simulated server latency in ms")
+    parser.add_argument("--skip-async", action="store_true", help="only run the sync client")
+    args = parser.parse_args()
+
+    server, base_url = start_server(latency_ms=args.latency)
+    os.environ["BASE_API_URL"] = base_url
+    os.environ["BASE_CIAM_URL"] = base_url
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            # The client prints progress for every call
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results = sync_scenarios(server, args.requests, args.concurrency)
+                if not args.skip_async:
+                    results += asyncio.run(handler_scenarios(server, args.requests, args.concurrency))
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+
+    print(f"mock {base_url}, latency {args.latency:.0f}ms, concurrency {args.concurrency}")
+    print(f"{'scenario':<34}{'calls':>7}{'errors':>7}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'req/s':>10}{'trips':>8}")
+    for result in results:
+        print(result.row())
+
+
+if __name__ == "__main__":
+    main()
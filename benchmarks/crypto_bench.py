@@ -0,0 +1,102 @@
+"""Throughput of xdata encrypt/decrypt and x-signature, old per-call code vs CryptoContext.
+
+    python benchmarks/crypto_bench.py [--number 20000]
+
+Uses throwaway keys when XDATA_KEY / X_API_BASE_SECRET are not set.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import timeit
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("XDATA_KEY", "0123456789abcdef0123456789abcdef")
+os.environ.setdefault("X_API_BASE_SECRET", "bench-secret")
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad, unpad
+
+from app.service.crypto_helper import crypto
+
+XDATA_KEY = os.environ["XDATA_KEY"]
+X_API_BASE_SECRET = os.environ["X_API_BASE_SECRET"]
+
+
+# Previous implementation, kept here as the baseline
+def legacy_derive_iv(xtime_ms):
+    return hashlib.sha256(str(xtime_ms).encode()).hexdigest()[:16].encode()
+
+
+def legacy_encrypt_xdata(plaintext, xtime_ms):
+    cipher = AES.new(XDATA_KEY.encode(), AES.MODE_CBC, legacy_derive_iv(xtime_ms))
+    return urlsafe_b64encode(cipher.encrypt(pad(plaintext.encode(), 16, style="pkcs7"))).decode()
+
+
+def legacy_decrypt_xdata(xdata, xtime_ms):
+    ct = urlsafe_b64decode(xdata + "=" * ((4 - len(xdata) % 4) % 4))
+    pt = AES.new(XDATA_KEY.encode(), AES.MODE_CBC, legacy_derive_iv(xtime_ms)).decrypt(ct)
+    return unpad(pt, 16, style="pkcs7").decode()
+
+
+def legacy_make_x_signature(id_token, method, path, sig_time_sec):
+    key_bytes = f"{X_API_BASE_SECRET};{id_token};{method};{path};{sig_time_sec}".encode("utf-8")
+    msg = f"{id_token};{sig_time_sec};".encode("utf-8")
+    return hmac.new(key_bytes, msg, hashlib.sha512).hexdigest()
+
+
+def bench(label, fn, number):
+    seconds = min(timeit.repeat(fn, number=number, repeat=3))
+    print(f"{label:<34}{number / seconds:>12,.0f} ops/s{seconds / number * 1e6:>10.2f} us/op")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.number
+
+    payload = json.dumps({
+        "is_enterprise": False,
+        "lang": "en",
+        "package_option_code": "X" * 120,
+    }, separators=(",", ":"))
+    xtime = int(time.time() * 1000)
+    xdata = crypto.encrypt_xdata(payload, xtime)
+    id_token = "eyJ" + "a" * 900
+
+    assert legacy_encrypt_xdata(payload, xtime) == xdata
+    assert legacy_make_x_signature(id_token, "POST", "api/v8/profile", xtime // 1000) == \
+        crypto.make_x_signature(id_token, "POST", "api/v8/profile", xtime // 1000)
+
+    print(f"{'':<34}{'throughput':>16}{'latency':>13}")
+    old = bench("encrypt_xdata (legacy)", lambda: legacy_encrypt_xdata(payload, xtime), n)
+    new = bench("encrypt_xdata (context)", lambda: crypto.encrypt_xdata(payload, xtime), n)
+    print(f"  speedup x{old / new:.2f}")
+
+    old = bench("decrypt_xdata (legacy)", lambda: legacy_decrypt_xdata(xdata, xtime), n)
+    new = bench("decrypt_xdata (context)", lambda: crypto.decrypt_xdata(xdata, xtime), n)
+    print(f"  speedup x{old / new:.2f}")
+
+    old = bench("make_x_signature (legacy)",
+                lambda: legacy_make_x_signature(id_token, "POST", "api/v8/profile", xtime // 1000), n)
+    new = bench("make_x_signature (context)",
+                lambda: crypto.make_x_signature(id_token, "POST", "api/v8/profile", xtime // 1000), n)
+    print(f"  speedup x{old / new:.2f}")
+
+    # Responses in a fan-out share a handful of xtimes, the IV cache hits on repeats
+    batch = [(crypto.encrypt_xdata(payload, xtime + i % 16), xtime + i % 16) for i in range(100)]
+    old = bench("decrypt x100 (legacy loop)",
+                lambda: [legacy_decrypt_xdata(x, t) for x, t in batch], max(n // 100, 1))
+    new = bench("decrypt_many x100 (context)", lambda: crypto.decrypt_many(batch), max(n // 100, 1))
+    print(f"  speedup x{old / new:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Per-call latency of bot.database under concurrent handlers.
+
+Compares the old connect-per-call layer (rollback journal, default
+synchronous, no indexes) with the persistent thread-local WAL connection.
+
+    python benchmarks/db_bench.py [--users 500] [--threads 8] [--iterations 200]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.database import Database
+
+
+def connect_per_call(db_path):
+    def get_connection():
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    return get_connection
+
+
+def seed(db, users):
+    for telegram_id in range(1, users + 1):
+        db.create_or_update_user(telegram_id, f"user{telegram_id}")
+        db.add_xl_account(telegram_id, f"62817{telegram_id:07d}", "refresh", "sub", "PREPAID")
+        for i in range(5):
+            db.add_bookmark(telegram_id, f"FAM{i}", "Family", False, "Variant", "Option", i)
+
+
+def handler_update(db, telegram_id, timings):
+    # Roughly what /start + get_session + main menu do per update
+    ops = [
+        ("create_or_update_user", lambda: db.create_or_update_user(telegram_id, f"user{telegram_id}")),
+        ("get_active_xl_account", lambda: db.get_active_xl_account(telegram_id)),
+        ("get_all_xl_accounts", lambda: db.get_all_xl_accounts(telegram_id)),
+        ("get_bookmarks", lambda: db.get_bookmarks(telegram_id)),
+        ("update_xl_tokens", lambda: db.update_xl_tokens(
+            telegram_id, f"62817{telegram_id:07d}", access_token="a", id_token="i")),
+    ]
+    for name, op in ops:
+        start = time.perf_counter()
+        op()
+        timings[name].append(time.perf_counter() - start)
+
+
+def run(db, users, threads, iterations):
+    results = defaultdict(list)
+    lock = threading.Lock()
+
+    def worker():
+        timings = defaultdict(list)
+        for _ in range(iterations):
+            handler_update(db, random.randint(1, users), timings)
+        with lock:
+            for name, values in timings.items():
+                results[name].extend(values)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return results, time.perf_counter() - start
+
+
+def report(label, results, elapsed):
+    print(f"\n{label}  (wall {elapsed:.2f}s)")
+    print(f"{'operation':<24}{'calls':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, values in results.items():
+        values.sort()
+        p95 = values[min(int(len(values) * 0.95), len(values) - 1)]
+        print(f"{name:<24}{len(values):>8}{statistics.mean(values) * 1000:>10.3f}"
+              f"{statistics.median(values) * 1000:>10.3f}{p95 * 1000:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    db = Database()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before: a fresh connection per call, no WAL, no indexes
+        db.db_path = os.path.join(tmp, "before.db")
+        db.get_connection = connect_per_call(db.db_path)
+        db.init_db()
+        conn = db.get_connection()
+        conn.execute("DROP INDEX IF EXISTS idx_xl_accounts_telegram_active")
+        conn.execute("DROP INDEX IF EXISTS idx_bookmarks_telegram_created")
+        conn.commit()
+        seed(db, args.users)
+        report("connect per call", *run(db, args.users, args.threads, args.iterations))
+
+        # After: persistent thread-local connection with WAL and indexes
+        del db.get_connection
+        db.close_all()
+        db.db_path = os.path.join(tmp, "after.db")
+        db.init_db()
+        seed(db, args.users)
+        report("thread-local WAL connection", *run(db, args.users, args.threads, args.iterations))
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Local stand-in for the XL API and CIAM, for benchmarks and offline runs.
+
+Speaks the same xdata envelope as the real API: request bodies are
+{"xdata", "xtime"} encrypted with XDATA_KEY and the derive_iv(xtime) IV, the
+x-signature header is checked against X_API_BASE_SECRET, and responses are
+encrypted the same way. Requests with a bad signature get a 401.
+
+    python benchmarks/mock_xl_server.py [--port 8765] [--latency 20]
+
+Then point the client at it:
+
+    BASE_API_URL=http://127.0.0.1:8765 BASE_CIAM_URL=http://127.0.0.1:8765
+
+Uses throwaway keys when XDATA_KEY / X_API_BASE_SECRET are not set, the client
+has to run with the same values.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("XDATA_KEY", "0123456789abcdef0123456789abcdef")
+os.environ.setdefault("X_API_BASE_SECRET", "bench-secret")
+
+from app.service.crypto_helper import crypto
+
+TOKEN_PATH = "/realms/xl-ciam/protocol/openid-connect/token"
+
+# options/list only resolves a family with this combination, like the real API
+# does for families that need a specific migration type
+FAMILY_IS_ENTERPRISE = False
+FAMILY_MIGRATION_TYPE = "PRE_TO_PRIOH"
+
+
+def _family(family_code, variants=3, options=8):
+    return {
+        "package_family": {
+            "name": f"Mock Family {family_code}",
+            "package_family_code": family_code,
+            "package_family_type": "PACKAGE",
+            "rc_bonus_type": "",
+        },
+        "package_variants": [
+            {
+                "name": f"Variant {v}",
+                "package_variant_code": f"{family_code}-V{v}",
+                "package_options": [
+                    {
+                        "order": o,
+                        "name": f"Option {v}.{o}",
+                        "price": 10000 + 5000 * o,
+                        "validity": "30 Hari",
+                        "package_option_code": f"{family_code}-V{v}-O{o}",
+                    }
+                    for o in range(1, options + 1)
+                ],
+            }
+            for v in range(1, variants + 1)
+        ],
+    }
+
+
+def _package_detail(option_code):
+    return {
+        "package_family": {"name": "Mock Family", "package_family_code": option_code.split("-")[0],
+                           "payment_for": "BUY_PACKAGE", "plan_type": "", "rc_bonus_type": ""},
+        "package_detail_variant": {"name": "Variant", "package_variant_code": option_code.rsplit("-", 1)[0]},
+        "package_option": {
+            "name": "Option",
+            "package_option_code": option_code,
+            "price": 25000,
+            "validity": "30 Hari",
+            "point": 0,
+            "tnc": "<p>Syarat dan ketentuan berlaku.</p>",
+            "benefits": [
+                {"name": "Kuota Utama", "data_type": "DATA", "total": 10 * 1024 ** 3, "is_unlimited": False},
+                {"name": "Nelpon", "data_type": "VOICE", "total": 6000, "is_unlimited": False},
+            ],
+        },
+        "token_confirmation": uuid.uuid4().hex,
+        "timestamp": int(time.time()),
+    }
+
+
+def _quotas(count=6):
+    return {
+        "quotas": [
+            {
+                "quota_code": f"QC{i:04d}",
+                "group_code": f"GC{i:04d}",
+                "group_name": f"Group {i}",
+                "name": f"Paket Aktif {i}",
+                "product_subscription_type": "PREPAID",
+                "product_domain": "PACKAGES",
+                "benefits": [
+                    {"id": f"B{i}-1", "name": "Kuota Utama", "data_type": "DATA",
+                     "remaining": 3 * 1024 ** 3, "total": 10 * 1024 ** 3},
+                    {"id": f"B{i}-2", "name": "Nelpon", "data_type": "VOICE",
+                     "remaining": 3000, "total": 6000},
+                ],
+            }
+            for i in range(1, count + 1)
+        ]
+    }
+
+
+def _transactions(count=20):
+    now = int(time.time())
+    return {
+        "list": [
+            {
+                "title": f"Paket {i}",
+                "price": f"Rp {10000 + i * 1000}",
+                "timestamp": now - i * 86400,
+                "payment_method_label": "BALANCE",
+                "status": "SUCCESS",
+                "payment_status": "SUCCESS",
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def _options_list(payload):
+    if payload.get("is_enterprise") != FAMILY_IS_ENTERPRISE or \
+            payload.get("migration_type") != FAMILY_MIGRATION_TYPE:
+        return {"status": "FAILED", "code": "PACKAGE_NOT_FOUND", "message": "Package family not found"}
+    return {"status": "SUCCESS", "data": _family(payload.get("package_family_code", "FAM"))}
+
+
+def _options_detail(payload):
+    return {"status": "SUCCESS", "data": _package_detail(payload.get("package_option_code", "FAM-V1-O1"))}
+
+
+ROUTES = {
+    "api/v8/xl-stores/options/list": _options_list,
+    "api/v8/xl-stores/options/detail": _options_detail,
+    "api/v8/packages/quota-details": lambda payload: {"status": "SUCCESS", "data": _quotas()},
+    "api/v8/packages/balance-and-credit": lambda payload: {
+        "status": "SUCCESS",
+        "data": {"balance": {"remaining": 125000, "expired_at": int(time.time()) + 30 * 86400}},
+    },
+    "payments/api/v8/transaction-history": lambda payload: {"status": "SUCCESS", "data": _transactions()},
+    "api/v8/profile": lambda payload: {
+        "status": "SUCCESS",
+        "data": {"profile": {"msisdn": "6281700000000", "subscriber_id": "MOCKSUB", "subscription_type": "PREPAID"}},
+    },
+}
+
+
+class MockXLHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0  # seconds, set from --latency
+    stats = None  # {path: count}, shared across handler instances
+    stats_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("content-length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        raw = self._read_body()
+        if self.latency:
+            # Jittered so percentiles have something to show
+            time.sleep(random.uniform(0.5, 1.5) * self.latency)
+        if self.stats is not None:
+            with self.stats_lock:
+                self.stats[path] = self.stats.get(path, 0) + 1
+
+        if path == TOKEN_PATH:
+            return self._token()
+
+        route = ROUTES.get(path.lstrip("/"))
+        if route is None:
+            return self._send_json(404, {"status": "FAILED", "message": f"Unknown path {path}"})
+
+        # x-signature covers the path without the leading slash
+        id_token = self.headers.get("authorization", "").removeprefix("Bearer ")
+        try:
+            sig_time_sec = int(self.headers.get("x-signature-time", ""))
+        except ValueError:
+            return self._send_json(401, {"status": "FAILED", "message": "Missing x-signature-time"})
+        expected = crypto.make_x_signature(id_token, "POST", path.lstrip("/"), sig_time_sec)
+        if self.headers.get("x-signature") != expected:
+            return self._send_json(401, {"status": "FAILED", "message": "Invalid signature"})
+
+        try:
+            envelope = json.loads(raw)
+            payload = json.loads(crypto.decrypt_xdata(envelope["xdata"], int(envelope["xtime"])))
+        except Exception as e:
+            return self._send_json(400, {"status": "FAILED", "message": f"Bad xdata: {e}"})
+        if int(envelope["xtime"]) // 1000 != sig_time_sec:
+            return self._send_json(401, {"status": "FAILED", "message": "x-signature-time mismatch"})
+
+        xtime = int(time.time() * 1000)
+        body = json.dumps(route(payload), separators=(",", ":"))
+        self._send_json(200, {"xdata": crypto.encrypt_xdata(body, xtime), "xtime": xtime})
+
+    def _token(self):
+        if not self.headers.get("authorization", "").startswith("Basic "):
+            return self._send_json(401, {"error": "unauthorized_client"})
+        self._send_json(200, {
+            "access_token": "mock-access-" + uuid.uuid4().hex,
+            "id_token": "mock-id-" + uuid.uuid4().hex,
+            "refresh_token": "mock-refresh-" + uuid.uuid4().hex,
+            "token_type": "Bearer",
+            "expires_in": 300,
+        })
+
+
+def start_server(host="127.0.0.1", port=0, latency_ms=0.0):
+    """Start the mock in a daemon thread, returns (server, base_url).
+    port=0 picks a free port, per-path request counts are in
+    server.RequestHandlerClass.stats."""
+    handler = type("Handler", (MockXLHandler,), {"latency": latency_ms / 1000, "stats": {}})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="mock-xl", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated server latency in ms")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.host, args.port, args.latency)
+    print(f"Mock XL API listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Disk use and write time of Sentry Mode logs, one full JSON line per sample
+vs the delta-encoded SentryWriter.
+
+    python benchmarks/sentry_bench.py [--samples 86400] [--quotas 15] [--compression gzip]
+
+Synthetic quotas: a few benefits drain now and then, the rest stay put, which
+is what a real day of sentry logging looks like. The delta log is read back
+with read_series and checked against the input.
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.service.sentry_store import SentryWriter, read_series
+
+
+def make_quotas(count):
+    return [
+        {
+            "quota_code": f"QC{i:04d}",
+            "group_code": f"GC{i:04d}",
+            "group_name": f"Group {i}",
+            "name": f"Paket {i}",
+            "product_subscription_type": "PREPAID",
+            "product_domain": "PACKAGES",
+            "expired_at": 1767225600 + i * 86400,
+            "benefits": [
+                {"id": f"B{i}-{b}", "name": f"Benefit {b}", "data_type": "DATA",
+                 "remaining": 10 * 1024 ** 3, "total": 10 * 1024 ** 3}
+                for b in range(3)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def samples(count, quotas, start, seed=1):
+    rng = random.Random(seed)
+    quotas = copy.deepcopy(quotas)
+    t = start
+    for _ in range(count):
+        t += 1
+        # One in five samples sees traffic on the first benefit of a random quota
+        if rng.random() < 0.2:
+            benefit = quotas[rng.randrange(len(quotas))]["benefits"][0]
+            benefit["remaining"] = max(benefit["remaining"] - rng.randint(1, 5) * 1024 ** 2, 0)
+        yield t, quotas
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=86400)
+    parser.add_argument("--quotas", type=int, default=15)
+    parser.add_argument("--compression", default="gzip", choices=["zstd", "gzip", "none"])
+    args = parser.parse_args()
+
+    quotas = make_quotas(args.quotas)
+    start_t = round(time.time()) - args.samples
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = os.path.join(tmp, "legacy")
+        os.makedirs(legacy_dir)
+        start = time.perf_counter()
+        with open(os.path.join(legacy_dir, "sentry_log.jsonl"), "a") as f:
+            for t, q in samples(args.samples, quotas, start_t):
+                timestamp = datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M:%S')
+                f.write(json.dumps({"time": timestamp, "quotas": q}) + "\n")
+                f.flush()
+        legacy_time = time.perf_counter() - start
+        legacy_size = dir_size(legacy_dir)
+
+        delta_dir = os.path.join(tmp, "delta")
+        writer = SentryWriter(delta_dir, compression=args.compression)
+        start = time.perf_counter()
+        for t, q in samples(args.samples, quotas, start_t):
+            writer.append(q, t=t)
+        writer.close()
+        delta_time = time.perf_counter() - start
+        delta_size = dir_size(delta_dir)
+
+        start = time.perf_counter()
+        expected = samples(args.samples, quotas, start_t)
+        count = 0
+        for path in sorted(writer.files):
+            for sample in read_series(path):
+                t, q = next(expected)
+                assert sample["quotas"] == q and abs(sample["t"] - t) < 0.001
+                count += 1
+        assert count == args.samples
+        read_time = time.perf_counter() - start
+
+    print(f"{args.samples} samples x {args.quotas} quotas, {len(writer.files)} delta files ({args.compression})")
+    print(f"{'':<20}{'size MB':>12}{'write s':>10}")
+    print(f"{'full JSON lines':<20}{legacy_size / 1e6:>12.2f}{legacy_time:>10.2f}")
+    print(f"{'delta + rotate':<20}{delta_size / 1e6:>12.2f}{delta_time:>10.2f}")
+    print(f"size x{legacy_size / delta_size:.1f} smaller, read_series {count / read_time:,.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List
+
+from bot.database import db
+
+
+# Reads run on a small pool, each worker thread keeps its own WAL connection
+DB_READ_WORKERS = int(os.getenv("DB_READ_WORKERS", "4"))
+# Max queued writes grouped into one transaction
+DB_WRITE_BATCH = int(os.getenv("DB_WRITE_BATCH", "64"))
+# How long the writer waits for more writes to join a batch (seconds)
+DB_WRITE_LINGER = float(os.getenv("DB_WRITE_LINGER", "0.005"))
+
+_STOP = object()
+
+
+class _Write:
+    __slots__ = ("name", "args", "kwargs", "waiters")
+
+    def __init__(self, name, args, kwargs, waiter):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.waiters = [waiter] if waiter else []  # (loop, future) pairs sharing this result
+
+
+class AsyncDatabase:
+    """Async facade over Database, keeps SQLite I/O off the event loop.
+
+    Reads run concurrently on a thread pool. Writes go through one writer
+    thread that groups queued writes into a single transaction and merges
+    repeated update_xl_tokens calls for the same account.
+    """
+
+    def __init__(self, database):
+        self.db = database
+        self._reader = None
+        self._writes = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.writes = 0
+        self.coalesced = 0
+
+    def _ensure_started(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._reader = ThreadPoolExecutor(
+                    max_workers=DB_READ_WORKERS,
+                    thread_name_prefix="db-read"
+                )
+                self._writer = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+                self._writer.start()
+
+    def close(self):
+        """Flush pending writes and stop the worker threads"""
+        with self._lock:
+            if self._writer is not None:
+                self._writes.put(_STOP)
+                self._writer.join()
+                self._writer = None
+            if self._reader is not None:
+                self._reader.shutdown(wait=True)
+                self._reader = None
+
+    # ---- plumbing ----
+    async def _read(self, fn, *args):
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._reader, fn, *args)
+
+    async def _write(self, name: str, *args, **kwargs):
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._writes.put(_Write(name, args, kwargs, (loop, future)))
+        return await future
+
+    def _write_nowait(self, name: str, **kwargs):
+        self._ensure_started()
+        self._writes.put(_Write(name, (), kwargs, None))
+
+    def _drain(self) -> tuple[list, bool]:
+        first = self._writes.get()
+        if first is _STOP:
+            return [], True
+
+        items = [first]
+        stop = False
+        while len(items) < DB_WRITE_BATCH:
+            try:
+                item = self._writes.get(timeout=DB_WRITE_LINGER)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            items.append(item)
+        return items, stop
+
+    def _coalesce(self, items: list) -> list:
+        # Merge update_xl_tokens for the same account into the earlier pending
+        # one, unless another write for that user was queued in between.
+        batch = []
+        pending_updates = {}  # (telegram_id, phone_number) -> _Write in batch
+        for item in items:
+            telegram_id = item.kwargs.get("telegram_id", item.args[0] if item.args else None)
+            if item.name == "update_xl_tokens":
+                key = (telegram_id, item.kwargs["phone_number"])
+                earlier = pending_updates.get(key)
+                if earlier is not None:
+                    for field in ("access_token", "id_token", "refresh_token"):
+                        if item.kwargs.get(field):
+                            earlier.kwargs[field] = item.kwargs[field]
+                    earlier.waiters.extend(item.waiters)
+                    self.coalesced += 1
+                    continue
+                pending_updates[key] = item
+            else:
+                for key in [k for k in pending_updates if k[0] == telegram_id]:
+                    del pending_updates[key]
+            batch.append(item)
+        return batch
+
+    def _writer_loop(self):
+        stop = False
+        while not stop:
+            items, stop = self._drain()
+            if not items:
+                continue
+
+            batch = self._coalesce(items)
+            try:
+                results = self.db.run_batch([(w.name, w.args, w.kwargs) for w in batch])
+            except Exception as e:
+                print(f"Database batch failed: {e}")
+                results = [(None, e)] * len(batch)
+
+            self.batches += 1
+            self.writes += len(items)
+            for write, (result, error) in zip(batch, results):
+                for loop, future in write.waiters:
+                    loop.call_soon_threadsafe(_resolve, future, result, error)
+
+    def stats(self) -> dict:
+        return {
+            'batches': self.batches,
+            'writes': self.writes,
+            'coalesced': self.coalesced,
+            'queued': self._writes.qsize(),
+        }
+
+    # ---- reads ----
+    async def get_user(self, telegram_id: int) -> Optional[Dict]:
+        return await self._read(self.db.get_user, telegram_id)
+
+    async def get_active_xl_account(self, telegram_id: int) -> Optional[Dict]:
+        return await self._read(self.db.get_active_xl_account, telegram_id)
+
+    async def get_all_xl_accounts(self, telegram_id: int) -> List[Dict]:
+        return await self._read(self.db.get_all_xl_accounts, telegram_id)
+
+    async def get_bookmarks(self, telegram_id: int) -> List[Dict]:
+        return await self._read(self.db.get_bookmarks, telegram_id)
+
+    async def get_preferences(self, telegram_id: int) -> Dict:
+        return await self._read(self.db.get_preferences, telegram_id)
+
+    async def fetch_all(self, sql: str, params: tuple = ()) -> List[Dict]:
+        return await self._read(self.db.fetch_all, sql, params)
+
+    async def fetch_one(self, sql: str, params: tuple = ()) -> Optional[Dict]:
+        return await self._read(self.db.fetch_one, sql, params)
+
+    # ---- writes ----
+    async def create_or_update_user(self, telegram_id: int, username: str = None,
+                                    first_name: str = None, last_name: str = None):
+        return await self._write("create_or_update_user", telegram_id=telegram_id, username=username,
+                                 first_name=first_name, last_name=last_name)
+
+    async def add_xl_account(self, telegram_id: int, phone_number: str,
+                             refresh_token: str, subscriber_id: str = None,
+                             subscription_type: str = None) -> bool:
+        return await self._write("add_xl_account", telegram_id=telegram_id, phone_number=phone_number,
+                                 refresh_token=refresh_token, subscriber_id=subscriber_id,
+                                 subscription_type=subscription_type)
+
+    async def update_xl_tokens(self, telegram_id: int, phone_number: str,
+                               access_token: str = None, id_token: str = None,
+                               refresh_token: str = None):
+        return await self._write("update_xl_tokens", telegram_id=telegram_id, phone_number=phone_number,
+                                 access_token=access_token, id_token=id_token,
+                                 refresh_token=refresh_token)
+
+    def update_xl_tokens_nowait(self, telegram_id: int, phone_number: str,
+                                access_token: str = None, id_token: str = None,
+                                refresh_token: str = None):
+        """Queue a token update without waiting for it, the writer persists it
+        with the next batch (within DB_WRITE_LINGER unless the queue is backed up)"""
+        self._write_nowait("update_xl_tokens", telegram_id=telegram_id, phone_number=phone_number,
+                           access_token=access_token, id_token=id_token,
+                           refresh_token=refresh_token)
+
+    async def set_active_xl_account(self, telegram_id: int, phone_number: str) -> bool:
+        return await self._write("set_active_xl_account", telegram_id=telegram_id, phone_number=phone_number)
+
+    async def delete_xl_account(self, telegram_id: int, phone_number: str) -> bool:
+        return await self._write("delete_xl_account", telegram_id=telegram_id, phone_number=phone_number)
+
+    async def add_bookmark(self, telegram_id: int, family_code: str, family_name: str,
+                           is_enterprise: bool, variant_name: str, option_name: str,
+                           order_num: int) -> bool:
+        return await self._write("add_bookmark", telegram_id=telegram_id, family_code=family_code,
+                                 family_name=family_name, is_enterprise=is_enterprise,
+                                 variant_name=variant_name, option_name=option_name,
+                                 order_num=order_num)
+
+    async def delete_bookmark(self, telegram_id: int, bookmark_id: int) -> bool:
+        return await self._write("delete_bookmark", telegram_id=telegram_id, bookmark_id=bookmark_id)
+
+    async def update_preferences(self, telegram_id: int, **kwargs):
+        return await self._write("update_preferences", telegram_id, **kwargs)
+
+
+def _resolve(future, result, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+# Global async database instance
+adb = AsyncDatabase(db)
@@ -18,14 +18,95 @@ class Database:
     def __init__(self):
         if not hasattr(self, 'initialized'):
             self.db_path = "telegram_bot.db"
+            self._local = threading.local()
+            self._connections = []
+            self._connections_lock = threading.Lock()
             self.initialized = True
     
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's database connection (kept open and reused)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Each connection is only used by the thread that opened it,
+            # check_same_thread=False just lets close_all() close it at shutdown
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=5.0,
+                cached_statements=256,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            # WAL lets readers run while a write is in progress, NORMAL only
+            # fsyncs at checkpoints which is safe in WAL mode.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
         return conn
     
+    def close_all(self):
+        """Close every thread's connection, call it after the threads using
+        them have stopped"""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    print(f"Error closing database connection: {e}")
+            self._connections.clear()
+        self._local = threading.local()
+    
+    def _commit(self, conn):
+        # Inside run_batch() the whole group is committed at once
+        if not getattr(self._local, 'batching', False):
+            conn.commit()
+    
+    def _rollback(self, conn):
+        if getattr(self._local, 'batching', False):
+            conn.execute("ROLLBACK TO batch_op")
+        else:
+            conn.rollback()
+    
+    def run_batch(self, ops: List[tuple]) -> List[tuple]:
+        """Run write operations in one transaction, each inside its own savepoint.
+        ops is a list of (method_name, args, kwargs), returns a list of
+        (result, exception) in the same order."""
+        conn = self.get_connection()
+        results = []
+        self._local.batching = True
+        try:
+            conn.execute("BEGIN")
+            for name, args, kwargs in ops:
+                conn.execute("SAVEPOINT batch_op")
+                try:
+                    results.append((getattr(self, name)(*args, **kwargs), None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO batch_op")
+                    results.append((None, e))
+                conn.execute("RELEASE batch_op")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.batching = False
+        return results
+    
+    def fetch_all(self, sql: str, params: tuple = ()) -> List[Dict]:
+        """Run a read-only query and return all rows"""
+        cursor = self.get_connection().cursor()
+        cursor.execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def fetch_one(self, sql: str, params: tuple = ()) -> Optional[Dict]:
+        """Run a read-only query and return the first row"""
+        cursor = self.get_connection().cursor()
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    
     def init_db(self):
         """Initialize database tables"""
         conn = self.get_connection()
@@ -89,8 +170,17 @@ class Database:
             )
         """)
         
+        # Indexes for the per-update lookups
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_xl_accounts_telegram_active
+            ON xl_accounts (telegram_id, is_active)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_bookmarks_telegram_created
+            ON bookmarks (telegram_id, created_at)
+        """)
+        
         conn.commit()
-        conn.close()
     
     # User operations
     def create_or_update_user(self, telegram_id: int, username: str = None, 
@@ -99,18 +189,21 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            INSERT INTO users (telegram_id, username, first_name, last_name)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(telegram_id) DO UPDATE SET
-                username = excluded.username,
-                first_name = excluded.first_name,
-                last_name = excluded.last_name,
-                updated_at = CURRENT_TIMESTAMP
-        """, (telegram_id, username, first_name, last_name))
-        
-        conn.commit()
-        conn.close()
+        try:
+            cursor.execute("""
+                INSERT INTO users (telegram_id, username, first_name, last_name)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(telegram_id) DO UPDATE SET
+                    username = excluded.username,
+                    first_name = excluded.first_name,
+                    last_name = excluded.last_name,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (telegram_id, username, first_name, last_name))
+            
+            self._commit(conn)
+        except Exception as e:
+            print(f"Error saving user: {e}")
+            self._rollback(conn)
     
     def get_user(self, telegram_id: int) -> Optional[Dict]:
         """Get user by telegram ID"""
@@ -119,7 +212,6 @@ class Database:
         
         cursor.execute("SELECT * FROM users WHERE telegram_id = ?", (telegram_id,))
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             return dict(row)
@@ -155,13 +247,12 @@ class Database:
                     updated_at = CURRENT_TIMESTAMP
             """, (telegram_id, phone_number, refresh_token, subscriber_id, subscription_type))
             
-            conn.commit()
+            self._commit(conn)
             return True
         except Exception as e:
             print(f"Error adding XL account: {e}")
+            self._rollback(conn)
             return False
-        finally:
-            conn.close()
     
     def update_xl_tokens(self, telegram_id: int, phone_number: str,
                          access_token: str = None, id_token: str = None,
@@ -187,14 +278,17 @@ class Database:
             updates.append("updated_at = CURRENT_TIMESTAMP")
             params.extend([telegram_id, phone_number])
             
-            cursor.execute(f"""
-                UPDATE xl_accounts 
-                SET {', '.join(updates)}
-                WHERE telegram_id = ? AND phone_number = ?
-            """, params)
-            
-            conn.commit()
-        conn.close()
+            try:
+                cursor.execute(f"""
+                    UPDATE xl_accounts 
+                    SET {', '.join(updates)}
+                    WHERE telegram_id = ? AND phone_number = ?
+                """, params)
+                
+                self._commit(conn)
+            except Exception as e:
+                print(f"Error updating XL tokens: {e}")
+                self._rollback(conn)
     
     def get_active_xl_account(self, telegram_id: int) -> Optional[Dict]:
         """Get active XL account for user"""
@@ -207,7 +301,6 @@ class Database:
         """, (telegram_id,))
         
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             return dict(row)
@@ -225,7 +318,6 @@ class Database:
         """, (telegram_id,))
         
         rows = cursor.fetchall()
-        conn.close()
         
         return [dict(row) for row in rows]
     
@@ -249,13 +341,12 @@ class Database:
                 WHERE telegram_id = ? AND phone_number = ?
             """, (telegram_id, phone_number))
             
-            conn.commit()
+            self._commit(conn)
             return True
         except Exception as e:
             print(f"Error setting active account: {e}")
+            self._rollback(conn)
             return False
-        finally:
-            conn.close()
     
     def delete_xl_account(self, telegram_id: int, phone_number: str) -> bool:
         """Delete XL account"""
@@ -268,13 +359,12 @@ class Database:
                 WHERE telegram_id = ? AND phone_number = ?
             """, (telegram_id, phone_number))
             
-            conn.commit()
+            self._commit(conn)
             return True
         except Exception as e:
             print(f"Error deleting account: {e}")
+            self._rollback(conn)
             return False
-        finally:
-            conn.close()
     
     # Bookmark operations
     def add_bookmark(self, telegram_id: int, family_code: str, family_name: str,
@@ -293,12 +383,11 @@ class Database:
             """, (telegram_id, family_code, family_name, is_enterprise,
                   variant_name, option_name, order_num))
             
-            conn.commit()
+            self._commit(conn)
             return True
         except sqlite3.IntegrityError:
+            self._rollback(conn)
             return False
-        finally:
-            conn.close()
     
     def get_bookmarks(self, telegram_id: int) -> List[Dict]:
         """Get all bookmarks for user"""
@@ -312,7 +401,6 @@ class Database:
         """, (telegram_id,))
         
         rows = cursor.fetchall()
-        conn.close()
         
         return [dict(row) for row in rows]
     
@@ -327,13 +415,12 @@ class Database:
                 WHERE telegram_id = ? AND id = ?
             """, (telegram_id, bookmark_id))
             
-            conn.commit()
+            self._commit(conn)
             return True
         except Exception as e:
             print(f"Error deleting bookmark: {e}")
+            self._rollback(conn)
             return False
-        finally:
-            conn.close()
     
     # User preferences
     def get_preferences(self, telegram_id: int) -> Dict:
@@ -347,7 +434,6 @@ class Database:
         """, (telegram_id,))
         
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             return dict(row)
@@ -370,8 +456,7 @@ class Database:
         """, (telegram_id, kwargs.get('language', 'en'), 
               kwargs.get('notifications_enabled', True)))
         
-        conn.commit()
-        conn.close()
+        self._commit(conn)
 
 
 # Initialize database instance
@@ -1,7 +1,7 @@
 # account_handler.py
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from bot.database import db
+from bot.async_database import adb
 from bot.utils import refresh_user_session
 
 
@@ -10,7 +10,7 @@ async def show_accounts(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query if update.callback_query else None
     user = update.effective_user
     
-    accounts = db.get_all_xl_accounts(user.id)
+    accounts = await adb.get_all_xl_accounts(user.id)
     
     if not accounts:
         text = "⚙️ <b>Kelola Akun</b>\n\n"
@@ -79,11 +79,11 @@ async def handle_account_action(update: Update, context: ContextTypes.DEFAULT_TY
         phone_number = action.replace("switch_", "")
         
         # Switch active account
-        success = db.set_active_xl_account(user.id, phone_number)
+        success = await adb.set_active_xl_account(user.id, phone_number)
         
         if success:
             # Refresh session
-            refresh_user_session(user.id)
+            await refresh_user_session(user.id)
             
             await query.answer("✅ Akun berhasil diganti!", show_alert=True)
             
@@ -97,7 +97,7 @@ async def handle_account_action(update: Update, context: ContextTypes.DEFAULT_TY
         phone_number = action.replace("delete_", "")
         
         # Delete account
-        success = db.delete_xl_account(user.id, phone_number)
+        success = await adb.delete_xl_account(user.id, phone_number)
         
         if success:
             await query.answer("✅ Akun berhasil dihapus!", show_alert=True)
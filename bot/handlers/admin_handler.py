@@ -4,7 +4,8 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
 from bot.database import db
 from bot.utils import get_user_session, format_currency
-import json
+from app.service.hot_catalog import HotCatalogInstance
+from app.service.metrics import MetricsInstance, format_summary
 import os
 
 # Admin user IDs (tambahkan Telegram ID admin di sini)
@@ -20,6 +21,30 @@ def is_admin(user_id: int) -> bool:
     return user_id in ADMIN_IDS
 
 
+async def metrics_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Perintah /metrics, ringkasan latency per endpoint XL"""
+    from bot.handlers.db_handler import send_long_text
+    
+    user = update.effective_user
+    if not is_admin(user.id):
+        await update.message.reply_text("❌ Anda tidak memiliki akses admin.")
+        return
+    
+    if context.args and context.args[0].lower() == "raw":
+        await send_long_text(update.message, MetricsInstance.render())
+        return
+    
+    text = "📈 API METRICS (p99 tertinggi dulu)\n\n" + format_summary()
+    for name, values in MetricsInstance.collectors().items():
+        numbers = ", ".join(
+            f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+            for k, v in values.items()
+            if isinstance(v, (int, float)) and not isinstance(v, bool)
+        )
+        text += f"\n\n{name}: {numbers}"
+    await send_long_text(update.message, text)
+
+
 async def admin_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show admin menu"""
     query = update.callback_query if update.callback_query else None
@@ -77,8 +102,7 @@ async def list_hot_packages(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     
     try:
-        with open("hot_data/hot.json", "r", encoding="utf-8") as f:
-            hot_packages = json.load(f)
+        hot_packages = HotCatalogInstance.hot()
         
         text = "📋 <b>Daftar Paket Hot</b>\n\n"
         
@@ -110,8 +134,7 @@ async def show_delete_hot_menu(update: Update, context: ContextTypes.DEFAULT_TYP
     query = update.callback_query
     
     try:
-        with open("hot_data/hot.json", "r", encoding="utf-8") as f:
-            hot_packages = json.load(f)
+        hot_packages = HotCatalogInstance.hot()
         
         if not hot_packages:
             await query.answer("❌ Tidak ada paket untuk dihapus", show_alert=True)
@@ -145,17 +168,11 @@ async def delete_hot_package(update: Update, context: ContextTypes.DEFAULT_TYPE,
     query = update.callback_query
     
     try:
-        with open("hot_data/hot.json", "r", encoding="utf-8") as f:
-            hot_packages = json.load(f)
-        
-        if idx >= len(hot_packages):
+        if idx >= len(HotCatalogInstance.hot()):
             await query.answer("❌ Paket tidak ditemukan", show_alert=True)
             return
         
-        deleted = hot_packages.pop(idx)
-        
-        with open("hot_data/hot.json", "w", encoding="utf-8") as f:
-            json.dump(hot_packages, f, indent=4, ensure_ascii=False)
+        deleted = HotCatalogInstance.update("hot", lambda packages: packages.pop(idx))
         
         await query.answer("✅ Paket berhasil dihapus!", show_alert=True)
         await list_hot_packages(update, context)
@@ -198,7 +215,7 @@ async def receive_family_code(update: Update, context: ContextTypes.DEFAULT_TYPE
     context.user_data['admin_family_code'] = family_code
     
     user = update.effective_user
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     
     if not session:
         await update.message.reply_text("❌ Sesi berakhir. Silakan /login")
@@ -208,14 +225,15 @@ async def receive_family_code(update: Update, context: ContextTypes.DEFAULT_TYPE
     loading_msg = await update.message.reply_text("🔍 Mencari paket...")
     
     try:
-        from app.client.engsel import get_family
+        from app.client.aio.engsel import get_family
         
-        family_data = get_family(
+        family_data = await get_family(
             session['api_key'],
             session['tokens'],
             family_code,
             None,
-            None
+            None,
+            session.get('subscription_type', '')
         )
         
         if not family_data:
@@ -301,9 +319,6 @@ async def receive_option_choice(update: Update, context: ContextTypes.DEFAULT_TY
     
     # Save to hot.json
     try:
-        with open("hot_data/hot.json", "r", encoding="utf-8") as f:
-            hot_packages = json.load(f)
-        
         family_data = context.user_data.get('admin_family_data')
         
         new_package = {
@@ -315,10 +330,7 @@ async def receive_option_choice(update: Update, context: ContextTypes.DEFAULT_TY
             "order": selected_option['order']
         }
         
-        hot_packages.append(new_package)
-        
-        with open("hot_data/hot.json", "w", encoding="utf-8") as f:
-            json.dump(hot_packages, f, indent=4, ensure_ascii=False)
+        HotCatalogInstance.update("hot", lambda packages: packages.append(new_package))
         
         await update.message.reply_text(
             f"✅ <b>Berhasil ditambahkan!</b>\n\n"
@@ -362,8 +374,7 @@ async def list_hot2_packages(update: Update, context: ContextTypes.DEFAULT_TYPE)
     query = update.callback_query
     
     try:
-        with open("hot_data/hot2.json", "r", encoding="utf-8") as f:
-            hot2_packages = json.load(f)
+        hot2_packages = HotCatalogInstance.hot2()
         
         text = "📋 <b>Daftar Paket Hot2</b>\n\n"
         
@@ -396,8 +407,7 @@ async def show_delete_hot2_menu(update: Update, context: ContextTypes.DEFAULT_TY
     query = update.callback_query
     
     try:
-        with open("hot_data/hot2.json", "r", encoding="utf-8") as f:
-            hot2_packages = json.load(f)
+        hot2_packages = HotCatalogInstance.hot2()
         
         if not hot2_packages:
             await query.answer("❌ Tidak ada paket untuk dihapus", show_alert=True)
@@ -431,17 +441,11 @@ async def delete_hot2_package(update: Update, context: ContextTypes.DEFAULT_TYPE
     query = update.callback_query
     
     try:
-        with open("hot_data/hot2.json", "r", encoding="utf-8") as f:
-            hot2_packages = json.load(f)
-        
-        if idx >= len(hot2_packages):
+        if idx >= len(HotCatalogInstance.hot2()):
             await query.answer("❌ Paket tidak ditemukan", show_alert=True)
             return
         
-        deleted = hot2_packages.pop(idx)
-        
-        with open("hot_data/hot2.json", "w", encoding="utf-8") as f:
-            json.dump(hot2_packages, f, indent=4, ensure_ascii=False)
+        deleted = HotCatalogInstance.update("hot2", lambda packages: packages.pop(idx))
         
         await query.answer("✅ Paket berhasil dihapus!", show_alert=True)
         await list_hot2_packages(update, context)
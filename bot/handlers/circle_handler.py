@@ -24,7 +24,7 @@ async def show_circle_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query if update.callback_query else None
     user = update.effective_user
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         text = "❌ Sesi berakhir. Silakan /login kembali."
         if query:
@@ -34,11 +34,12 @@ async def show_circle_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     try:
-        from app.client.circle import get_group_data, get_group_members, spending_tracker
-        from app.client.encrypt import decrypt_circle_msisdn
+        from app.client.aio.circle import get_circle_overview
+        from app.client.circle import circle_msisdns
         
-        # Get group data
-        group_res = get_group_data(session['api_key'], session['tokens'])
+        # Group, anggota dan spending diambil bersamaan
+        overview = await get_circle_overview(session['api_key'], session['tokens'], session['phone_number'])
+        group_res = overview['group']
         
         if group_res.get('status') != 'SUCCESS':
             text = "⭕ <b>Circle</b>\n\n"
@@ -58,8 +59,7 @@ async def show_circle_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 group_name = group_data.get('group_name', 'N/A')
                 owner_name = group_data.get('owner_name', 'N/A')
                 
-                # Get members
-                members_res = get_group_members(session['api_key'], session['tokens'], group_id)
+                members_res = overview['members'] or {}
                 
                 if members_res.get('status') != 'SUCCESS':
                     text = "⭕ <b>Circle</b>\n\n"
@@ -70,30 +70,14 @@ async def show_circle_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     members = members_data.get('members', [])
                     package = members_data.get('package', {})
                     
-                    # Find parent info
-                    parent_subs_id = ""
-                    for member in members:
-                        if member.get('member_role') == 'PARENT':
-                            parent_subs_id = member.get('subscriber_number', '')
-                            break
-                    
-                    # Get spending tracker
+                    # Spending tracker
                     spend = 0
                     target = 0
-                    if parent_subs_id:
-                        try:
-                            spending_res = spending_tracker(
-                                session['api_key'],
-                                session['tokens'],
-                                parent_subs_id,
-                                group_id
-                            )
-                            if spending_res.get('status') == 'SUCCESS':
-                                spending_data = spending_res.get('data', {})
-                                spend = spending_data.get('spend', 0)
-                                target = spending_data.get('target', 0)
-                        except:
-                            pass
+                    spending_res = overview['spending'] or {}
+                    if spending_res.get('status') == 'SUCCESS':
+                        spending_data = spending_res.get('data', {})
+                        spend = spending_data.get('spend', 0)
+                        target = spending_data.get('target', 0)
                     
                     # Build message
                     text = f"⭕ <b>Circle: {group_name}</b>\n"
@@ -118,13 +102,8 @@ async def show_circle_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     
                     # Members
                     text += "<b>Anggota:</b>\n"
-                    for idx, member in enumerate(members[:5], 1):
-                        encrypted_msisdn = member.get('msisdn', '')
-                        try:
-                            msisdn = decrypt_circle_msisdn(session['api_key'], encrypted_msisdn)
-                        except:
-                            msisdn = "Hidden"
-                        
+                    msisdns = circle_msisdns(session['api_key'], group_id, members[:5])
+                    for idx, (member, msisdn) in enumerate(zip(members[:5], msisdns), 1):
                         member_name = member.get('member_name', 'N/A')
                         member_role = member.get('member_role', 'N/A')
                         member_status = member.get('status', 'N/A')
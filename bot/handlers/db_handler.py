@@ -1,6 +1,6 @@
 from telegram import Update
 from telegram.ext import ContextTypes
-from bot.database import db
+from bot.async_database import adb
 
 
 MAX_TELEGRAM_TEXT = 4000  # aman < 4096
@@ -57,11 +57,7 @@ async def db_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # /db users
     # ========================
     if cmd == "users":
-        conn = db.get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM users ORDER BY created_at DESC")
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
+        rows = await adb.fetch_all("SELECT * FROM users ORDER BY created_at DESC")
 
         if not rows:
             return await msg.reply_text("❌ Tidak ada user.")
@@ -79,11 +75,7 @@ async def db_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # /db accounts
     # ========================
     if cmd == "accounts":
-        conn = db.get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM xl_accounts ORDER BY updated_at DESC")
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
+        rows = await adb.fetch_all("SELECT * FROM xl_accounts ORDER BY updated_at DESC")
 
         if not rows:
             return await msg.reply_text("❌ Tidak ada akun XL.")
@@ -103,13 +95,9 @@ async def db_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # /db bookmarks
     # ========================
     if cmd == "bookmarks":
-        conn = db.get_connection()
-        cur = conn.cursor()
-        cur.execute(
+        rows = await adb.fetch_all(
             "SELECT * FROM bookmarks ORDER BY created_at DESC"
         )
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
 
         if not rows:
             return await msg.reply_text("❌ Tidak ada bookmark.")
@@ -129,11 +117,7 @@ async def db_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # /db prefs
     # ========================
     if cmd == "prefs":
-        conn = db.get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM user_preferences")
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
+        rows = await adb.fetch_all("SELECT * FROM user_preferences")
 
         if not rows:
             return await msg.reply_text("❌ Tidak ada preferences.")
@@ -156,7 +140,7 @@ async def db_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         except ValueError:
             return await msg.reply_text("❌ telegram_id harus angka.")
 
-        row = db.get_user(tid)
+        row = await adb.get_user(tid)
         if not row:
             return await msg.reply_text("❌ User tidak ditemukan.")
 
@@ -172,14 +156,10 @@ async def db_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # ========================
     if cmd == "phone" and len(args) > 1:
         phone = args[1]
-        conn = db.get_connection()
-        cur = conn.cursor()
-        cur.execute(
+        r = await adb.fetch_one(
             "SELECT * FROM xl_accounts WHERE phone_number = ?",
             (phone,),
         )
-        r = cur.fetchone()
-        conn.close()
 
         if not r:
             return await msg.reply_text("❌ Nomor tidak ditemukan.")
@@ -24,7 +24,7 @@ async def show_family_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query if update.callback_query else None
     user = update.effective_user
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         text = "❌ Sesi berakhir. Silakan /login kembali."
         if query:
@@ -34,9 +34,9 @@ async def show_family_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     try:
-        from app.client.famplan import get_family_data
+        from app.client.aio.famplan import get_family_data
         
-        res = get_family_data(session['api_key'], session['tokens'])
+        res = await get_family_data(session['api_key'], session['tokens'])
         
         if not res.get('data'):
             text = "👨‍👩‍👧 <b>Family Plan</b>\n\n"
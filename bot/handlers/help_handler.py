@@ -14,6 +14,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 /start - Mulai bot dan tampilkan menu utama
 /login - Login dengan nomor XL
 /profile - Lihat profil akun
+/cari - Cari paket (nama, harga, kuota, masa aktif)
 /help - Tampilkan bantuan
 /cancel - Batalkan operasi saat ini
 
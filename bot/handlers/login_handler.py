@@ -1,9 +1,9 @@
 # login_handler.py
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
-from bot.database import db
-from app.client.ciam import get_otp, submit_otp
-from app.client.engsel import get_profile
+from bot.async_database import adb
+from app.client.aio.ciam import get_otp, submit_otp
+from app.client.aio.engsel import get_profile
 from app.util import ensure_api_key
 
 # Conversation states
@@ -46,7 +46,7 @@ async def receive_phone(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     await update.message.reply_text("⏳ Meminta OTP...")
     
     try:
-        subscriber_id = get_otp(phone_number)
+        subscriber_id = await get_otp(phone_number)
         
         if not subscriber_id:
             await update.message.reply_text(
@@ -108,7 +108,7 @@ async def receive_otp(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
         api_key = ensure_api_key()
         
         # Submit OTP
-        tokens = submit_otp(api_key, "SMS", phone_number, otp_code)
+        tokens = await submit_otp(api_key, "SMS", phone_number, otp_code)
         
         if not tokens:
             context.user_data['otp_attempts'] = attempts + 1
@@ -122,12 +122,12 @@ async def receive_otp(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
             return LOGIN_OTP
         
         # Get profile info
-        profile_data = get_profile(api_key, tokens['access_token'], tokens['id_token'])
+        profile_data = await get_profile(api_key, tokens['access_token'], tokens['id_token'])
         subscription_type = profile_data['profile']['subscription_type']
         
         # Save to database
         user = update.effective_user
-        success = db.add_xl_account(
+        success = await adb.add_xl_account(
             telegram_id=user.id,
             phone_number=phone_number,
             refresh_token=tokens['refresh_token'],
@@ -136,7 +136,7 @@ async def receive_otp(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
         )
         
         # Update tokens
-        db.update_xl_tokens(
+        await adb.update_xl_tokens(
             telegram_id=user.id,
             phone_number=phone_number,
             access_token=tokens['access_token'],
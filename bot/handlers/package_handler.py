@@ -1,10 +1,15 @@
 # bot/handlers/package_handler.py
 
+import asyncio
+from html import escape
+
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from bot.database import db
+from bot.async_database import adb
 from bot.utils import get_user_session, format_currency, format_quota
-import json
+from app.service.hot_catalog import HotCatalogInstance
+from app.service.hot_resolver import HotResolverInstance, find_option_code
+from app.service.catalog_index import CatalogIndexInstance, catalog_key, search_catalog
 
 
 async def handle_package_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -50,12 +55,64 @@ async def handle_family_pagination(update: Update, context: ContextTypes.DEFAULT
     await show_family_packages(update, context, family_code, page)
 
 
+def _build_hot_menu(hot_packages: list) -> tuple:
+    """Message text and keyboard for the hot list, cached by HotCatalog"""
+    text = "🔥 <b>Paket Hot</b>\n\n"
+    text += "Paket-paket pilihan terbaik:\n\n"
+    
+    keyboard = []
+    for idx, pkg in enumerate(hot_packages[:10]):
+        family_name = pkg.get('family_name', 'N/A')
+        variant_name = pkg.get('variant_name', 'N/A')
+        option_name = pkg.get('option_name', 'N/A')
+        
+        text += f"{idx+1}. {family_name} - {option_name}\n"
+        
+        keyboard.append([InlineKeyboardButton(
+            f"{idx+1}. {option_name[:30]}",
+            callback_data=f"hot_select_{idx}"
+        )])
+    
+    keyboard.append([InlineKeyboardButton("🔙 Kembali", callback_data="menu_back")])
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    return text, reply_markup
+
+
+def _build_hot2_menu(hot2_packages: list) -> tuple:
+    """Message text and keyboard for the hot2 list, cached by HotCatalog"""
+    text = "🔥🔥 <b>Paket Hot2 (Bundle)</b>\n\n"
+    text += "Paket bundle dengan harga spesial:\n\n"
+    
+    keyboard = []
+    for idx, pkg in enumerate(hot2_packages[:10]):
+        name = pkg.get('name', 'N/A')
+        price = pkg.get('price', 'N/A')
+        detail = pkg.get('detail', '')
+        
+        text += f"{idx+1}. <b>{name}</b>\n"
+        text += f"   💰 {price}\n"
+        if detail:
+            # Show first line of detail only
+            first_line = detail.split('\n')[0]
+            text += f"   📝 {first_line[:40]}...\n"
+        text += "\n"
+        
+        keyboard.append([InlineKeyboardButton(
+            f"{idx+1}. {name[:30]}",
+            callback_data=f"hot2_select_{idx}"
+        )])
+    
+    keyboard.append([InlineKeyboardButton("🔙 Kembali", callback_data="pkg_store")])
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    return text, reply_markup
+
+
 async def show_hot_packages(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show hot packages"""
     query = update.callback_query
     user = update.effective_user
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         await query.edit_message_text(
             "❌ Sesi berakhir. Silakan /login kembali."
@@ -65,27 +122,7 @@ async def show_hot_packages(update: Update, context: ContextTypes.DEFAULT_TYPE):
     loading_msg = await query.edit_message_text("⏳ Memuat paket...")
     
     try:
-        with open("hot_data/hot.json", "r", encoding="utf-8") as f:
-            hot_packages = json.load(f)
-        
-        text = "🔥 <b>Paket Hot</b>\n\n"
-        text += "Paket-paket pilihan terbaik:\n\n"
-        
-        keyboard = []
-        for idx, pkg in enumerate(hot_packages[:10]):
-            family_name = pkg.get('family_name', 'N/A')
-            variant_name = pkg.get('variant_name', 'N/A')
-            option_name = pkg.get('option_name', 'N/A')
-            
-            text += f"{idx+1}. {family_name} - {option_name}\n"
-            
-            keyboard.append([InlineKeyboardButton(
-                f"{idx+1}. {option_name[:30]}",
-                callback_data=f"hot_select_{idx}"
-            )])
-        
-        keyboard.append([InlineKeyboardButton("🔙 Kembali", callback_data="menu_back")])
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        text, reply_markup = HotCatalogInstance.derived("hot", "bot_menu", _build_hot_menu)
         
         await loading_msg.edit_text(
             text,
@@ -105,7 +142,7 @@ async def show_hot2_packages(update: Update, context: ContextTypes.DEFAULT_TYPE)
     query = update.callback_query
     user = update.effective_user
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         await query.edit_message_text(
             "❌ Sesi berakhir. Silakan /login kembali."
@@ -115,33 +152,7 @@ async def show_hot2_packages(update: Update, context: ContextTypes.DEFAULT_TYPE)
     loading_msg = await query.edit_message_text("⏳ Memuat paket...")
     
     try:
-        with open("hot_data/hot2.json", "r", encoding="utf-8") as f:
-            hot2_packages = json.load(f)
-        
-        text = "🔥🔥 <b>Paket Hot2 (Bundle)</b>\n\n"
-        text += "Paket bundle dengan harga spesial:\n\n"
-        
-        keyboard = []
-        for idx, pkg in enumerate(hot2_packages[:10]):
-            name = pkg.get('name', 'N/A')
-            price = pkg.get('price', 'N/A')
-            detail = pkg.get('detail', '')
-            
-            text += f"{idx+1}. <b>{name}</b>\n"
-            text += f"   💰 {price}\n"
-            if detail:
-                # Show first line of detail only
-                first_line = detail.split('\n')[0]
-                text += f"   📝 {first_line[:40]}...\n"
-            text += "\n"
-            
-            keyboard.append([InlineKeyboardButton(
-                f"{idx+1}. {name[:30]}",
-                callback_data=f"hot2_select_{idx}"
-            )])
-        
-        keyboard.append([InlineKeyboardButton("🔙 Kembali", callback_data="pkg_store")])
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        text, reply_markup = HotCatalogInstance.derived("hot2", "bot_menu", _build_hot2_menu)
         
         await loading_msg.edit_text(
             text,
@@ -162,7 +173,7 @@ async def handle_hot_packages(update: Update, context: ContextTypes.DEFAULT_TYPE
     await query.answer()
     
     user = update.effective_user
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     
     if not session:
         await query.edit_message_text(
@@ -176,8 +187,7 @@ async def handle_hot_packages(update: Update, context: ContextTypes.DEFAULT_TYPE
         try:
             idx = int(action.replace("select_", ""))
             
-            with open("hot_data/hot.json", "r", encoding="utf-8") as f:
-                hot_packages = json.load(f)
+            hot_packages = HotCatalogInstance.hot()
             
             if idx >= len(hot_packages):
                 await query.edit_message_text("❌ Paket tidak ditemukan.")
@@ -185,28 +195,27 @@ async def handle_hot_packages(update: Update, context: ContextTypes.DEFAULT_TYPE
             
             selected = hot_packages[idx]
             
-            from app.client.engsel import get_family
-            
-            loading_msg = await query.edit_message_text("⏳ Memuat detail paket...")
-            
-            family_data = get_family(
-                session['api_key'],
-                session['tokens'],
-                selected['family_code'],
-                selected.get('is_enterprise', False)
-            )
-            
-            if not family_data:
-                await loading_msg.edit_text("❌ Gagal memuat detail paket.")
-                return
-            
-            option_code = None
-            for variant in family_data['package_variants']:
-                if variant['name'] == selected['variant_name']:
-                    for option in variant['package_options']:
-                        if option['order'] == selected['order']:
-                            option_code = option['package_option_code']
-                            break
+            # Usually already resolved in the background
+            option_code = HotResolverInstance.option_code(session.get('subscription_type', ''), selected)
+            if option_code is None:
+                from app.client.aio.engsel import get_family
+                
+                loading_msg = await query.edit_message_text("⏳ Memuat detail paket...")
+                
+                family_data = await get_family(
+                    session['api_key'],
+                    session['tokens'],
+                    selected['family_code'],
+                    selected.get('is_enterprise', False),
+                    None,
+                    session.get('subscription_type', '')
+                )
+                
+                if not family_data:
+                    await loading_msg.edit_text("❌ Gagal memuat detail paket.")
+                    return
+                
+                option_code = find_option_code(family_data, selected)
             
             if option_code:
                 await show_package_detail(update, context, option_code)
@@ -223,7 +232,7 @@ async def handle_hot2_packages(update: Update, context: ContextTypes.DEFAULT_TYP
     await query.answer()
     
     user = update.effective_user
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     
     if not session:
         await query.edit_message_text(
@@ -237,8 +246,7 @@ async def handle_hot2_packages(update: Update, context: ContextTypes.DEFAULT_TYP
         try:
             idx = int(action.replace("select_", ""))
             
-            with open("hot_data/hot2.json", "r", encoding="utf-8") as f:
-                hot2_packages = json.load(f)
+            hot2_packages = HotCatalogInstance.hot2()
             
             if idx >= len(hot2_packages):
                 await query.edit_message_text("❌ Paket tidak ditemukan.")
@@ -258,7 +266,7 @@ async def show_hot2_detail(update: Update, context: ContextTypes.DEFAULT_TYPE, p
     query = update.callback_query
     user = update.effective_user
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         await query.edit_message_text("❌ Sesi berakhir. Silakan /login kembali.")
         return
@@ -266,27 +274,11 @@ async def show_hot2_detail(update: Update, context: ContextTypes.DEFAULT_TYPE, p
     loading_msg = await query.edit_message_text("⏳ Memuat detail paket...")
     
     try:
-        from app.client.engsel import get_package_details
-        
+        # Tampilan hanya memakai data hot2.json, detail paket diambil saat pembelian
         name = package_data.get('name', 'N/A')
         price = package_data.get('price', 'N/A')
         detail = package_data.get('detail', '')
         packages = package_data.get('packages', [])
-        payment_for = package_data.get('payment_for', 'BUY_PACKAGE')
-        
-        # Get first package details for display
-        main_package_detail = None
-        if packages:
-            first_pkg = packages[0]
-            main_package_detail = get_package_details(
-                session['api_key'],
-                session['tokens'],
-                first_pkg['family_code'],
-                first_pkg['variant_code'],
-                first_pkg['order'],
-                first_pkg.get('is_enterprise'),
-                first_pkg.get('migration_type')
-            )
         
         text = f"🔥🔥 <b>{name}</b>\n"
         text += "━━━━━━━━━━━━━━━━━━━━\n\n"
@@ -337,7 +329,7 @@ async def show_package_detail(update: Update, context: ContextTypes.DEFAULT_TYPE
     query = update.callback_query
     user = update.effective_user
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         await query.edit_message_text(
             "❌ Sesi berakhir. Silakan /login kembali."
@@ -347,9 +339,9 @@ async def show_package_detail(update: Update, context: ContextTypes.DEFAULT_TYPE
     loading_msg = await query.edit_message_text("⏳ Memuat detail paket...")
     
     try:
-        from app.client.engsel import get_package
+        from app.client.aio.engsel import get_package
         
-        package = get_package(
+        package = await get_package(
             session['api_key'],
             session['tokens'],
             option_code
@@ -430,7 +422,7 @@ async def show_my_packages(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query if update.callback_query else None
     user = update.effective_user
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         text = "❌ Sesi berakhir. Silakan /login kembali."
         if query:
@@ -445,7 +437,7 @@ async def show_my_packages(update: Update, context: ContextTypes.DEFAULT_TYPE):
         loading_msg = await update.message.reply_text("⏳ Memuat paket...")
     
     try:
-        from app.client.engsel import send_api_request
+        from app.client.aio.engsel import send_api_request, get_family_codes
         
         path = "api/v8/packages/quota-details"
         payload = {
@@ -454,7 +446,7 @@ async def show_my_packages(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "family_member_id": ""
         }
         
-        res = send_api_request(
+        res = await send_api_request(
             session['api_key'],
             path,
             payload,
@@ -472,9 +464,16 @@ async def show_my_packages(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if not quotas:
                 text += "Tidak ada paket aktif."
             else:
+                family_codes = await get_family_codes(
+                    session['api_key'],
+                    session['tokens'],
+                    [quota['quota_code'] for quota in quotas[:10]]
+                )
+                
                 for idx, quota in enumerate(quotas[:10], 1):
                     quota_name = quota.get('name', 'N/A')
                     text += f"{idx}. {quota_name}\n"
+                    text += f"   Family: <code>{family_codes.get(quota['quota_code'], 'N/A')}</code>\n"
                     
                     benefits = quota.get('benefits', [])
                     if benefits:
@@ -505,7 +504,7 @@ async def show_bookmarks(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     
     user = update.effective_user
-    bookmarks = db.get_bookmarks(user.id)
+    bookmarks = await adb.get_bookmarks(user.id)
     
     if not bookmarks:
         text = "⭐ <b>Bookmark</b>\n\nAnda belum memiliki bookmark."
@@ -535,7 +534,8 @@ async def show_store_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     
-    text = "🛒 <b>Semua Paket</b>\n\nPilih kategori:"
+    text = "🛒 <b>Semua Paket</b>\n\nPilih kategori:\n"
+    text += "Atau cari langsung dengan /cari &lt;nama&gt; harga&lt;50000 gb&gt;=10"
     
     keyboard = [
         [
@@ -557,7 +557,7 @@ async def show_store_segments(update: Update, context: ContextTypes.DEFAULT_TYPE
     await query.answer()
     
     user = update.effective_user
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     
     if not session:
         await query.edit_message_text("❌ Sesi berakhir. Silakan /login kembali.")
@@ -566,9 +566,10 @@ async def show_store_segments(update: Update, context: ContextTypes.DEFAULT_TYPE
     loading_msg = await query.edit_message_text("⏳ Memuat segments...")
     
     try:
-        from app.client.store.segments import get_segments
+        from app.service.store_cache import acached_segments
         
-        segments_res = get_segments(session['api_key'], session['tokens'], False)
+        # Salinan cache langsung ditampilkan, diperbarui di background setelah TTL
+        segments_res = await acached_segments(session['api_key'], session['tokens'], session['subscription_type'], False)
         
         if not segments_res or segments_res.get('status') != 'SUCCESS':
             await loading_msg.edit_text("❌ Gagal memuat segments")
@@ -671,7 +672,7 @@ async def show_family_packages(update: Update, context: ContextTypes.DEFAULT_TYP
     query = update.callback_query if update.callback_query else None
     user = update.effective_user
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         text = "❌ Sesi berakhir. Silakan /login kembali."
         if query:
@@ -681,14 +682,15 @@ async def show_family_packages(update: Update, context: ContextTypes.DEFAULT_TYP
         return
     
     try:
-        from app.client.engsel import get_family
+        from app.client.aio.engsel import get_family
         
-        family_data = get_family(
+        family_data = await get_family(
             session['api_key'],
             session['tokens'],
             family_code,
             None,
-            None
+            None,
+            session.get('subscription_type', '')
         )
         
         if not family_data:
@@ -795,13 +797,86 @@ async def show_family_packages(update: Update, context: ContextTypes.DEFAULT_TYP
             await update.message.reply_text(text)
 
 
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Perintah /cari, cari paket di katalog store lokal"""
+    user = update.effective_user
+    session = await get_user_session(user.id)
+    if not session:
+        await update.message.reply_text("❌ Sesi berakhir. Silakan /login kembali.")
+        return
+    
+    query = " ".join(context.args or []).strip()
+    if not query:
+        text = "🔎 <b>Cari Paket</b>\n\n"
+        text += "Gunakan: <code>/cari &lt;nama paket&gt; [filter]</code>\n\n"
+        text += "Filter:\n"
+        text += "• <code>harga&lt;50000</code> atau <code>harga:10000-30000</code>\n"
+        text += "• <code>gb&gt;=10</code> (kuota data)\n"
+        text += "• <code>hari:7-30</code> (masa aktif)\n\n"
+        text += "Contoh: <code>/cari combo harga&lt;60000 gb&gt;=20</code>"
+        await update.message.reply_text(text, parse_mode='HTML')
+        return
+    
+    subs_type = session.get('subscription_type') or 'PREPAID'
+    key = catalog_key(subs_type)
+    
+    try:
+        # Search runs on the local index, the store is fetched only when the index is stale
+        if await asyncio.to_thread(CatalogIndexInstance.is_stale, key):
+            from app.client.aio.store.search import get_store_packages
+            
+            loading_msg = await update.message.reply_text("⏳ Memuat katalog paket...")
+            res = await get_store_packages(session['api_key'], session['tokens'], subs_type)
+            if not res:
+                await loading_msg.edit_text("❌ Gagal memuat katalog paket")
+                return
+            await asyncio.to_thread(
+                CatalogIndexInstance.refresh,
+                key,
+                res.get('data', {}).get('results_price_only', [])
+            )
+            await loading_msg.delete()
+        
+        results = await asyncio.to_thread(search_catalog, key, query, 10)
+    except Exception as e:
+        await update.message.reply_text(f"❌ Error: {str(e)}")
+        return
+    
+    if not results:
+        await update.message.reply_text("🔎 Tidak ada paket yang cocok.")
+        return
+    
+    text = f"🔎 <b>Hasil pencarian:</b> {escape(query)}\n\n"
+    keyboard = []
+    for i, package in enumerate(results, 1):
+        text += f"{i}. <b>{escape(package['title'])}</b>\n"
+        text += f"   {escape(package['family_name'])} | {format_currency(package['price'])}"
+        if package['validity']:
+            text += f" | {escape(package['validity'])}"
+        text += "\n"
+        
+        # Opened through handle_segment_selection, same PDP/PLP actions
+        context.user_data[f"seg_cari_{i}"] = {
+            'action_type': package['action_type'],
+            'action_param': package['action_param'],
+            'title': package['title']
+        }
+        keyboard.append([InlineKeyboardButton(
+            f"{i}. {package['title'][:30]}",
+            callback_data=f"seg_cari_{i}"
+        )])
+    
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='HTML')
+
+
 async def handle_segment_selection(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle segment selection"""
     query = update.callback_query
     await query.answer()
     
     user = update.effective_user
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     
     if not session:
         await query.edit_message_text("❌ Sesi berakhir. Silakan /login kembali.")
@@ -852,15 +927,15 @@ async def add_current_bookmark(update: Update, context: ContextTypes.DEFAULT_TYP
         await query.answer("❌ Data paket tidak ditemukan", show_alert=True)
         return
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         await query.answer("❌ Sesi berakhir", show_alert=True)
         return
     
     try:
-        from app.client.engsel import get_package
+        from app.client.aio.engsel import get_package
         
-        package = get_package(
+        package = await get_package(
             session['api_key'],
             session['tokens'],
             package_info['option_code']
@@ -877,7 +952,7 @@ async def add_current_bookmark(update: Update, context: ContextTypes.DEFAULT_TYP
         order = package['package_option']['order']
         is_enterprise = False
         
-        success = db.add_bookmark(
+        success = await adb.add_bookmark(
             telegram_id=user.id,
             family_code=family_code,
             family_name=family_name,
@@ -902,7 +977,7 @@ async def handle_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     
     user = update.effective_user
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     
     if not session:
         await query.edit_message_text("❌ Sesi berakhir. Silakan /login kembali.")
@@ -1,7 +1,9 @@
+import asyncio
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
 from bot.utils import get_user_session, format_currency
 from app.type_dict import PaymentItem
+from app.service.tracing import current_span, traced
 import json
 
 # Conversation states
@@ -60,7 +62,7 @@ async def handle_payment_confirm(update: Update, context: ContextTypes.DEFAULT_T
     await query.answer()
     
     user = update.effective_user
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     
     if not session:
         await query.edit_message_text("❌ Sesi berakhir. Silakan /login kembali.")
@@ -120,7 +122,7 @@ async def receive_ewallet_phone(update: Update, context: ContextTypes.DEFAULT_TY
     # Clear waiting state
     context.user_data['waiting_ewallet_phone'] = False
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     package_info = context.user_data.get('current_package')
     payment_method = context.user_data.get('payment_method', 'DANA')
     
@@ -130,19 +132,20 @@ async def receive_ewallet_phone(update: Update, context: ContextTypes.DEFAULT_TY
     await execute_ewallet_purchase(update, context, session, package_info, payment_method, phone)
 
 
+@traced("bot.purchase.balance")
 async def execute_balance_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE,
                                    session: dict, package_info: dict):
     """Execute balance purchase"""
     query = update.callback_query if update.callback_query else None
     
     try:
-        from app.client.engsel import get_package
+        from app.client.aio.engsel import get_package
         from app.client.purchase.balance import settlement_balance
         
         option_code = package_info['option_code']
         
         # Get package details
-        package = get_package(
+        package = await get_package(
             session['api_key'],
             session['tokens'],
             option_code
@@ -177,7 +180,8 @@ async def execute_balance_purchase(update: Update, context: ContextTypes.DEFAULT
             msg = await update.message.reply_text(text)
         
         # Execute purchase
-        result = settlement_balance(
+        result = await asyncio.to_thread(
+            settlement_balance,
             api_key=session['api_key'],
             tokens=session['tokens'],
             items=payment_items,
@@ -207,6 +211,9 @@ async def execute_balance_purchase(update: Update, context: ContextTypes.DEFAULT
             await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='HTML')
             
     except Exception as e:
+        # Handled here, so the purchase span has to be marked failed by hand
+        current_span().set_status("ERROR")
+        current_span().add_event("exception", type=type(e).__name__, message=str(e))
         text = f"❌ Error: {str(e)}"
         if query:
             await query.edit_message_text(text)
@@ -214,6 +221,7 @@ async def execute_balance_purchase(update: Update, context: ContextTypes.DEFAULT
             await update.message.reply_text(text)
 
 
+@traced("bot.purchase.ewallet")
 async def execute_ewallet_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE,
                                    session: dict, package_info: dict, 
                                    payment_method: str, wallet_number: str = ""):
@@ -221,13 +229,13 @@ async def execute_ewallet_purchase(update: Update, context: ContextTypes.DEFAULT
     query = update.callback_query if update.callback_query else None
     
     try:
-        from app.client.engsel import get_package
+        from app.client.aio.engsel import get_package
         from app.client.purchase.ewallet import settlement_multipayment
         
         option_code = package_info['option_code']
         
         # Get package details
-        package = get_package(
+        package = await get_package(
             session['api_key'],
             session['tokens'],
             option_code
@@ -262,7 +270,8 @@ async def execute_ewallet_purchase(update: Update, context: ContextTypes.DEFAULT
             msg = await update.message.reply_text(text)
         
         # Execute purchase
-        result = settlement_multipayment(
+        result = await asyncio.to_thread(
+            settlement_multipayment,
             api_key=session['api_key'],
             tokens=session['tokens'],
             items=payment_items,
@@ -300,6 +309,9 @@ async def execute_ewallet_purchase(update: Update, context: ContextTypes.DEFAULT
             await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='HTML')
             
     except Exception as e:
+        # Handled here, so the purchase span has to be marked failed by hand
+        current_span().set_status("ERROR")
+        current_span().add_event("exception", type=type(e).__name__, message=str(e))
         text = f"❌ Error: {str(e)}"
         if query:
             await query.edit_message_text(text)
@@ -307,19 +319,20 @@ async def execute_ewallet_purchase(update: Update, context: ContextTypes.DEFAULT
             await update.message.reply_text(text)
 
 
+@traced("bot.purchase.qris")
 async def execute_qris_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE,
                                 session: dict, package_info: dict):
     """Execute QRIS purchase"""
     query = update.callback_query if update.callback_query else None
     
     try:
-        from app.client.engsel import get_package
+        from app.client.aio.engsel import get_package
         from app.client.purchase.qris import settlement_qris, get_qris_code
         
         option_code = package_info['option_code']
         
         # Get package details
-        package = get_package(
+        package = await get_package(
             session['api_key'],
             session['tokens'],
             option_code
@@ -354,7 +367,8 @@ async def execute_qris_purchase(update: Update, context: ContextTypes.DEFAULT_TY
             msg = await update.message.reply_text(text)
         
         # Execute purchase
-        transaction_id = settlement_qris(
+        transaction_id = await asyncio.to_thread(
+            settlement_qris,
             api_key=session['api_key'],
             tokens=session['tokens'],
             items=payment_items,
@@ -365,7 +379,8 @@ async def execute_qris_purchase(update: Update, context: ContextTypes.DEFAULT_TY
         
         if transaction_id:
             # Get QR code
-            qris_code = get_qris_code(
+            qris_code = await asyncio.to_thread(
+                get_qris_code,
                 session['api_key'],
                 session['tokens'],
                 transaction_id
@@ -418,6 +433,9 @@ async def execute_qris_purchase(update: Update, context: ContextTypes.DEFAULT_TY
             await update.message.reply_text(text, reply_markup=reply_markup)
             
     except Exception as e:
+        # Handled here, so the purchase span has to be marked failed by hand
+        current_span().set_status("ERROR")
+        current_span().add_event("exception", type=type(e).__name__, message=str(e))
         text = f"❌ Error: {str(e)}"
         if query:
             await query.edit_message_text(text)
@@ -432,4 +450,4 @@ async def cancel_payment(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "❌ Pembayaran dibatalkan.\n\n"
         "Gunakan /start untuk kembali ke menu utama."
     )
-    return ConversationHandler.END
\ No newline at end of file
+    return ConversationHandler.END
\ No newline at end of file
@@ -12,7 +12,7 @@ async def show_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query if update.callback_query else None
     user = update.effective_user
 
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         text = "❌ Sesi berakhir. Silakan /login kembali."
         if query:
@@ -30,7 +30,7 @@ async def show_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
         loading_msg = await update.message.reply_text("⏳ Memuat profil...")
 
     try:
-        from app.client.engsel import get_balance, get_tiering_info
+        from app.client.aio.engsel import get_balance, get_tiering_info
 
         # ==============================
         # Data dasar dari session
@@ -44,7 +44,7 @@ async def show_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # ==============================
         balance_text = ""
         try:
-            balance = get_balance(session["api_key"], session["tokens"]["id_token"])
+            balance = await get_balance(session["api_key"], session["tokens"]["id_token"])
         except Exception:
             balance = None
 
@@ -65,7 +65,7 @@ async def show_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
         tier_text = ""
         if session.get("subscription_type") == "PREPAID":
             try:
-                tiering = get_tiering_info(session["api_key"], session["tokens"])
+                tiering = await get_tiering_info(session["api_key"], session["tokens"])
                 if tiering:
                     tier = tiering.get("tier", 0)
                     current_point = tiering.get("current_point", 0)
@@ -7,7 +7,7 @@ from telegram.ext import (
     ContextTypes,
     ConversationHandler,
 )
-from bot.database import db
+from bot.async_database import adb
 from bot.utils import get_user_session
 
 
@@ -45,7 +45,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = update.effective_user
 
     # Create or update user in database
-    db.create_or_update_user(
+    await adb.create_or_update_user(
         telegram_id=user.id,
         username=user.username,
         first_name=user.first_name,
@@ -53,7 +53,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     )
 
     # Check if user has active XL account
-    xl_account = db.get_active_xl_account(user.id)
+    xl_account = await adb.get_active_xl_account(user.id)
 
     if xl_account:
         # Langsung lempar ke menu utama kalau sudah punya akun XL aktif
@@ -88,7 +88,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show main menu"""
     user = update.effective_user
-    xl_account = db.get_active_xl_account(user.id)
+    xl_account = await adb.get_active_xl_account(user.id)
 
     if not xl_account:
         # Kalau tiba-tiba akun sudah tidak ada / belum login, balikin ke start
@@ -96,7 +96,7 @@ async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
 
     # Ambil session kalau nanti butuh, tapi TIDAK fetch apa-apa ke API XL
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     # (session sengaja tidak dipakai sekarang, cuma disiapkan kalau nanti mau dipakai)
 
     # Build kartu profil fancy (tanpa fetch balance/tiering)
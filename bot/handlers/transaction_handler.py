@@ -24,7 +24,7 @@ async def show_transaction_history(update: Update, context: ContextTypes.DEFAULT
     query = update.callback_query if update.callback_query else None
     user = update.effective_user
     
-    session = get_user_session(user.id)
+    session = await get_user_session(user.id)
     if not session:
         text = "❌ Sesi berakhir. Silakan /login kembali."
         if query:
@@ -34,9 +34,9 @@ async def show_transaction_history(update: Update, context: ContextTypes.DEFAULT
         return
     
     try:
-        from app.client.engsel import get_transaction_history
+        from app.client.aio.engsel import get_transaction_history
         
-        data = get_transaction_history(session['api_key'], session['tokens'])
+        data = await get_transaction_history(session['api_key'], session['tokens'])
         
         if not data or 'list' not in data:
             text = "📋 <b>Riwayat Transaksi</b>\n\nTidak ada riwayat transaksi."
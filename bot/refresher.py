@@ -0,0 +1,129 @@
+import asyncio
+import heapq
+import os
+import random
+import time
+from collections import deque
+from typing import Optional
+
+
+# Refresh this many seconds before a session reaches SESSION_MAX_AGE
+REFRESH_MARGIN = int(os.getenv("TOKEN_REFRESH_MARGIN", "60"))
+# Random spread so sessions created together don't all refresh in the same second
+REFRESH_JITTER = int(os.getenv("TOKEN_REFRESH_JITTER", "30"))
+# Max get_new_token calls in flight at once
+REFRESH_CONCURRENCY = int(os.getenv("TOKEN_REFRESH_CONCURRENCY", "4"))
+# Retry delay after a failed refresh
+REFRESH_RETRY = int(os.getenv("TOKEN_REFRESH_RETRY", "30"))
+# Stop refreshing sessions nobody used for this long, they refresh inline on next use
+REFRESH_IDLE = int(os.getenv("TOKEN_REFRESH_IDLE", "3600"))
+
+
+class TokenRefresher:
+    """Refresh bot sessions shortly before they expire so handlers never wait on get_new_token"""
+
+    def __init__(self, session_manager, max_age: int):
+        self.session_manager = session_manager
+        self.max_age = max_age
+
+        self._heap = []  # (deadline, telegram_id), stale entries are skipped lazily
+        self._deadlines = {}  # telegram_id -> current deadline
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+        self._task: Optional[asyncio.Task] = None
+        self._inflight = set()
+
+        self.refreshed = 0
+        self.failures = 0
+        self.dropped_idle = 0
+        self.latencies = deque(maxlen=500)
+
+    def start(self):
+        """Attach to the session manager and start the scheduler loop"""
+        self.session_manager.refresher = self
+        for telegram_id, session in self.session_manager.sessions.items():
+            self.schedule(telegram_id, session.get('last_refresh', 0))
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._inflight):
+            task.cancel()
+        self.session_manager.refresher = None
+
+    def schedule(self, telegram_id: int, last_refresh: float):
+        """(Re)schedule a refresh for a session that was refreshed at `last_refresh`"""
+        deadline = last_refresh + self.max_age - REFRESH_MARGIN - random.uniform(0, REFRESH_JITTER)
+        self._push(telegram_id, deadline)
+
+    def unschedule(self, telegram_id: int):
+        self._deadlines.pop(telegram_id, None)
+
+    def _push(self, telegram_id: int, deadline: float):
+        self._deadlines[telegram_id] = deadline
+        heapq.heappush(self._heap, (deadline, telegram_id))
+        if self._heap[0][1] == telegram_id:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                deadline, telegram_id = heapq.heappop(self._heap)
+                if self._deadlines.get(telegram_id) != deadline:
+                    continue  # superseded or unscheduled
+                del self._deadlines[telegram_id]
+                task = asyncio.create_task(self._refresh(telegram_id))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refresh(self, telegram_id: int):
+        session = self.session_manager.sessions.get(telegram_id)
+        if not session:
+            return
+        if time.time() - session.get('last_access', 0) > REFRESH_IDLE:
+            self.dropped_idle += 1
+            return
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                result = await self.session_manager.refresh_in_background(telegram_id)
+            except Exception as e:
+                print(f"Background refresh error for {telegram_id}: {e}")
+                result = None
+            self.latencies.append(time.perf_counter() - start)
+
+        if result:
+            self.refreshed += 1
+        elif telegram_id in self.session_manager.sessions:
+            self.failures += 1
+            print(f"Background refresh failed for {telegram_id}, retrying in {REFRESH_RETRY}s")
+            self._push(telegram_id, time.time() + REFRESH_RETRY)
+
+    def stats(self) -> dict:
+        """Refresh counters and latency in seconds"""
+        latencies = sorted(self.latencies)
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] if latencies else 0.0
+        return {
+            'scheduled': len(self._deadlines),
+            'in_flight': len(self._inflight),
+            'refreshed': self.refreshed,
+            'failures': self.failures,
+            'dropped_idle': self.dropped_idle,
+            'latency_avg': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_p95': p95,
+            'latency_max': latencies[-1] if latencies else 0.0,
+        }
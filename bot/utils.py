@@ -1,10 +1,15 @@
+import asyncio
 import time
 from typing import Optional, Dict
 from telegram import InlineKeyboardButton
-from bot.database import db
-from app.client.ciam import get_new_token
-from app.client.engsel import get_profile
+from bot.async_database import adb
+from app.client.aio.ciam import get_new_token
 from app.util import ensure_api_key
+from app.service.hot_resolver import HotResolverInstance
+
+
+# Tokens older than this are refreshed before use
+SESSION_MAX_AGE = 300
 
 
 class SessionManager:
@@ -13,25 +18,55 @@ class SessionManager:
     def __init__(self):
         self.sessions = {}  # telegram_id -> session data
         self.api_key = ensure_api_key()
+        self.refresher = None  # set by bot.refresher.TokenRefresher.start()
+        self._locks = {}  # telegram_id -> asyncio.Lock, one refresh per user at a time
+    
+    def _lock_for(self, telegram_id: int) -> asyncio.Lock:
+        lock = self._locks.get(telegram_id)
+        if lock is None:
+            lock = self._locks[telegram_id] = asyncio.Lock()
+        return lock
     
-    def get_session(self, telegram_id: int) -> Optional[Dict]:
+    def _fresh_session(self, telegram_id: int) -> Optional[Dict]:
+        session = self.sessions.get(telegram_id)
+        if session and time.time() - session.get('last_refresh', 0) < SESSION_MAX_AGE:
+            return session
+        return None
+    
+    async def get_session(self, telegram_id: int) -> Optional[Dict]:
         """Get or create session for user"""
         
         # Check if session exists and is valid
-        if telegram_id in self.sessions:
-            session = self.sessions[telegram_id]
-            # Check if tokens need refresh (older than 5 minutes)
-            if time.time() - session.get('last_refresh', 0) < 300:
-                return session
+        session = self._fresh_session(telegram_id)
+        if session:
+            session['last_access'] = time.time()
+            return session
         
+        async with self._lock_for(telegram_id):
+            # Another task may have refreshed while we waited for the lock
+            session = self._fresh_session(telegram_id)
+            if not session:
+                session = await self._refresh(telegram_id)
+            if session:
+                session['last_access'] = time.time()
+            return session
+    
+    async def refresh_in_background(self, telegram_id: int) -> Optional[Dict]:
+        """Refresh an existing session ahead of expiry, used by the token refresher"""
+        async with self._lock_for(telegram_id):
+            if telegram_id not in self.sessions:
+                return None
+            return await self._refresh(telegram_id)
+    
+    async def _refresh(self, telegram_id: int) -> Optional[Dict]:
         # Get active XL account
-        xl_account = db.get_active_xl_account(telegram_id)
+        xl_account = await adb.get_active_xl_account(telegram_id)
         if not xl_account:
             return None
         
         # Refresh tokens
         try:
-            tokens = get_new_token(
+            tokens = await get_new_token(
                 self.api_key,
                 xl_account['refresh_token'],
                 xl_account['subscriber_id']
@@ -40,8 +75,8 @@ class SessionManager:
             if not tokens:
                 return None
             
-            # Update database
-            db.update_xl_tokens(
+            # Update database (write-behind, the refresh path never waits on disk)
+            adb.update_xl_tokens_nowait(
                 telegram_id=telegram_id,
                 phone_number=xl_account['phone_number'],
                 access_token=tokens['access_token'],
@@ -50,16 +85,22 @@ class SessionManager:
             )
             
             # Create session
+            previous = self.sessions.get(telegram_id, {})
             session = {
                 'api_key': self.api_key,
                 'tokens': tokens,
                 'phone_number': xl_account['phone_number'],
                 'subscriber_id': xl_account['subscriber_id'],
                 'subscription_type': xl_account['subscription_type'],
-                'last_refresh': time.time()
+                'last_refresh': time.time(),
+                'last_access': previous.get('last_access', time.time())
             }
             
             self.sessions[telegram_id] = session
+            if self.refresher:
+                self.refresher.schedule(telegram_id, session['last_refresh'])
+            # Hot packages are resolved with whichever session of this type is freshest
+            HotResolverInstance.register(session['subscription_type'], self.api_key, tokens)
             return session
             
         except Exception as e:
@@ -70,11 +111,13 @@ class SessionManager:
         """Clear session for user"""
         if telegram_id in self.sessions:
             del self.sessions[telegram_id]
+        if self.refresher:
+            self.refresher.unschedule(telegram_id)
     
-    def refresh_session(self, telegram_id: int) -> bool:
+    async def refresh_session(self, telegram_id: int) -> bool:
         """Force refresh session"""
         self.clear_session(telegram_id)
-        session = self.get_session(telegram_id)
+        session = await self.get_session(telegram_id)
         return session is not None
 
 
@@ -82,14 +125,14 @@ class SessionManager:
 session_manager = SessionManager()
 
 
-def get_user_session(telegram_id: int) -> Optional[Dict]:
+async def get_user_session(telegram_id: int) -> Optional[Dict]:
     """Get user session"""
-    return session_manager.get_session(telegram_id)
+    return await session_manager.get_session(telegram_id)
 
 
-def refresh_user_session(telegram_id: int) -> bool:
+async def refresh_user_session(telegram_id: int) -> bool:
     """Refresh user session"""
-    return session_manager.refresh_session(telegram_id)
+    return await session_manager.refresh_session(telegram_id)
 
 
 def clear_user_session(telegram_id: int):
@@ -245,4 +288,4 @@ def get_pagination_keyboard(current_page: int, total_pages: int,
     if buttons:
         keyboard.append(buttons)
     
-    return keyboard
\ No newline at end of file
+    return keyboard
\ No newline at end of file
@@ -6,10 +6,6 @@ load_dotenv()
 import sys, json
 from datetime import datetime
 from app.menus.util import clear_screen, pause
-from app.client.engsel import (
-    get_balance,
-    get_tiering_info,
-)
 from app.client.famplan import validate_msisdn
 from app.menus.payment import show_transaction_history
 from app.service.auth import AuthInstance
@@ -18,6 +14,9 @@ from app.menus.account import show_account_menu
 from app.menus.package import fetch_my_packages, get_packages_by_family, show_package_details
 from app.menus.hot import show_hot_menu, show_hot_menu2
 from app.service.sentry import enter_sentry_mode
+from app.service.dashboard import DashboardInstance
+from app.service.hot_resolver import HotResolverInstance
+from app.service.metrics import MetricsInstance, format_summary
 from app.menus.purchase import purchase_by_family
 from app.menus.famplan import show_family_info
 from app.menus.circle import show_circle_info
@@ -32,7 +31,9 @@ WIDTH = 55
 def show_main_menu(profile):
     clear_screen()
     print("=" * WIDTH)
-    expired_at_dt = datetime.fromtimestamp(profile["balance_expired_at"]).strftime("%Y-%m-%d")
+    expired_at_dt = "N/A"
+    if profile["balance_expired_at"]:
+        expired_at_dt = datetime.fromtimestamp(profile["balance_expired_at"]).strftime("%Y-%m-%d")
     print(f"Nomor: {profile['number']} | Type: {profile['subscription_type']}".center(WIDTH))
     print(f"Pulsa: Rp {profile['balance']} | Aktif sampai: {expired_at_dt}".center(WIDTH))
     print(f"{profile['point_info']}".center(WIDTH))
@@ -67,26 +68,12 @@ def main():
 
         # Logged in
         if active_user is not None:
-            balance = get_balance(AuthInstance.api_key, active_user["tokens"]["id_token"])
-            balance_remaining = balance.get("remaining")
-            balance_expired_at = balance.get("expired_at")
-            
-            point_info = "Points: N/A | Tier: N/A"
-            
-            if active_user["subscription_type"] == "PREPAID":
-                tiering_data = get_tiering_info(AuthInstance.api_key, active_user["tokens"])
-                tier = tiering_data.get("tier", 0)
-                current_point = tiering_data.get("current_point", 0)
-                point_info = f"Points: {current_point} | Tier: {tier}"
-            
-            profile = {
-                "number": active_user["number"],
-                "subscriber_id": active_user["subscriber_id"],
-                "subscription_type": active_user["subscription_type"],
-                "balance": balance_remaining,
-                "balance_expired_at": balance_expired_at,
-                "point_info": point_info
-            }
+            # Keep hot packages resolved in the background for this account type
+            HotResolverInstance.register(active_user["subscription_type"], AuthInstance.api_key, active_user["tokens"])
+            HotResolverInstance.start(quiet=True)
+
+            # Balance, tiering and profile are fetched together and cached briefly
+            profile = DashboardInstance.load(AuthInstance.api_key, active_user)
 
             show_main_menu(profile)
 
@@ -203,6 +190,14 @@ def main():
                 show_notification_menu()
             elif choice == "s":
                 enter_sentry_mode()
+            elif choice == "mt":
+                print(format_summary())
+                pause()
+            elif choice == "sa":
+                # Needs numpy, only imported when used
+                from app.service.sentry_analytics import show_sentry_analytics
+                show_sentry_analytics()
+                pause()
             else:
                 print("Invalid choice. Please try again.")
                 pause()
@@ -221,6 +216,7 @@ if __name__ == "__main__":
         if need_update:
             pause()
 
+        MetricsInstance.serve()
         main()
     except KeyboardInterrupt:
         print("\nExiting the application.")
@@ -37,7 +37,13 @@ from bot.handlers.admin_handler import (
     ADMIN_ADD_VARIANT,
     ADMIN_ADD_ORDER
 )
-from bot.database import init_db
+from bot.database import init_db, db
+from bot.async_database import adb
+from app.client.aio import transport as aio_transport
+from bot.refresher import TokenRefresher
+from app.service.hot_resolver import HotResolverInstance
+from app.service.metrics import MetricsInstance
+from bot.utils import session_manager, SESSION_MAX_AGE
 
 # Import state dari login_handler biar konsisten
 from bot.handlers.login_handler import LOGIN_PHONE, LOGIN_OTP
@@ -68,6 +74,29 @@ async def handle_text_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❓ Input tidak dikenal. Gunakan /help untuk bantuan.")
 
 
+async def post_init(application: Application) -> None:
+    """Start background token refresh for active sessions and the hot package resolver."""
+    refresher = TokenRefresher(session_manager, SESSION_MAX_AGE)
+    refresher.start()
+    application.bot_data["token_refresher"] = refresher
+    HotResolverInstance.start()
+    MetricsInstance.register_collector("token_refresher", refresher.stats)
+    MetricsInstance.register_collector("db_writes", adb.stats)
+    MetricsInstance.serve()
+
+
+async def post_shutdown(application: Application) -> None:
+    """Stop background workers and close the HTTP pool and database connections."""
+    refresher = application.bot_data.get("token_refresher")
+    if refresher:
+        await refresher.stop()
+    HotResolverInstance.stop()
+    MetricsInstance.stop()
+    await aio_transport.aclose()
+    adb.close()
+    db.close_all()
+
+
 def main() -> None:
     """Start the bot."""
     # Initialize database
@@ -79,7 +108,13 @@ def main() -> None:
         raise ValueError("TELEGRAM_BOT_TOKEN not found in environment variables")
 
     # Create the Application
-    application = Application.builder().token(bot_token).build()
+    application = (
+        Application.builder()
+        .token(bot_token)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     # =====================================================================
     # Command handlers
@@ -90,6 +125,8 @@ def main() -> None:
     application.add_handler(CommandHandler("cancel", start_handler.cancel))
     application.add_handler(CommandHandler("db", db_command))
     application.add_handler(CommandHandler("admin", admin_handler.admin_menu))
+    application.add_handler(CommandHandler("metrics", admin_handler.metrics_command))
+    application.add_handler(CommandHandler("cari", package_handler.search_command))
 
     # =====================================================================
     # Admin ConversationHandler (untuk add hot packages)
@@ -312,4 +349,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file